@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Accuracy versus time of the approximate ρ*/τ* solver against exact HiGHS.
+
+    python benchmarks/bench_approximate.py --edges 10000 100000 --epsilon 0.2 0.1 0.05
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.optimize import linprog
+from scipy.sparse import csc_matrix
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.query_quantity_calculator.approximate import ApproximateSolver
+
+
+def random_incidence(n_edges: int, seed: int):
+    """Arity 1-4 edges over ~n_edges/3 vertices with skewed vertex popularity"""
+    rng = np.random.default_rng(seed)
+    n_vertices = max(n_edges // 3, 4)
+    sizes = rng.integers(1, 5, n_edges)
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    popularity = 1.0 / np.arange(1, n_vertices + 1) ** 0.8
+    vertex_ids = rng.choice(n_vertices, offsets[-1], p=popularity / popularity.sum())
+    used, vertex_ids = np.unique(vertex_ids, return_inverse=True)
+    return offsets, vertex_ids, len(used)
+
+
+def exact(offsets, vertex_ids, n_vertices):
+    n_edges = len(offsets) - 1
+    matrix = csc_matrix((np.ones(len(vertex_ids)), vertex_ids, offsets), shape=(n_vertices, n_edges))
+    start = time.perf_counter()
+    cover = linprog(np.ones(n_edges), A_ub=-matrix, b_ub=-np.ones(n_vertices), method='highs')
+    packing = linprog(-np.ones(n_edges), A_ub=matrix, b_ub=np.ones(n_vertices), method='highs')
+    return cover.fun, -packing.fun, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--edges", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--epsilon", type=float, nargs="+", default=[0.2, 0.1, 0.05])
+    parser.add_argument("--exact-limit", type=int, default=300000,
+                        help="skip the exact LP above this many edges")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'|E|':>9} {'nnz':>9} {'eps':>6} {'iters':>11} {'time_s':>8} "
+          f"{'rho_err':>8} {'tau_err':>8} {'exact_s':>8}")
+    for n_edges in args.edges:
+        offsets, vertex_ids, n_vertices = random_incidence(n_edges, args.seed)
+        rho_star = tau_star = exact_time = None
+        if n_edges <= args.exact_limit:
+            rho_star, tau_star, exact_time = exact(offsets, vertex_ids, n_vertices)
+
+        solver = ApproximateSolver(offsets, vertex_ids, n_vertices)
+        for epsilon in args.epsilon:
+            start = time.perf_counter()
+            cover = solver.edge_cover(epsilon)
+            packing = solver.edge_packing(epsilon)
+            elapsed = time.perf_counter() - start
+
+            if rho_star is None:
+                # Without the exact optimum report the certified bracket width
+                rho_err = cover.upper / cover.lower - 1
+                tau_err = packing.upper / packing.lower - 1
+            else:
+                rho_err = abs(cover.value - rho_star) / rho_star
+                tau_err = abs(packing.value - tau_star) / tau_star
+            print(f"{n_edges:>9} {len(vertex_ids):>9} {epsilon:>6.3f} "
+                  f"{cover.iterations:>5}/{packing.iterations:<5} {elapsed:>8.2f} "
+                  f"{rho_err:>8.4f} {tau_err:>8.4f} "
+                  f"{'-' if exact_time is None else f'{exact_time:.2f}':>8}")
+
+
+if __name__ == "__main__":
+    main()
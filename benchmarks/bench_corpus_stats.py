@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Throughput of the vectorized corpus statistics on random small queries.
+
+    python benchmarks/bench_corpus_stats.py --queries 100000 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.query_quantity_calculator.corpus_stats import corpus_statistics, pack_tokens
+
+
+def random_corpus(n_queries: int, seed: int):
+    """3-6 atoms of arity 2-3 per query over 6 variables"""
+    rng = np.random.default_rng(seed)
+    query_offsets = np.concatenate([[0], np.cumsum(rng.integers(3, 7, n_queries))])
+    edge_offsets = np.concatenate([[0], np.cumsum(rng.integers(2, 4, query_offsets[-1]))])
+    return query_offsets, edge_offsets, rng.integers(0, 6, edge_offsets[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'queries':>9} {'nnz':>10} {'pack_s':>8} {'stats_s':>8} {'queries/min':>12} {'acyclic':>8}")
+    for n_queries in args.queries:
+        query_offsets, edge_offsets, tokens = random_corpus(n_queries, args.seed)
+        start = time.perf_counter()
+        corpus = pack_tokens(query_offsets, edge_offsets, tokens)
+        packed = time.perf_counter()
+        stats = corpus_statistics(corpus)
+        done = time.perf_counter()
+        print(f"{n_queries:>9} {len(corpus.vertex_ids):>10} {packed - start:>8.2f} {done - packed:>8.2f} "
+              f"{n_queries / (done - start) * 60:>12,.0f} {stats['acyclic'].mean():>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
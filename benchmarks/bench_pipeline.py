@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Peak RSS and throughput of the streaming pipeline against collecting results in a list.
+
+Each run happens in a fresh interpreter so its peak RSS is its own.
+
+    python benchmarks/bench_pipeline.py --queries 5000 20000 80000 --solvers 2
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.query_quantity_calculator.generators import FAMILIES, generate, to_query
+
+
+def write_corpus(path: str, n_queries: int, n_atoms: int):
+    families = sorted(FAMILIES)
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n_queries):
+            f.write(to_query(generate(families[i % len(families)], n_atoms, seed=i)) + "\n\n")
+
+
+def child(mode: str, input_path: str, solvers: int):
+    from src.query_quantity_calculator.batch import HighsModelPool
+    from src.query_quantity_calculator.corpus import results_frame
+    from src.query_quantity_calculator.pipeline import StreamingPipeline, jsonl_writer
+    from src.query_quantity_calculator.shards import read_corpus_file
+
+    start = time.perf_counter()
+    with open(os.devnull, "w") as out:
+        if mode == "pipeline":
+            StreamingPipeline(solve_workers=solvers).run(read_corpus_file(input_path), jsonl_writer(out))
+        else:
+            queries = list(read_corpus_file(input_path))
+            results_frame(list(HighsModelPool(max_workers=solvers).imap(queries))).to_json(out, orient="records")
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux
+    print(json.dumps({"elapsed": elapsed, "peak_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, nargs="+", default=[5000, 20000, 80000])
+    parser.add_argument("--atoms", type=int, default=6)
+    parser.add_argument("--solvers", type=int, default=2)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "INPUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child[0], args.child[1], args.solvers)
+        return
+
+    print(f"{'queries':>8} {'mode':>9} {'seconds':>8} {'queries/s':>10} {'peak_MiB':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for n_queries in args.queries:
+            path = os.path.join(directory, f"corpus-{n_queries}.txt")
+            write_corpus(path, n_queries, args.atoms)
+            for mode in ("pipeline", "list"):
+                output = subprocess.run([sys.executable, __file__, "--solvers", str(args.solvers),
+                                         "--child", mode, path], check=True, capture_output=True, text=True)
+                result = json.loads(output.stdout.splitlines()[-1])
+                print(f"{n_queries:>8} {mode:>9} {result['elapsed']:>8.1f} "
+                      f"{n_queries / result['elapsed']:>10.0f} {result['peak_mib']:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
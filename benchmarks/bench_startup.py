@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Time to first result for a triangle query in a fresh interpreter.
+
+cold    import the solver and analyze the query
+eager   the same after importing scipy, Plotly and NetworkX up front, as the
+        modules used to at import time
+fork    a new fork pool's first result, without and with preload() in the parent
+
+Each run happens in a fresh interpreter; the table shows the median and the
+heavy modules the run had loaded.
+
+    python benchmarks/bench_startup.py --repeat 7
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+MODES = ("cold", "eager", "fork", "fork-preload")
+HEAVY = ("scipy", "plotly", "networkx", "pandas", "highspy")
+TRIANGLE = "R(a, b)\nS(b, c)\nT(a, c)"
+
+
+def analyze_triangle() -> float:
+    from src.query_quantity_calculator.batch import build_hypergraph
+    from src.query_quantity_calculator.solver import QuerySolver
+
+    return QuerySolver(build_hypergraph(TRIANGLE)).analyze().rho_star
+
+
+def child(mode: str):
+    start = time.perf_counter()
+    if mode == "eager":
+        import networkx  # noqa: F401
+        import plotly.express  # noqa: F401
+        import scipy.optimize  # noqa: F401
+        import scipy.sparse.csgraph  # noqa: F401
+    if mode.startswith("fork"):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        from src.query_quantity_calculator.startup import preload
+
+        if mode == "fork-preload":
+            preload()
+        # Only the pool's first result is timed: the parent's own preload is paid once per pool
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork")) as executor:
+            rho_star = executor.submit(analyze_triangle).result()
+    else:
+        rho_star = analyze_triangle()
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"seconds": elapsed, "rho_star": rho_star,
+                      "modules": [name for name in HEAVY if name in sys.modules]}))
+
+
+def run(mode: str) -> dict:
+    output = subprocess.run([sys.executable, __file__, "--child", mode], capture_output=True, text=True,
+                            check=True, cwd=ROOT).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child)
+        return
+
+    print(f"{'mode':<13} {'median_ms':>10} {'min_ms':>8}  modules")
+    for mode in MODES:
+        runs = [run(mode) for _ in range(args.repeat)]
+        seconds = [r["seconds"] for r in runs]
+        print(f"{mode:<13} {statistics.median(seconds) * 1000:>10.1f} {min(seconds) * 1000:>8.1f}  "
+              f"{','.join(runs[-1]['modules']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
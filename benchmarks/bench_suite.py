@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Per-stage timings on generated hypergraph families, with baseline comparison.
+
+    python benchmarks/bench_suite.py run baseline.json --sizes 10 100 1000 10000 100000
+    python benchmarks/bench_suite.py compare baseline.json current.json --threshold 0.2
+
+``compare`` exits with status 1 when any stage regressed by more than the threshold.
+The default sizes stop at 1000 atoms; random k-uniform instances of 10k atoms
+and up take minutes per LP with dual simplex.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.query_quantity_calculator.benchmark import compare, load_results, run_suite, save_results
+from src.query_quantity_calculator.generators import FAMILIES
+
+
+def run(args) -> int:
+    results = run_suite(args.families, args.sizes, args.repeats, args.seed, args.max_visualization_atoms,
+                        progress=lambda case: print(case, file=sys.stderr))
+    save_results(results, args.output)
+    for case, stages in results["results"].items():
+        print(f"{case:<24} " + " ".join(f"{stage}={seconds:.4f}" for stage, seconds in stages.items()))
+    return 0
+
+
+def run_compare(args) -> int:
+    regressions = compare(load_results(args.baseline), load_results(args.current),
+                          args.threshold, args.min_seconds)
+    for r in regressions:
+        print(f"REGRESSION {r.case:<24} {r.stage:<14} {r.baseline:.4f}s -> {r.current:.4f}s ({r.ratio:.2f}x)")
+    if not regressions:
+        print("No regressions")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="time the suite and write a JSON baseline")
+    run_parser.add_argument("output")
+    run_parser.add_argument("--families", nargs="+", choices=list(FAMILIES), default=None)
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000],
+                            help="number of atoms per generated query")
+    run_parser.add_argument("--repeats", type=int, default=3)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--max-visualization-atoms", type=int, default=1000)
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="flag stages slower than the baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.2,
+                                help="relative slowdown that counts as a regression")
+    compare_parser.add_argument("--min-seconds", type=float, default=1e-3,
+                                help="ignore stages faster than this in both runs")
+    compare_parser.set_defaults(handler=run_compare)
+
+    args = parser.parse_args()
+    sys.exit(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Output size and render time of SVG thumbnails against the Plotly figure JSON.
+
+    python benchmarks/bench_svg.py --queries 200 --atoms 4 16 64 --processes 4
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.query_quantity_calculator.batch import build_hypergraph
+from src.query_quantity_calculator.generators import FAMILIES, generate, to_query
+from src.query_quantity_calculator.svg import render_queries, render_svg
+
+
+def corpus(n_queries: int, n_atoms: int):
+    families = sorted(FAMILIES)
+    return [to_query(generate(families[i % len(families)], n_atoms, seed=i)) for i in range(n_queries)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--atoms", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    print(f"{'atoms':>6} {'plotly_s':>9} {'plotly_KB':>10} {'svg_s':>7} {'svg_KB':>8} {'pool_s':>7}")
+    for n_atoms in args.atoms:
+        queries = corpus(args.queries, n_atoms)
+        hypergraphs = [build_hypergraph(query_text) for query_text in queries]
+
+        start = time.perf_counter()
+        plotly_bytes = sum(len(hypergraph.create_visualization().to_json()) for hypergraph in hypergraphs)
+        plotly_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        svg_bytes = sum(len(render_svg(hypergraph)) for hypergraph in hypergraphs)
+        svg_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        list(render_queries(queries, processes=args.processes))
+        pool_time = time.perf_counter() - start
+
+        print(f"{n_atoms:>6} {plotly_time:>9.2f} {plotly_bytes / 1024:>10.0f} {svg_time:>7.2f} "
+              f"{svg_bytes / 1024:>8.0f} {pool_time:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""Measure LP backend crossovers on this machine and write selection thresholds.
+
+    python benchmarks/calibrate_backends.py backend_thresholds.json
+
+Load the result with
+``backends.set_default_thresholds(backends.load_thresholds(path))``.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.query_quantity_calculator.backends import calibrate, save_thresholds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output", help="JSON file for the thresholds")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[30, 300, 3000, 30000, 300000],
+                        help="nnz of the calibration instances")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--ratios", type=float, nargs="+", default=[1, 2, 4, 8, 16, 32],
+                        help="|E|/|V| of the instances timed for the interior point shape threshold")
+    args = parser.parse_args()
+
+    thresholds = calibrate(args.sizes, args.repeats, ratios=args.ratios)
+    save_thresholds(thresholds, args.output)
+    for name, value in thresholds._asdict().items():
+        print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
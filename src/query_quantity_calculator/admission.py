@@ -0,0 +1,103 @@
+import json
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+# Rough HiGHS footprint: column- and row-wise copies of the matrix plus the
+# factorisation, and a few dozen dense work vectors per row and column
+_BYTES_PER_NONZERO = 48
+_BYTES_PER_ROW_OR_COLUMN = 256
+# nx.spring_layout runs 50 iterations over all vertex pairs and keeps an
+# n x n x 2 array of float64 displacements
+_LAYOUT_ITERATIONS = 50
+_LAYOUT_BYTES_PER_PAIR = 16
+
+
+class CostEstimate(NamedTuple):
+    atoms: int
+    vertices: int
+    nnz: int
+    rank: int
+    lp_memory_bytes: int
+    layout_operations: int
+    layout_memory_bytes: int
+
+
+class AdmissionPolicy(NamedTuple):
+    # Above these the query is rejected outright
+    max_atoms: int = 50000
+    max_lp_memory_bytes: int = 1 << 30
+    # From this nnz on ρ*/τ* come from the approximate solver
+    approximate_min_nnz: int = 500000
+    epsilon: float = 0.05
+    # Above these the visualization is skipped
+    max_layout_memory_bytes: int = 256 << 20
+    max_visualization_atoms: int = 2000
+
+
+class AdmissionDecision(NamedTuple):
+    admitted: bool
+    approximate: bool
+    visualize: bool
+    estimate: CostEstimate
+    # Why the query was rejected or downgraded, for display to the user
+    messages: List[str]
+
+
+def estimate_cost(relations: Sequence[Tuple[str, Sequence[str]]]) -> CostEstimate:
+    """Sizes of the LP and the layout from the parsed relations, without building anything"""
+    vertices = set()
+    nnz = rank = 0
+    for _, args in relations:
+        unique = set(args)
+        vertices.update(unique)
+        nnz += len(unique)
+        rank = max(rank, len(unique))
+    n = len(vertices)
+    return CostEstimate(
+        atoms=len(relations),
+        vertices=n,
+        nnz=nnz,
+        rank=rank,
+        lp_memory_bytes=nnz * _BYTES_PER_NONZERO + (n + len(relations)) * _BYTES_PER_ROW_OR_COLUMN,
+        layout_operations=_LAYOUT_ITERATIONS * n * n,
+        layout_memory_bytes=_LAYOUT_BYTES_PER_PAIR * n * n,
+    )
+
+
+def admit(relations: Sequence[Tuple[str, Sequence[str]]],
+          policy: Optional[AdmissionPolicy] = None) -> AdmissionDecision:
+    policy = policy or AdmissionPolicy()
+    estimate = estimate_cost(relations)
+    messages = []
+    if estimate.atoms > policy.max_atoms:
+        messages.append(f"The query has {estimate.atoms:,} atoms; at most {policy.max_atoms:,} are accepted.")
+    if estimate.lp_memory_bytes > policy.max_lp_memory_bytes:
+        messages.append(f"Solving would need about {_megabytes(estimate.lp_memory_bytes)} "
+                        f"(limit {_megabytes(policy.max_lp_memory_bytes)}).")
+    if messages:
+        return AdmissionDecision(False, False, False, estimate, messages)
+
+    approximate = estimate.nnz >= policy.approximate_min_nnz
+    if approximate:
+        messages.append(f"The LP has {estimate.nnz:,} nonzeros: ρ* and τ* are approximated "
+                        f"to within {policy.epsilon:.0%}.")
+    visualize = (estimate.atoms <= policy.max_visualization_atoms
+                 and estimate.layout_memory_bytes <= policy.max_layout_memory_bytes)
+    if not visualize:
+        messages.append(f"Visualization skipped: {estimate.vertices:,} vertices and {estimate.atoms:,} atoms "
+                        f"are too many to lay out.")
+    return AdmissionDecision(True, approximate, visualize, estimate, messages)
+
+
+def _megabytes(size: int) -> str:
+    return f"{size / (1 << 20):,.0f} MB"
+
+
+def save_policy(policy: AdmissionPolicy, path: str):
+    with open(path, 'w') as f:
+        json.dump(policy._asdict(), f, indent=2)
+
+
+def load_policy(path: str) -> AdmissionPolicy:
+    """Fields missing from the file keep their defaults"""
+    with open(path) as f:
+        return AdmissionPolicy(**json.load(f))
@@ -1,14 +1,67 @@
+import os
+from typing import Optional
 import streamlit as st
 import pandas as pd
-from .parser import DatalogParser
+from . import instrumentation
+from .admission import AdmissionPolicy, load_policy
+from .batch import HighsModelPool
+from .corpus import NUMERIC_COLUMNS, histograms, page, page_count, read_corpus, results_frame, summary
+from .explore import NeighbourhoodExplorer
+from .fingerprint import FingerprintCache
 from .hypergraph import Hypergraph
-from .solver import QuerySolver
+from .progressive import (
+    STAGE_AGM_BOUND, STAGE_RHO_STAR, STAGE_STATISTICS, STAGE_TAU_STAR, STAGE_VISUALIZATION, STAGES,
+    AnalysisJob, JobRegistry, analysis_key, analysis_work
+)
+from .store import ResultStore
+
+
+@st.cache_resource
+def result_store():
+    """Shared on-disk results when QQC_RESULT_STORE names an SQLite file"""
+    path = os.environ.get("QQC_RESULT_STORE")
+    return ResultStore(path) if path else None
+
+
+@st.cache_resource
+def job_registry():
+    """One registry per server process, so identical queries from any session share a job
+    and resubmitted ones are answered from the fingerprint cache"""
+    return JobRegistry(cache=FingerprintCache())
+
+
+@st.cache_resource
+def admission_policy():
+    """Limits from the JSON file named by QQC_ADMISSION_POLICY, else the defaults"""
+    path = os.environ.get("QQC_ADMISSION_POLICY")
+    return load_policy(path) if path else AdmissionPolicy()
+
+
+@st.cache_resource
+def process_instrumentation() -> bool:
+    """Recording is process-wide: turned on once, here when QQC_INSTRUMENTATION is set
+    or by the first session that opens the performance panel, and never turned off by a session"""
+    if os.environ.get("QQC_INSTRUMENTATION", "").lower() in ("1", "true", "yes"):
+        instrumentation.enable()
+    return instrumentation.enabled()
 
 
 def main():
     st.title("Query Quantity Calculator")
     st.markdown("Calculate Fractional Edge Cover, Packing, and AGM Bound from Datalog-style queries")
-    
+
+    mode = st.sidebar.radio("Mode", ["Single query", "Corpus upload"])
+    show_performance = st.sidebar.checkbox("Show performance panel", value=process_instrumentation())
+    if show_performance:
+        instrumentation.enable()
+
+    if mode == "Corpus upload":
+        corpus_mode()
+    else:
+        single_query_mode(show_performance)
+
+
+def single_query_mode(show_performance: bool):
     st.subheader("📥 Query Input")
     st.markdown("**Format Example:**")
     st.code("""R(a, b)
@@ -20,94 +73,260 @@ T(a, c)""")
         value="R(a, b)\nS(b, c)\nT(a, c)",
         height=150
     )
-    
+
+    policy = admission_policy()
     if st.button("Execute Calculation"):
-        try:
-            parser = DatalogParser()
-            relations = parser.parse_query(query_input)
-            
-            if not relations:
-                st.error("No valid query has been entered")
-                return
-            
-            hypergraph = Hypergraph()
-            hypergraph.from_relations(relations)
-            
-            solver = QuerySolver(hypergraph)
-            
-            rho_star = solver.solve_fractional_edge_cover()
-            tau_star = solver.solve_fractional_edge_packing()
-            agm_bound = solver.compute_agm_bound()
-            
-            vertex_count = hypergraph.get_vertex_count()
-            edge_count = hypergraph.get_edge_count()
-            rank = hypergraph.get_rank()
-            product = rho_star * tau_star
-            
-            st.subheader("📊 Analysis Results")
-            
-            results_df = pd.DataFrame({
-                "Item": [
-                    "Number of Vertices (|V|)",
-                    "Number of Edges (|E|)",
-                    "Hypergraph Rank",
-                    "Fractional Edge Cover (ρ*)",
-                    "Fractional Edge Packing (τ*)",
-                    "AGM Bound",
-                    "ρ* × τ*"
-                ],
-                "Value": [
-                    vertex_count,
-                    edge_count,
-                    rank,
-                    f"{rho_star:.6f}",
-                    f"{tau_star:.6f}",
-                    f"{agm_bound:.6f}",
-                    f"{product:.6f}"
-                ]
-            })
-            
-            st.dataframe(results_df, use_container_width=True)
-            
-            st.subheader("📈 Interpretation")
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.metric(
-                    label="Verification: ρ* × τ* ≤ |V|",
-                    value=f"{product:.3f} ≤ {vertex_count}",
-                    delta=f"Difference: {vertex_count - product:.3f}"
-                )
-            
-            with col2:
-                ratio = product / vertex_count if vertex_count > 0 else 0
-                st.metric(
-                    label="Ratio (ρ* × τ*) / |V|",
-                    value=f"{ratio:.3f}",
-                    delta=f"{(1-ratio)*100:.1f}% margin"
-                )
-            
-            st.subheader("🎨 Hypergraph Visualization")
-            visualization = hypergraph.create_visualization()
-            if visualization:
-                st.plotly_chart(visualization, use_container_width=True)
-            else:
-                st.warning("Unable to display hypergraph")
-            
-            st.subheader("🔍 Query Details")
-            relations_df = pd.DataFrame({
-                "Relation Name": [rel[0] for rel in relations],
-                "Arguments": [", ".join(rel[1]) for rel in relations],
-                "Arity": [len(rel[1]) for rel in relations]
-            })
-            st.dataframe(relations_df, use_container_width=True)
-            
-        except ValueError as e:
-            st.error(f"Parse Error: {e}")
-        except RuntimeError as e:
-            st.error(f"Calculation Error: {e}")
-        except Exception as e:
-            st.error(f"Unexpected Error: {e}")
+        # Other sessions record into the same metrics: the panel shows what changed since this click
+        st.session_state["metrics_before"] = instrumentation.snapshot()
+        # Clicking again while the same query is running attaches to the running job
+        key = analysis_key(query_input, policy)
+        st.session_state["job"] = job_registry().submit(key, analysis_work(query_input, policy, result_store()))
+
+    job = st.session_state.get("job")
+    if job is not None:
+        show_job(job)
+        if show_performance and job.done:
+            show_performance_panel(st.session_state.get("metrics_before"))
+
+
+def show_job(job: AnalysisJob):
+    """Render each stage as soon as the worker publishes it"""
+    progress = st.progress(0.0, text="Parsing and checking the query")
+    messages = st.container()
+    statistics = st.container()
+    quantities = st.container()
+    interpretation = st.container()
+    figure = st.container()
+    details = st.container()
+
+    shown = set()
+    seen = 0
+    while True:
+        results = dict(job.results)
+        if STAGE_STATISTICS in results and STAGE_STATISTICS not in shown:
+            with messages:
+                for message in job.messages:
+                    st.warning(message)
+            with statistics:
+                show_statistics(results[STAGE_STATISTICS])
+            with details:
+                show_details(results[STAGE_STATISTICS]["relations"])
+            shown.add(STAGE_STATISTICS)
+        if STAGE_AGM_BOUND in results and STAGE_AGM_BOUND not in shown:
+            with quantities:
+                show_quantities(results[STAGE_RHO_STAR], results[STAGE_TAU_STAR], results[STAGE_AGM_BOUND])
+            with interpretation:
+                show_interpretation(results[STAGE_RHO_STAR] * results[STAGE_TAU_STAR],
+                                    results[STAGE_STATISTICS]["vertex_count"])
+            shown.add(STAGE_AGM_BOUND)
+        elif STAGE_RHO_STAR in results and STAGE_RHO_STAR not in shown:
+            with quantities:
+                st.caption(f"ρ* = {results[STAGE_RHO_STAR]:.6f}; solving τ*…")
+            shown.add(STAGE_RHO_STAR)
+        if STAGE_VISUALIZATION in results and STAGE_VISUALIZATION not in shown:
+            with figure:
+                show_visualization(results[STAGE_VISUALIZATION])
+                if results[STAGE_VISUALIZATION] is None:
+                    show_explorer(job.key, results[STAGE_STATISTICS]["relations"])
+            shown.add(STAGE_VISUALIZATION)
+
+        if job.done:
+            progress.empty()
+            if job.error:
+                st.error(job.error)
+            return
+        next_stage = STAGES[min(len(results), len(STAGES) - 1)]
+        progress.progress(job.progress, text=f"Computing {STAGE_LABELS[next_stage]}")
+        seen = job.wait(seen, timeout=0.5)
+
+
+STAGE_LABELS = {
+    STAGE_STATISTICS: "hypergraph statistics",
+    STAGE_RHO_STAR: "the fractional edge cover ρ*",
+    STAGE_TAU_STAR: "the fractional edge packing τ*",
+    STAGE_AGM_BOUND: "the AGM bound",
+    STAGE_VISUALIZATION: "the visualization",
+}
+
+
+def show_statistics(statistics: dict):
+    st.subheader("📊 Analysis Results")
+    columns = st.columns(3)
+    columns[0].metric("Number of Vertices (|V|)", statistics["vertex_count"])
+    columns[1].metric("Number of Edges (|E|)", statistics["edge_count"])
+    columns[2].metric("Hypergraph Rank", statistics["rank"])
+
+
+def show_quantities(rho_star: float, tau_star: float, agm_bound: float):
+    product = rho_star * tau_star
+    results_df = pd.DataFrame({
+        "Item": [
+            "Fractional Edge Cover (ρ*)",
+            "Fractional Edge Packing (τ*)",
+            "AGM Bound",
+            "ρ* × τ*"
+        ],
+        "Value": [
+            f"{rho_star:.6f}",
+            f"{tau_star:.6f}",
+            f"{agm_bound:.6f}",
+            f"{product:.6f}"
+        ]
+    })
+    st.dataframe(results_df, use_container_width=True)
+
+
+def show_interpretation(product: float, vertex_count: int):
+    st.subheader("📈 Interpretation")
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.metric(
+            label="Verification: ρ* × τ* ≤ |V|",
+            value=f"{product:.3f} ≤ {vertex_count}",
+            delta=f"Difference: {vertex_count - product:.3f}"
+        )
+    
+    with col2:
+        ratio = product / vertex_count if vertex_count > 0 else 0
+        st.metric(
+            label="Ratio (ρ* × τ*) / |V|",
+            value=f"{ratio:.3f}",
+            delta=f"{(1-ratio)*100:.1f}% margin"
+        )
+
+
+def show_visualization(visualization):
+    st.subheader("🎨 Hypergraph Visualization")
+    if visualization:
+        with instrumentation.span("render"):
+            st.plotly_chart(visualization, use_container_width=True)
+    else:
+        st.info("Visualization skipped for a query of this size")
+
+
+def show_explorer(key: str, relations):
+    """Neighbourhood views for queries too large to draw whole; kept in the session across reruns"""
+    state = st.session_state.get("explorer")
+    if state is None or state[0] != key:
+        hypergraph = Hypergraph()
+        hypergraph.from_relations(relations)
+        state = st.session_state["explorer"] = (key, NeighbourhoodExplorer(hypergraph))
+    explorer = state[1]
+
+    st.markdown("Explore the hypergraph one neighbourhood at a time:")
+    columns = st.columns(3)
+    start = columns[0].radio("Start from", ["Vertex", "Relation"], key="explore_start")
+    if start == "Vertex":
+        vertex = columns[1].text_input("Vertex", value=explorer.names[0], key="explore_vertex")
+        relation = None
+    else:
+        vertex = None
+        relation = int(columns[1].number_input("Relation index", min_value=0, max_value=len(relations) - 1,
+                                               value=0, key="explore_relation"))
+    hops = int(columns[2].number_input("Hops", min_value=1, max_value=5, value=1, key="explore_hops"))
+    expand_vertex = st.text_input("Vertex to expand", key="explore_expand")
+    buttons = st.columns(2)
+    try:
+        if buttons[0].button("Show neighbourhood"):
+            explorer.focus(vertex=vertex, relation=relation, hops=hops)
+        if buttons[1].button("Expand") and expand_vertex:
+            explorer.expand(expand_vertex, hops=hops)
+    except ValueError as e:
+        st.error(str(e))
+
+    if explorer.figure is not None:
+        if explorer.truncated:
+            st.info(f"The neighbourhood was cut off at {explorer.max_vertices} vertices")
+        with instrumentation.span("render"):
+            st.plotly_chart(explorer.figure, use_container_width=True)
+
+
+def show_details(relations):
+    st.subheader("🔍 Query Details")
+    relations_df = pd.DataFrame({
+        "Relation Name": [rel[0] for rel in relations],
+        "Arguments": [", ".join(rel[1]) for rel in relations],
+        "Arity": [len(rel[1]) for rel in relations]
+    })
+    st.dataframe(relations_df, use_container_width=True)
+
+
+def corpus_mode():
+    st.subheader("📚 Corpus Upload")
+    st.markdown("One atom per line; separate queries with a blank line. Lines starting with `#` are ignored.")
+    uploaded = st.file_uploader("Query corpus", type=["txt", "dl", "datalog"])
+
+    if uploaded is not None and st.button("Analyze Corpus"):
+        queries = read_corpus(uploaded.getvalue())
+        if not queries:
+            st.error("The file contains no queries")
+            return
+        progress = st.progress(0.0, text=f"Analyzing {len(queries):,} queries")
+        analyses = []
+        step = max(1, len(queries) // 100)
+        with HighsModelPool(store=result_store()) as pool:
+            for analysis in pool.imap(queries):
+                analyses.append(analysis)
+                if len(analyses) % step == 0:
+                    progress.progress(len(analyses) / len(queries),
+                                      text=f"Analyzed {len(analyses):,} of {len(queries):,} queries")
+        progress.empty()
+        st.session_state["corpus"] = results_frame(analyses)
+
+    frame = st.session_state.get("corpus")
+    if frame is not None:
+        show_corpus(frame)
+
+
+def show_corpus(frame: pd.DataFrame):
+    failed = int(frame["error"].notna().sum())
+    columns = st.columns(3)
+    columns[0].metric("Queries", f"{len(frame):,}")
+    columns[1].metric("Analyzed", f"{len(frame) - failed:,}")
+    columns[2].metric("Failed", f"{failed:,}")
+
+    st.subheader("📊 Results")
+    controls = st.columns(4)
+    sort_by = controls[0].selectbox("Sort by", ["(input order)", *NUMERIC_COLUMNS])
+    ascending = controls[1].radio("Order", ["Ascending", "Descending"]) == "Ascending"
+    size = controls[2].selectbox("Rows per page", [25, 50, 100, 500], index=1)
+    number = controls[3].number_input("Page", min_value=1, max_value=page_count(frame, size), value=1)
+    rows = page(frame, number - 1, size, None if sort_by == "(input order)" else sort_by, ascending)
+    st.dataframe(rows, use_container_width=True)
+
+    st.subheader("📈 Distributions")
+    charts = st.columns(2)
+    for chart, (column, counts) in zip(charts, histograms(frame).items()):
+        with chart:
+            st.markdown("ρ*" if column == "rho_star" else "τ*")
+            st.bar_chart(counts, x="bin", y="count")
+    st.dataframe(summary(frame), use_container_width=True)
+
+
+def show_performance_panel(before: Optional[dict] = None):
+    """Metrics recorded since the ``before`` snapshot (all of them without one); the export is process-wide"""
+    st.subheader("⏱️ Performance")
+    metrics = instrumentation.snapshot()
+    if before is not None:
+        metrics = instrumentation.difference(before, metrics)
+    if metrics["spans"]:
+        st.dataframe(pd.DataFrame([
+            {"Stage": name, "Calls": stats["count"], "Total (ms)": stats["total"] * 1000,
+             "Mean (ms)": stats["mean"] * 1000}
+            for name, stats in metrics["spans"].items()
+        ]), use_container_width=True)
+    if metrics["values"]:
+        st.dataframe(pd.DataFrame([
+            {"Measure": name, "Last": stats["last"], "Mean": stats["mean"], "Observations": stats["count"]}
+            for name, stats in metrics["values"].items()
+        ]), use_container_width=True)
+    if metrics["counters"]:
+        st.dataframe(pd.DataFrame([
+            {"Counter": name, "Value": value} for name, value in metrics["counters"].items()
+        ]), use_container_width=True)
+    with st.expander("Prometheus export"):
+        st.code(instrumentation.to_prometheus(), language="text")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,123 @@
+from typing import NamedTuple, Tuple
+
+import numpy as np
+
+from .hypergraph import Hypergraph
+
+
+class ApproximateResult(NamedTuple):
+    lower: float
+    upper: float
+    # Feasible edge weights attaining the primal side of the bracket
+    weights: np.ndarray
+    iterations: int
+    converged: bool
+
+    @property
+    def value(self) -> float:
+        return (self.lower + self.upper) / 2
+
+
+class ApproximateSolver:
+    """(1 ± ε) estimates of ρ* and τ* by multiplicative weights (Garg–Könemann style).
+
+    Works on the edge-major CSR incidence (``offsets``, ``vertex_ids``) and
+    its vertex-major transpose, so every iteration is a handful of NumPy
+    segment reductions over the nnz entries. Both LPs are solved as packing
+    problems: τ* directly, ρ* through its dual (fractional vertex packing).
+    Bounds are certified by rescaling the iterates to feasibility, whether
+    or not the run converged.
+    """
+
+    def __init__(self, offsets: np.ndarray, vertex_ids: np.ndarray, n_vertices: int):
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.vertex_ids = np.asarray(vertex_ids, dtype=np.int64)
+        self.n_vertices = n_vertices
+        self.n_edges = len(self.offsets) - 1
+
+        order = np.argsort(self.vertex_ids, kind='stable')
+        degrees = np.bincount(self.vertex_ids, minlength=n_vertices)
+        self.vertex_offsets = np.concatenate([[0], np.cumsum(degrees)]).astype(np.int64)
+        self.edge_ids = np.repeat(np.arange(self.n_edges), np.diff(self.offsets))[order]
+
+    @classmethod
+    def from_hypergraph(cls, hypergraph: Hypergraph) -> "ApproximateSolver":
+        offsets, vertex_ids = hypergraph.get_incidence_arrays()
+        return cls(offsets, vertex_ids, hypergraph.get_vertex_count())
+
+    def edge_cover(self, epsilon: float = 0.05, max_iterations: int = 20000) -> ApproximateResult:
+        if self.n_vertices == 0 or self.n_edges == 0:
+            return ApproximateResult(0.0, 0.0, np.zeros(self.n_edges), 0, True)
+        # Packing over vertices (columns) under one row per edge; its lengths
+        # live on the edges and rescale into a feasible cover.
+        lower, upper, _, cover, iterations, converged = _packing(
+            self.vertex_offsets, self.edge_ids, self.offsets, self.vertex_ids, epsilon, max_iterations)
+        return ApproximateResult(lower, upper, cover, iterations, converged)
+
+    def edge_packing(self, epsilon: float = 0.05, max_iterations: int = 20000) -> ApproximateResult:
+        if self.n_vertices == 0 or self.n_edges == 0:
+            return ApproximateResult(0.0, 0.0, np.zeros(self.n_edges), 0, True)
+        lower, upper, packing, _, iterations, converged = _packing(
+            self.offsets, self.vertex_ids, self.vertex_offsets, self.edge_ids, epsilon, max_iterations)
+        return ApproximateResult(lower, upper, packing, iterations, converged)
+
+
+def _packing(col_offsets: np.ndarray, col_rows: np.ndarray, row_offsets: np.ndarray, row_cols: np.ndarray,
+             epsilon: float, max_iterations: int, check_every: int = 5
+             ) -> Tuple[float, float, np.ndarray, np.ndarray, int, bool]:
+    """max 1·x s.t. M x <= 1, x >= 0 with M given column-major and row-major.
+
+    Returns (lower, upper, feasible x, feasible dual y with M^T y >= 1,
+    iterations, converged).
+    """
+    if not 0 < epsilon < 1:
+        raise ValueError("epsilon must be in (0, 1)")
+    n_rows = len(row_offsets) - 1
+    n_cols = len(col_offsets) - 1
+    step = np.log1p(epsilon)
+
+    # Row lengths are kept in log space and renormalised every iteration:
+    # the dual bound y.sum() / min length is scale-invariant.
+    log_lengths = np.zeros(n_rows)
+    x = np.zeros(n_cols)
+    lower, upper = 0.0, np.inf
+    best_x, best_y = x.copy(), np.zeros(n_rows)
+    converged = False
+    iteration = 0
+    for iteration in range(1, max_iterations + 1):
+        y = np.exp(log_lengths - log_lengths.max())
+        column_lengths = _segment(np.add, y[col_rows], col_offsets)
+        alpha = column_lengths.min()
+        if y.sum() / alpha < upper:
+            upper = y.sum() / alpha
+            best_y = y / alpha
+
+        # Augment every column within (1 + ε) of the shortest. Each column
+        # steps by 1 / (largest load among its rows), so no row's length
+        # grows by more than a factor (1 + ε) per iteration.
+        selected = column_lengths <= (1 + epsilon) * alpha
+        load = _segment(np.add, selected[row_cols].astype(float), row_offsets)
+        inverse_load = 1.0 / np.maximum(load, 1.0)
+        steps = np.where(selected, _segment(np.minimum, inverse_load[col_rows], col_offsets), 0.0)
+        x += steps
+        log_lengths += step * _segment(np.add, steps[row_cols], row_offsets)
+
+        if iteration % check_every == 0 or iteration == max_iterations:
+            scale = _segment(np.add, x[row_cols], row_offsets).max()
+            if x.sum() / scale > lower:
+                lower = x.sum() / scale
+                best_x = x / scale
+            if upper <= (1 + epsilon) * lower:
+                converged = True
+                break
+    return lower, upper, best_x, best_y, iteration, converged
+
+
+def _segment(ufunc: np.ufunc, values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """ufunc.reduceat over CSR segments; empty segments reduce to 0"""
+    starts = offsets[:-1]
+    if len(values) == 0:
+        return np.zeros(len(starts))
+    result = ufunc.reduceat(values, np.minimum(starts, len(values) - 1))
+    result[starts == offsets[1:]] = 0
+    return result
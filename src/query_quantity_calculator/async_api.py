@@ -0,0 +1,251 @@
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from . import lp
+from .backends import (
+    CombinatorialBackend, DualSimplexBackend, InteriorPointBackend, LPBackend, LPProblem, PersistentHighsBackend,
+    default_selector
+)
+from .batch import build_hypergraph
+from .hypergraph import Hypergraph
+from .solver import QuerySolver
+from .store import ResultStore, StoredResult, hypergraph_key
+from .threshold import ThresholdDecider
+
+
+class AsyncAnalysis(NamedTuple):
+    query: str
+    vertex_count: int
+    edge_count: int
+    rank: int
+    # None until solved; the bounds bracket the value meanwhile
+    rho_star: Optional[float]
+    tau_star: Optional[float]
+    agm_bound: Optional[float]
+    rho_bounds: Tuple[float, float]
+    tau_bounds: Tuple[float, float]
+    # False when the time budget ran out first
+    complete: bool
+    elapsed: float
+    error: Optional[str] = None
+
+
+class BudgetExceeded(RuntimeError):
+    pass
+
+
+# A solve failing this close to the deadline is taken as having hit its time limit
+_DEADLINE_SLACK = 0.05
+
+
+def packing_bounds(hypergraph: Hypergraph) -> Tuple[float, float]:
+    """Cheap (lower, upper) bounds on τ*.
+
+    x_e = min over v in e of 1/deg(v) is a feasible packing, and
+    y_v = max over e containing v of 1/|e| a feasible fractional vertex cover.
+    """
+    offsets, vertex_ids = hypergraph.get_incidence_arrays()
+    n_vertices = hypergraph.get_vertex_count()
+    if n_vertices == 0:
+        return 0.0, 0.0
+    sizes = np.diff(offsets)
+    edge_of_entry = np.repeat(np.arange(len(sizes)), sizes)
+    degrees = np.bincount(vertex_ids, minlength=n_vertices)
+    packing = np.full(len(sizes), np.inf)
+    np.minimum.at(packing, edge_of_entry, 1.0 / degrees[vertex_ids])
+    cover = np.zeros(n_vertices)
+    np.maximum.at(cover, vertex_ids, (1.0 / sizes)[edge_of_entry])
+    return float(packing.sum()), float(cover.sum())
+
+
+_local = threading.local()
+
+
+def _interruptible_backend() -> PersistentHighsBackend:
+    """This worker thread's Highs model, interrupted when its current job is cancelled"""
+    backend = getattr(_local, "backend", None)
+    if backend is None:
+        highs = lp.highspy.Highs()
+        highs.silent()
+
+        def interrupt(event):
+            job = getattr(_local, "job", None)
+            if job is not None and job.cancelled.is_set():
+                event.interrupt()
+
+        highs.cbSimplexInterrupt += interrupt
+        highs.cbIpmInterrupt += interrupt
+        backend = _local.backend = PersistentHighsBackend(highs)
+    return backend
+
+
+class _BudgetedBackend(LPBackend):
+    """Gives every LP the job's remaining time as its HiGHS time_limit"""
+
+    name = "budgeted"
+
+    def __init__(self, job: "_Job"):
+        self.job = job
+        self.combinatorial = CombinatorialBackend()
+
+    def _backend(self, problem: LPProblem) -> LPBackend:
+        if self.combinatorial.supports(problem):
+            return self.combinatorial
+        remaining = self.job.remaining()
+        if remaining == math.inf:
+            remaining = None
+        if problem.nnz >= default_selector().thresholds.ipm_min_nnz:
+            return InteriorPointBackend(remaining)
+        if lp.highspy is None:
+            return DualSimplexBackend(remaining)
+        backend = _interruptible_backend()
+        backend.time_limit = remaining
+        return backend
+
+    def _solve(self, problem: LPProblem, cover: bool) -> Tuple[float, np.ndarray]:
+        backend = self._backend(problem)
+        try:
+            return backend.edge_cover_solution(problem) if cover else backend.edge_packing_solution(problem)
+        except RuntimeError as e:
+            if self.job.cancelled.is_set() or self.job.deadline - time.monotonic() < _DEADLINE_SLACK:
+                raise BudgetExceeded("Time budget exceeded") from e
+            raise
+
+    def edge_cover_solution(self, problem: LPProblem) -> Tuple[float, np.ndarray]:
+        return self._solve(problem, True)
+
+    def edge_packing_solution(self, problem: LPProblem) -> Tuple[float, np.ndarray]:
+        return self._solve(problem, False)
+
+
+class _Job:
+    """One analysis on a worker thread; ``partial`` always holds the latest progress"""
+
+    def __init__(self, query_text: str, deadline: float, store: Optional[ResultStore]):
+        self.query_text = query_text
+        self.deadline = deadline
+        self.store = store
+        self.start = time.monotonic()
+        self.cancelled = threading.Event()
+        self.partial = AsyncAnalysis(query_text, 0, 0, 0, None, None, None, (0.0, math.inf), (0.0, math.inf),
+                                     False, 0.0)
+
+    def remaining(self) -> float:
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0 or self.cancelled.is_set():
+            raise BudgetExceeded("Time budget exceeded")
+        return remaining
+
+    def result(self) -> AsyncAnalysis:
+        return self.partial._replace(elapsed=time.monotonic() - self.start)
+
+    def _update(self, **fields):
+        self.partial = self.partial._replace(**fields)
+
+    def run(self) -> AsyncAnalysis:
+        _local.job = self
+        try:
+            self._run()
+        except BudgetExceeded:
+            pass
+        except (ValueError, RuntimeError) as e:
+            self._update(error=str(e))
+        finally:
+            _local.job = None
+        return self.result()
+
+    def _run(self):
+        hypergraph = build_hypergraph(self.query_text)
+        key = hypergraph_key(hypergraph) if self.store is not None else None
+        stored = self.store.get(key) if key is not None else None
+        if stored is not None:
+            self._finish(stored)
+            return
+        decider = ThresholdDecider(hypergraph)
+        solver = QuerySolver(hypergraph, backend=_BudgetedBackend(self))
+        self._update(vertex_count=hypergraph.get_vertex_count(), edge_count=hypergraph.get_edge_count(),
+                     rank=hypergraph.get_rank(), agm_bound=solver.compute_agm_bound(),
+                     rho_bounds=(decider.even_split_lower_bound(), decider.degree_split_upper_bound()),
+                     tau_bounds=packing_bounds(hypergraph))
+        rho_star, cover_weights = solver.fractional_edge_cover_solution()
+        self._update(rho_star=rho_star, rho_bounds=(rho_star, rho_star))
+        tau_star, packing_weights = solver.fractional_edge_packing_solution()
+        result = StoredResult(self.partial.vertex_count, self.partial.edge_count, self.partial.rank, rho_star,
+                              tau_star, self.partial.agm_bound, cover_weights, packing_weights)
+        if key is not None:
+            self.store.put(key, result)
+        self._finish(result)
+
+    def _finish(self, result: StoredResult):
+        self._update(vertex_count=result.vertex_count, edge_count=result.edge_count, rank=result.rank,
+                     rho_star=result.rho_star, tau_star=result.tau_star, agm_bound=result.agm_bound,
+                     rho_bounds=(result.rho_star, result.rho_star), tau_bounds=(result.tau_star, result.tau_star),
+                     complete=True)
+
+
+class AsyncQueryAnalyzer:
+    """asyncio front end running analyses on a bounded thread pool.
+
+    At most ``max_concurrency`` analyses run at once; further calls wait
+    for a slot. Each call has a time budget that covers the wait and is
+    handed to HiGHS as ``time_limit``. When it runs out the call returns
+    what is known so far (counts, ρ*/τ* bounds, any solved value) with
+    ``complete=False``. Cancelling a call interrupts its running solve.
+    """
+
+    def __init__(self, max_concurrency: int = 4, timeout: Optional[float] = None,
+                 store: Optional[ResultStore] = None):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="qqc-async")
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def analyze(self, query_text: str, timeout: Optional[float] = None) -> AsyncAnalysis:
+        timeout = self.timeout if timeout is None else timeout
+        deadline = math.inf if timeout is None else time.monotonic() + timeout
+        job = _Job(query_text, deadline, self.store)
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), _seconds_left(deadline))
+        except asyncio.TimeoutError:
+            return job.result()
+        try:
+            future = loop.run_in_executor(self._executor, job.run)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        # The slot is held until the worker thread is really done, not just until we stop waiting
+        future.add_done_callback(lambda _: self._semaphore.release())
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), _seconds_left(deadline))
+        except asyncio.TimeoutError:
+            job.cancelled.set()
+            return job.result()
+        except asyncio.CancelledError:
+            job.cancelled.set()
+            raise
+
+    async def analyze_many(self, queries: Iterable[str], timeout: Optional[float] = None) -> List[AsyncAnalysis]:
+        return list(await asyncio.gather(*(self.analyze(query_text, timeout) for query_text in queries)))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> "AsyncQueryAnalyzer":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+def _seconds_left(deadline: float) -> Optional[float]:
+    return None if deadline == math.inf else max(deadline - time.monotonic(), 0.0)
@@ -0,0 +1,509 @@
+import json
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from . import instrumentation, lp
+from .approximate import ApproximateSolver
+from .hypergraph import Hypergraph
+
+if TYPE_CHECKING:
+    from scipy.sparse import csc_matrix
+
+# scipy is imported on first use only: graphs up to this many vertices are
+# matched in pure Python, and small LPs go to highspy directly
+SMALL_GRAPH_VERTICES = 256
+# calibrate() times the |E|/|V| crossover on instances up to this nnz
+SHAPE_CALIBRATION_MAX_NNZ = 30000
+
+
+class LPProblem:
+    """The incidence structure shared by the ρ* and τ* LPs of one hypergraph"""
+
+    def __init__(self, offsets: np.ndarray, vertex_ids: np.ndarray, n_vertices: int):
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.vertex_ids = np.asarray(vertex_ids, dtype=np.int64)
+        self.n_vertices = n_vertices
+        self.n_edges = len(self.offsets) - 1
+        self.nnz = len(self.vertex_ids)
+        self.edge_sizes = np.diff(self.offsets)
+        self.rank = int(self.edge_sizes.max()) if self.n_edges else 0
+        self._matrix = None
+
+    @classmethod
+    def from_hypergraph(cls, hypergraph: Hypergraph) -> "LPProblem":
+        offsets, vertex_ids = hypergraph.get_incidence_arrays()
+        return cls(offsets, vertex_ids, hypergraph.get_vertex_count())
+
+    def matrix(self) -> "csc_matrix":
+        """Vertices x edges incidence matrix"""
+        if self._matrix is None:
+            from scipy.sparse import csc_matrix
+            self._matrix = csc_matrix((np.ones(self.nnz), self.vertex_ids, self.offsets),
+                                      shape=(self.n_vertices, self.n_edges))
+        return self._matrix
+
+    def csc(self) -> lp.CSC:
+        """The incidence matrix as bare CSC arrays, without scipy"""
+        return lp.CSC(np.ones(self.nnz), self.vertex_ids, self.offsets, (self.n_vertices, self.n_edges))
+
+    def max_degree(self) -> int:
+        return int(np.bincount(self.vertex_ids, minlength=self.n_vertices).max()) if self.nnz else 0
+
+
+class LPBackend:
+    """Solves the fractional edge cover and packing LPs of an LPProblem.
+
+    Subclasses implement the ``*_solution`` methods, which return the
+    objective together with the edge weights attaining it.
+    """
+
+    name = "base"
+    # Approximate backends return the feasible side of a (1 ± ε) bracket
+    exact = True
+
+    def supports(self, problem: LPProblem) -> bool:
+        return True
+
+    def edge_cover_solution(self, problem: LPProblem) -> Tuple[float, np.ndarray]:
+        raise NotImplementedError
+
+    def edge_packing_solution(self, problem: LPProblem) -> Tuple[float, np.ndarray]:
+        raise NotImplementedError
+
+    def edge_cover_certificate(self, problem: LPProblem) -> Tuple[float, np.ndarray, Optional[np.ndarray]]:
+        """(ρ*, edge weights, optimal fractional vertex packing); the last is None if the backend has no duals"""
+        return self.edge_cover_solution(problem) + (None,)
+
+    def edge_packing_certificate(self, problem: LPProblem) -> Tuple[float, np.ndarray, Optional[np.ndarray]]:
+        """(τ*, edge weights, optimal fractional vertex cover); the last is None if the backend has no duals"""
+        return self.edge_packing_solution(problem) + (None,)
+
+    def edge_cover(self, problem: LPProblem) -> float:
+        return self.edge_cover_solution(problem)[0]
+
+    def edge_packing(self, problem: LPProblem) -> float:
+        return self.edge_packing_solution(problem)[0]
+
+
+class LinprogBackend(LPBackend):
+    def __init__(self, method: str, time_limit: Optional[float] = None):
+        self.method = method
+        self.name = method
+        # Seconds per solve; a solve that runs out raises RuntimeError
+        self.time_limit = time_limit
+
+    def _options(self) -> dict:
+        return {} if self.time_limit is None else {"time_limit": self.time_limit}
+
+    def edge_cover_certificate(self, problem: LPProblem) -> Tuple[float, np.ndarray, Optional[np.ndarray]]:
+        from scipy.optimize import linprog
+        result = linprog(np.ones(problem.n_edges), A_ub=-problem.matrix(), b_ub=-np.ones(problem.n_vertices),
+                         bounds=(0, None), method=self.method, options=self._options())
+        instrumentation.observe("lp_iterations", result.nit, backend=self.name)
+        if not result.success:
+            raise RuntimeError("Failed to solve fractional edge cover")
+        return result.fun, result.x, -result.ineqlin.marginals
+
+    def edge_packing_certificate(self, problem: LPProblem) -> Tuple[float, np.ndarray, Optional[np.ndarray]]:
+        from scipy.optimize import linprog
+        result = linprog(-np.ones(problem.n_edges), A_ub=problem.matrix(), b_ub=np.ones(problem.n_vertices),
+                         bounds=(0, None), method=self.method, options=self._options())
+        instrumentation.observe("lp_iterations", result.nit, backend=self.name)
+        if not result.success:
+            raise RuntimeError("Failed to solve fractional edge packing")
+        return -result.fun, result.x, -result.ineqlin.marginals
+
+    def edge_cover_solution(self, problem: LPProblem) -> Tuple[float, np.ndarray]:
+        return self.edge_cover_certificate(problem)[:2]
+
+    def edge_packing_solution(self, problem: LPProblem) -> Tuple[float, np.ndarray]:
+        return self.edge_packing_certificate(problem)[:2]
+
+
+class DualSimplexBackend(LinprogBackend):
+    def __init__(self, time_limit: Optional[float] = None):
+        super().__init__('highs-ds', time_limit)
+
+
+class InteriorPointBackend(LinprogBackend):
+    def __init__(self, time_limit: Optional[float] = None):
+        super().__init__('highs-ipm', time_limit)
+
+
+class PersistentHighsBackend(LPBackend):
+    """One highspy model reloaded with passModel per problem; cover and packing
+    of the same problem only swap costs and row bounds"""
+
+    name = "highs-persistent"
+
+    def __init__(self, highs=None, time_limit: Optional[float] = None):
+        if lp.highspy is None:
+            raise RuntimeError("highspy is not installed")
+        if highs is None:
+            highs = lp.highspy.Highs()
+            highs.silent()
+        self.highs = highs
+        # Seconds per solve; a solve that runs out raises RuntimeError
+        self.time_limit = time_limit
+        self._problem = None
+        self._lp = None
+
+    def _load(self, problem: LPProblem, cost: float, row_lower: float,
+              row_upper: float) -> Tuple[float, np.ndarray]:
+        costs = np.full(problem.n_edges, cost)
+        lower = np.full(problem.n_vertices, row_lower)
+        upper = np.full(problem.n_vertices, row_upper)
+        if problem is not self._problem:
+            instrumentation.count("cache_requests", cache="persistent_model", result="miss")
+            self._lp = lp.ReusableLP(problem.csc(), costs, lower, upper, highs=self.highs)
+            self._problem = problem
+        else:
+            instrumentation.count("cache_requests", cache="persistent_model", result="hit")
+            self._lp.set_cost(costs)
+            self._lp.set_row_bounds(lower, upper)
+        # HiGHS measures time_limit against the model's total run time, not this solve's
+        self.highs.setOptionValue(
+            "time_limit", np.inf if self.time_limit is None else self.highs.getRunTime() + self.time_limit)
+        value, x = self._lp.solve()
+        if value is None:
+            raise RuntimeError("LP is infeasible")
+        return value, x
+
+    def edge_cover_solution(self, problem: LPProblem) -> Tuple[float, np.ndarray]:
+        return self._load(problem, 1.0, 1.0, np.inf)
+
+    def edge_packing_solution(self, problem: LPProblem) -> Tuple[float, np.ndarray]:
+        value, x = self._load(problem, -1.0, -np.inf, 1.0)
+        return -value, x
+
+    def edge_cover_certificate(self, problem: LPProblem) -> Tuple[float, np.ndarray, Optional[np.ndarray]]:
+        value, x = self.edge_cover_solution(problem)
+        return value, x, self._lp.row_duals()
+
+    def edge_packing_certificate(self, problem: LPProblem) -> Tuple[float, np.ndarray, Optional[np.ndarray]]:
+        value, x = self.edge_packing_solution(problem)
+        return value, x, -self._lp.row_duals()
+
+
+class CombinatorialBackend(LPBackend):
+    """Closed forms where the LP is not needed.
+
+    Vertex-disjoint edges give ρ* = τ* = |E|. For graphs (every edge has two
+    vertices) τ* is half the maximum matching of the bipartite double cover
+    and ρ* = |V| - τ* by the fractional Gallai identity: topping up every
+    vertex's deficit under the optimal packing on one incident edge gives
+    an optimal cover.
+    """
+
+    name = "combinatorial"
+
+    def supports(self, problem: LPProblem) -> bool:
+        if problem.n_edges == 0:
+            return True
+        if problem.max_degree() <= 1:
+            return True
+        return bool((problem.edge_sizes == 2).all())
+
+    def _disjoint(self, problem: LPProblem) -> bool:
+        return problem.n_edges == 0 or problem.max_degree() <= 1
+
+    def _matching(self, problem: LPProblem) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(indptr, indices) of the bipartite double cover and a maximum matching in it"""
+        u = problem.vertex_ids[0::2]
+        v = problem.vertex_ids[1::2]
+        sources = np.concatenate([u, v])
+        targets = np.concatenate([v, u])
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(sources, minlength=problem.n_vertices))])
+        indices = targets[np.argsort(sources, kind="stable")]
+        if problem.n_vertices <= SMALL_GRAPH_VERTICES:
+            return indptr, indices, _augmenting_path_matching(indptr, indices)
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.csgraph import maximum_bipartite_matching
+        adjacency = csr_matrix((np.ones(len(sources)), (sources, targets)),
+                               shape=(problem.n_vertices, problem.n_vertices))
+        return indptr, indices, maximum_bipartite_matching(adjacency, perm_type='column')
+
+    def _graph_packing(self, problem: LPProblem) -> Tuple[float, np.ndarray]:
+        u = problem.vertex_ids[0::2]
+        v = problem.vertex_ids[1::2]
+        _, _, matching = self._matching(problem)
+        # Each matched (row, column) pair puts 1/2 on the first edge joining them
+        pairs, first_edge = np.unique(np.minimum(u, v) * problem.n_vertices + np.maximum(u, v), return_index=True)
+        rows = np.flatnonzero(matching >= 0)
+        cols = matching[rows]
+        matched = np.searchsorted(pairs, np.minimum(rows, cols) * problem.n_vertices + np.maximum(rows, cols))
+        weights = np.zeros(problem.n_edges)
+        np.add.at(weights, first_edge[matched], 0.5)
+        return len(rows) / 2, weights
+
+    def _graph_vertex_cover(self, problem: LPProblem) -> np.ndarray:
+        """Minimum fractional vertex cover of a graph: half the König cover of its double cover.
+
+        Left copies reachable from an unmatched left copy by alternating paths
+        are outside the König cover, right copies reached are inside.
+        """
+        indptr, indices, matching = self._matching(problem)
+        matched_row = np.full(problem.n_vertices, -1)
+        rows = np.flatnonzero(matching >= 0)
+        matched_row[matching[rows]] = rows
+        left = matching < 0
+        right = np.zeros(problem.n_vertices, dtype=bool)
+        frontier = np.flatnonzero(left)
+        while len(frontier):
+            starts = indptr[frontier]
+            counts = indptr[frontier + 1] - starts
+            positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            reached = indices[positions]
+            reached = np.unique(reached[~right[reached]])
+            right[reached] = True
+            frontier = matched_row[reached]
+            frontier = frontier[~left[frontier]]
+            left[frontier] = True
+        return ((~left).astype(float) + right) / 2
+
+    def _disjoint_dual(self, problem: LPProblem) -> np.ndarray:
+        # One vertex per edge, which is both a vertex packing and a vertex cover
+        dual = np.zeros(problem.n_vertices)
+        dual[problem.vertex_ids[problem.offsets[:-1][problem.edge_sizes > 0]]] = 1.0
+        return dual
+
+    def edge_cover_solution(self, problem: LPProblem) -> Tuple[float, np.ndarray]:
+        if self._disjoint(problem):
+            return float(problem.n_edges), np.ones(problem.n_edges)
+        tau_star, weights = self._graph_packing(problem)
+        load = np.bincount(problem.vertex_ids, weights=np.repeat(weights, 2), minlength=problem.n_vertices)
+        vertices, first_entry = np.unique(problem.vertex_ids, return_index=True)
+        np.add.at(weights, first_entry // 2, 1.0 - load[vertices])
+        return problem.n_vertices - tau_star, weights
+
+    def edge_packing_solution(self, problem: LPProblem) -> Tuple[float, np.ndarray]:
+        if self._disjoint(problem):
+            return float(problem.n_edges), np.ones(problem.n_edges)
+        return self._graph_packing(problem)
+
+    def edge_cover_certificate(self, problem: LPProblem) -> Tuple[float, np.ndarray, Optional[np.ndarray]]:
+        value, weights = self.edge_cover_solution(problem)
+        if self._disjoint(problem):
+            return value, weights, self._disjoint_dual(problem)
+        # y_u + y_v <= 1 exactly when 1 - y is a vertex cover
+        return value, weights, 1.0 - self._graph_vertex_cover(problem)
+
+    def edge_packing_certificate(self, problem: LPProblem) -> Tuple[float, np.ndarray, Optional[np.ndarray]]:
+        value, weights = self.edge_packing_solution(problem)
+        if self._disjoint(problem):
+            return value, weights, self._disjoint_dual(problem)
+        return value, weights, self._graph_vertex_cover(problem)
+
+
+def _augmenting_path_matching(indptr: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """Maximum bipartite matching by breadth-first augmenting paths, for small graphs.
+
+    Same result layout as scipy's ``maximum_bipartite_matching``: the column
+    matched to each row, or -1.
+    """
+    indptr = indptr.tolist()
+    indices = indices.tolist()
+    n = len(indptr) - 1
+    row_match = [-1] * n
+    column_match = [-1] * n
+    for root in range(n):
+        reached_from = {}
+        queue = [root]
+        free = -1
+        for row in queue:
+            for column in indices[indptr[row]:indptr[row + 1]]:
+                if column in reached_from:
+                    continue
+                reached_from[column] = row
+                if column_match[column] < 0:
+                    free = column
+                    break
+                queue.append(column_match[column])
+            if free >= 0:
+                break
+        column = free
+        while column >= 0:
+            row = reached_from[column]
+            column_match[column], row_match[row], column = row, column, row_match[row]
+    return np.array(row_match, dtype=np.int64)
+
+
+class ApproximateBackend(LPBackend):
+    name = "approximate"
+    exact = False
+
+    def __init__(self, epsilon: float = 0.05):
+        self.epsilon = epsilon
+
+    def _solver(self, problem: LPProblem) -> ApproximateSolver:
+        return ApproximateSolver(problem.offsets, problem.vertex_ids, problem.n_vertices)
+
+    def edge_cover_solution(self, problem: LPProblem) -> Tuple[float, np.ndarray]:
+        result = self._solver(problem).edge_cover(self.epsilon)
+        instrumentation.observe("lp_iterations", result.iterations, backend=self.name)
+        return result.upper, result.weights
+
+    def edge_packing_solution(self, problem: LPProblem) -> Tuple[float, np.ndarray]:
+        result = self._solver(problem).edge_packing(self.epsilon)
+        instrumentation.observe("lp_iterations", result.iterations, backend=self.name)
+        return result.lower, result.weights
+
+
+class SelectionThresholds(NamedTuple):
+    # Below this nnz the fixed setup cost of linprog dominates: use a persistent model
+    persistent_max_nnz: int = 5000
+    # From this nnz on interior point beats dual simplex
+    ipm_min_nnz: int = 2000000
+    # From this nnz on the approximate solver is used, if approximation is allowed
+    approximate_min_nnz: int = 2000000
+    # Dual simplex slows down sharply when edges outnumber vertices: from this
+    # |E|/|V| on, and from ipm_shape_min_nnz on, interior point is used
+    ipm_min_edge_ratio: float = 8.0
+    ipm_shape_min_nnz: int = 10000
+
+
+def save_thresholds(thresholds: SelectionThresholds, path: str):
+    with open(path, 'w') as f:
+        json.dump(thresholds._asdict(), f, indent=2)
+
+
+def load_thresholds(path: str) -> SelectionThresholds:
+    with open(path) as f:
+        return SelectionThresholds(**json.load(f))
+
+
+class BackendSelector:
+    """Picks a backend from |V|, |E|, nnz and rank: rank 2 (and disjoint edges) by
+    closed form, then by nnz, with interior point also for many edges per vertex"""
+
+    def __init__(self, thresholds: Optional[SelectionThresholds] = None, allow_approximate: bool = False,
+                 epsilon: float = 0.05):
+        self.thresholds = thresholds or SelectionThresholds()
+        self.allow_approximate = allow_approximate
+        self.combinatorial = CombinatorialBackend()
+        self.dual_simplex = DualSimplexBackend()
+        self.interior_point = InteriorPointBackend()
+        self.approximate = ApproximateBackend(epsilon)
+        # A Highs model must not be shared between threads: one per thread
+        self._local = threading.local()
+
+    def persistent(self) -> Optional[PersistentHighsBackend]:
+        if lp.highspy is None:
+            return None
+        backend = getattr(self._local, "persistent", None)
+        if backend is None:
+            backend = self._local.persistent = PersistentHighsBackend()
+        return backend
+
+    def select(self, problem: LPProblem) -> LPBackend:
+        if self.combinatorial.supports(problem):
+            return self.combinatorial
+        if self.allow_approximate and problem.nnz >= self.thresholds.approximate_min_nnz:
+            return self.approximate
+        if (problem.nnz >= self.thresholds.ipm_shape_min_nnz
+                and problem.n_edges >= self.thresholds.ipm_min_edge_ratio * problem.n_vertices):
+            return self.interior_point
+        if problem.nnz <= self.thresholds.persistent_max_nnz and self.persistent() is not None:
+            return self.persistent()
+        if problem.nnz >= self.thresholds.ipm_min_nnz:
+            return self.interior_point
+        return self.dual_simplex
+
+
+_default_selector: Optional[BackendSelector] = None
+
+
+def default_selector() -> BackendSelector:
+    global _default_selector
+    if _default_selector is None:
+        _default_selector = BackendSelector()
+    return _default_selector
+
+
+def set_default_thresholds(thresholds: SelectionThresholds):
+    global _default_selector
+    _default_selector = BackendSelector(thresholds)
+
+
+def calibrate(sizes: Optional[List[int]] = None, repeats: int = 3, seed: int = 0,
+              epsilon: float = 0.05, ratios: Optional[List[float]] = None) -> SelectionThresholds:
+    """Time the backends on random instances of growing nnz and place the
+    thresholds at the observed crossovers on this machine.
+
+    The |E|/|V| threshold comes from dual simplex against interior point over
+    ``ratios`` at the largest size up to SHAPE_CALIBRATION_MAX_NNZ (dual
+    simplex takes minutes beyond it on edge-heavy instances), and its nnz
+    floor from the sizes up to there at the largest ratio.
+    """
+    sizes = sizes or [30, 300, 3000, 30000, 300000]
+    ratios = ratios or [1, 2, 4, 8, 16, 32]
+    rng = np.random.default_rng(seed)
+    exact_backends: Dict[str, LPBackend] = {"ds": DualSimplexBackend(), "ipm": InteriorPointBackend()}
+    if lp.highspy is not None:
+        exact_backends["persistent"] = PersistentHighsBackend()
+    approximate = ApproximateBackend(epsilon)
+
+    def best_time(backend: LPBackend, problem: LPProblem) -> float:
+        best = np.inf
+        for _ in range(repeats):
+            start = time.perf_counter()
+            backend.edge_cover(problem)
+            backend.edge_packing(problem)
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    timings: Dict[str, List[float]] = {name: [] for name in list(exact_backends) + ["approximate"]}
+    for nnz in sizes:
+        problem = _calibration_problem(rng, nnz, 3.0)
+        for name, backend in list(exact_backends.items()) + [("approximate", approximate)]:
+            timings[name].append(best_time(backend, problem))
+
+    defaults = SelectionThresholds()
+    persistent_max = 0
+    if "persistent" in timings:
+        for nnz, persistent, ds in zip(sizes, timings["persistent"], timings["ds"]):
+            if persistent <= ds:
+                persistent_max = nnz
+    ipm_min = _first_lasting_win(sizes, timings["ipm"], timings["ds"], defaults.ipm_min_nnz)
+    best_exact = [min(times) for times in zip(timings["ds"], timings["ipm"])]
+    approximate_min = _first_lasting_win(sizes, timings["approximate"], best_exact, defaults.approximate_min_nnz)
+
+    shape_sizes = [nnz for nnz in sizes if nnz <= SHAPE_CALIBRATION_MAX_NNZ]
+    edge_ratio, shape_min = defaults.ipm_min_edge_ratio, defaults.ipm_shape_min_nnz
+    if shape_sizes:
+        problems = [_calibration_problem(rng, shape_sizes[-1], ratio) for ratio in ratios]
+        edge_ratio = _first_lasting_win(ratios, [best_time(exact_backends["ipm"], p) for p in problems],
+                                        [best_time(exact_backends["ds"], p) for p in problems], edge_ratio)
+        problems = [_calibration_problem(rng, nnz, ratios[-1]) for nnz in shape_sizes]
+        shape_min = _first_lasting_win(shape_sizes, [best_time(exact_backends["ipm"], p) for p in problems],
+                                       [best_time(exact_backends["ds"], p) for p in problems], shape_min)
+    return SelectionThresholds(persistent_max, ipm_min, approximate_min, edge_ratio, shape_min)
+
+
+def _calibration_problem(rng: np.random.Generator, nnz: int, edges_per_vertex: float) -> LPProblem:
+    """Arity 1-4 edges with skewed vertex popularity, as in real query logs"""
+    n_edges = max(nnz * 2 // 5, 1)
+    n_vertices = max(int(n_edges / edges_per_vertex), 4)
+    edge_sizes = rng.integers(1, 5, n_edges)
+    popularity = 1.0 / np.arange(1, n_vertices + 1) ** 0.8
+    vertex_ids = rng.choice(n_vertices, int(edge_sizes.sum()), p=popularity / popularity.sum())
+    # Drop repeated vertices within an edge, then renumber the used vertices
+    pairs = np.unique(np.repeat(np.arange(n_edges), edge_sizes) * n_vertices + vertex_ids)
+    edge_of_entry, vertex_ids = np.divmod(pairs, n_vertices)
+    used, vertex_ids = np.unique(vertex_ids, return_inverse=True)
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(edge_of_entry, minlength=n_edges))])
+    return LPProblem(offsets, vertex_ids, len(used))
+
+
+def _first_lasting_win(sizes: List[float], candidate: List[float], baseline: List[float], fallback: float) -> float:
+    """Smallest size from which the candidate is faster at every larger size"""
+    threshold = fallback
+    for i in reversed(range(len(sizes))):
+        if candidate[i] < baseline[i]:
+            threshold = sizes[i]
+        else:
+            break
+    return threshold
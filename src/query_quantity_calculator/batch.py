@@ -0,0 +1,219 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice, repeat
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .backends import BackendSelector, LPBackend, LPProblem, SelectionThresholds, default_selector
+from .hypergraph import Hypergraph
+from .parser import DatalogParser
+from .solver import QuerySolver
+from .store import ResultStore, StoredResult, hypergraph_key
+
+
+class QueryAnalysis(NamedTuple):
+    query: str
+    vertex_count: int
+    edge_count: int
+    rank: int
+    rho_star: float
+    tau_star: float
+    agm_bound: float
+    elapsed: float
+    error: Optional[str] = None
+
+
+class _SelectedBackend(LPBackend):
+    """Defers to a selector per problem, so each worker thread gets its own Highs model"""
+
+    name = "selected"
+
+    def __init__(self, selector: BackendSelector):
+        self.selector = selector
+
+    def edge_cover_solution(self, problem: LPProblem) -> Tuple[float, np.ndarray]:
+        return self.selector.select(problem).edge_cover_solution(problem)
+
+    def edge_packing_solution(self, problem: LPProblem) -> Tuple[float, np.ndarray]:
+        return self.selector.select(problem).edge_packing_solution(problem)
+
+
+def build_hypergraph(query_text: str) -> Hypergraph:
+    """Parse a query and build its hypergraph; ValueError if it has no relations"""
+    return _build(DatalogParser().parse_query(query_text))
+
+
+def _build(relations: Sequence[Tuple[str, Sequence[str]]]) -> Hypergraph:
+    if not relations:
+        raise ValueError("No valid query has been entered")
+    hypergraph = Hypergraph()
+    hypergraph.from_relations(relations)
+    return hypergraph
+
+
+def _from_result(query_text: str, result: StoredResult, start: float) -> QueryAnalysis:
+    return QueryAnalysis(query_text, result.vertex_count, result.edge_count, result.rank, result.rho_star,
+                         result.tau_star, result.agm_bound, time.perf_counter() - start)
+
+
+def _failed(query_text: str, error: Exception, start: float) -> QueryAnalysis:
+    return QueryAnalysis(query_text, 0, 0, 0, 0.0, 0.0, 0.0, time.perf_counter() - start, str(error))
+
+
+def analyze_query(query_text: str, backend: Optional[LPBackend] = None,
+                  store: Optional[ResultStore] = None) -> QueryAnalysis:
+    """Parse, build and solve one query; parse and solve failures are reported, not raised"""
+    start = time.perf_counter()
+    try:
+        solver = QuerySolver(build_hypergraph(query_text), backend=backend, store=store)
+        return _from_result(query_text, solver.analyze(), start)
+    except (ValueError, RuntimeError) as e:
+        return _failed(query_text, e, start)
+
+
+def analyze_hypergraph(hypergraph: Hypergraph, label: str = "", backend: Optional[LPBackend] = None,
+                       store: Optional[ResultStore] = None, start: Optional[float] = None) -> QueryAnalysis:
+    """The solve step of analyze_query; ``start`` is when the query's analysis began (now by default)"""
+    start = time.perf_counter() if start is None else start
+    try:
+        return _from_result(label, QuerySolver(hypergraph, backend=backend, store=store).analyze(), start)
+    except (ValueError, RuntimeError) as e:
+        return _failed(label, e, start)
+
+
+def failed_analysis(query_text: str, error: Exception, start: float) -> QueryAnalysis:
+    """The row reported for a query that could not be analyzed"""
+    return _failed(query_text, error, start)
+
+
+def analyze_relations(relations: Sequence[Tuple[str, Sequence[str]]], label: str = "",
+                      backend: Optional[LPBackend] = None, store: Optional[ResultStore] = None) -> QueryAnalysis:
+    """analyze_query for already tokenized relations; ``label`` stands in for the query text"""
+    start = time.perf_counter()
+    try:
+        solver = QuerySolver(_build(relations), backend=backend, store=store)
+        return _from_result(label, solver.analyze(), start)
+    except (ValueError, RuntimeError) as e:
+        return _failed(label, e, start)
+
+
+def _solve(query_text: str, hypergraph: Hypergraph, backend: LPBackend,
+           start: float) -> Tuple[QueryAnalysis, Optional[StoredResult]]:
+    try:
+        result = QuerySolver(hypergraph, backend=backend).analyze()
+        return _from_result(query_text, result, start), result
+    except (ValueError, RuntimeError) as e:
+        return _failed(query_text, e, start), None
+
+
+class HighsModelPool:
+    """Thread pool for batch analysis with one reusable highspy model per worker.
+
+    Every worker thread loads each query into its own ``highspy.Highs`` with
+    ``passModel``; HiGHS releases the GIL while solving, so threads scale
+    without the pickling and start-up costs of a process pool. Instances
+    that interior point handles better still go to ``highs-ipm``.
+
+    With a ``store``, each window of queries is parsed and looked up in one
+    bulk query first; only the misses are solved, and their results are
+    saved in one transaction.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, thresholds: Optional[SelectionThresholds] = None,
+                 store: Optional[ResultStore] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.store = store
+        thresholds = thresholds or default_selector().thresholds
+        # Persistent models for everything below the interior point range
+        self.selector = BackendSelector(thresholds._replace(
+            persistent_max_nnz=max(thresholds.persistent_max_nnz, thresholds.ipm_min_nnz - 1)))
+        self.backend = _SelectedBackend(self.selector)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="qqc-highs")
+
+    def analyze(self, query_text: str) -> QueryAnalysis:
+        return self._executor.submit(analyze_query, query_text, self.backend, self.store).result()
+
+    def imap(self, queries: Iterable[str], max_in_flight: Optional[int] = None) -> Iterator[QueryAnalysis]:
+        """Results in input order, keeping at most max_in_flight queries submitted at once"""
+        max_in_flight = max_in_flight or 4 * self.max_workers
+        if self.store is not None:
+            yield from self._imap_stored(((query_text, query_text) for query_text in queries), build_hypergraph,
+                                         max_in_flight)
+            return
+        yield from self._imap(analyze_query, ((query_text, self.backend) for query_text in queries), max_in_flight)
+
+    def imap_relations(self, relation_lists: Iterable[Sequence[Tuple[str, Sequence[str]]]],
+                       labels: Optional[Iterable[str]] = None,
+                       max_in_flight: Optional[int] = None) -> Iterator[QueryAnalysis]:
+        """imap over tokenized queries, skipping the text round trip through the parser"""
+        max_in_flight = max_in_flight or 4 * self.max_workers
+        labels = labels if labels is not None else repeat("")
+        if self.store is not None:
+            yield from self._imap_stored(zip(labels, relation_lists), _build, max_in_flight)
+            return
+        yield from self._imap(analyze_relations, ((relations, label, self.backend, self.store)
+                                                  for relations, label in zip(relation_lists, labels)), max_in_flight)
+
+    def _imap(self, function, arguments: Iterable[tuple], max_in_flight: int) -> Iterator[QueryAnalysis]:
+        pending = deque()
+        for args in arguments:
+            pending.append(self._executor.submit(function, *args))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def _imap_stored(self, items: Iterator[tuple], build: Callable[..., Hypergraph],
+                     window: int) -> Iterator[QueryAnalysis]:
+        """``items`` are (label, source) pairs and ``build(source)`` makes the hypergraph"""
+        while True:
+            chunk = list(islice(items, window))
+            if not chunk:
+                return
+            start = time.perf_counter()
+            entries: list = [None] * len(chunk)
+            built = {}
+            for i, (label, source) in enumerate(chunk):
+                try:
+                    built[i] = build(source)
+                except ValueError as e:
+                    entries[i] = _failed(label, e, start)
+            keys = {i: hypergraph_key(hypergraph) for i, hypergraph in built.items()}
+            # One lookup and at most one solve per distinct hypergraph; queries sharing it reuse the result
+            first = {}
+            for i, key in keys.items():
+                first.setdefault(key.digest, i)
+            stored = dict(zip(first, self.store.get_many([keys[i] for i in first.values()])))
+            submitted = {digest: self._executor.submit(_solve, chunk[i][0], built[i], self.backend, start)
+                         for digest, i in first.items() if stored[digest] is None}
+            solved = {digest: future.result() for digest, future in submitted.items()}
+            # Saved before anything is yielded, so a consumer that stops early loses nothing
+            self.store.put_many([(keys[first[digest]], result) for digest, (_, result) in solved.items()
+                                 if result is not None])
+            for i, key in keys.items():
+                if stored[key.digest] is not None:
+                    entries[i] = _from_result(chunk[i][0], stored[key.digest], start)
+                else:
+                    entries[i] = solved[key.digest][0]._replace(query=chunk[i][0])
+            yield from entries
+
+    def map(self, queries: Iterable[str]) -> List[QueryAnalysis]:
+        return list(self.imap(queries))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "HighsModelPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def analyze_queries(queries: Iterable[str], max_workers: Optional[int] = None,
+                    store: Optional[ResultStore] = None) -> List[QueryAnalysis]:
+    with HighsModelPool(max_workers, store=store) as pool:
+        return pool.map(queries)
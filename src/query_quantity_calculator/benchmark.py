@@ -0,0 +1,100 @@
+import json
+import platform
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from .generators import FAMILIES, generate, to_query
+from .hypergraph import Hypergraph
+from .parser import DatalogParser
+from .solver import QuerySolver
+
+STAGES = ("parse", "build", "rho_star", "tau_star", "visualization")
+
+
+class Regression(NamedTuple):
+    case: str
+    stage: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline > 0 else float("inf")
+
+
+def _best_of(repeats: int, stage: Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        stage()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def time_stages(query_text: str, repeats: int = 3, visualize: bool = True) -> Dict[str, float]:
+    """Best-of-``repeats`` seconds for each pipeline stage of one query"""
+    relations = DatalogParser().parse_query(query_text)
+    hypergraph = Hypergraph()
+    hypergraph.from_relations(relations)
+    solver = QuerySolver(hypergraph)
+    timings = {
+        "parse": _best_of(repeats, lambda: DatalogParser().parse_query(query_text)),
+        "build": _best_of(repeats, lambda: Hypergraph().from_relations(relations)),
+        "rho_star": _best_of(repeats, solver.solve_fractional_edge_cover),
+        "tau_star": _best_of(repeats, solver.solve_fractional_edge_packing),
+    }
+    if visualize:
+        timings["visualization"] = _best_of(repeats, hypergraph.create_visualization)
+    return timings
+
+
+def run_suite(families: Optional[Sequence[str]] = None, sizes: Sequence[int] = (10, 100, 1000),
+              repeats: int = 3, seed: int = 0, max_visualization_atoms: int = 1000,
+              progress: Optional[Callable[[str], None]] = None) -> dict:
+    """Time every stage on every family and size; keys are ``family/size``.
+
+    The spring layout of ``create_visualization`` is quadratic in |V|, so it
+    is only timed up to ``max_visualization_atoms``.
+    """
+    results = {}
+    for family in families or list(FAMILIES):
+        for size in sizes:
+            case = f"{family}/{size}"
+            if progress:
+                progress(case)
+            query_text = to_query(generate(family, size, seed))
+            results[case] = time_stages(query_text, repeats, visualize=size <= max_visualization_atoms)
+    return {
+        "meta": {"python": platform.python_version(), "machine": platform.machine(),
+                 "seed": seed, "repeats": repeats},
+        "results": results,
+    }
+
+
+def save_results(results: dict, path: str):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load_results(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.2, min_seconds: float = 1e-3) -> List[Regression]:
+    """Stages more than ``threshold`` slower than the baseline.
+
+    Stages under ``min_seconds`` in both runs are timer noise and never flagged.
+    Cases or stages missing from either run are skipped.
+    """
+    regressions = []
+    for case, stages in current["results"].items():
+        previous = baseline["results"].get(case)
+        if previous is None:
+            continue
+        for stage, seconds in stages.items():
+            if stage not in previous or max(seconds, previous[stage]) < min_seconds:
+                continue
+            if seconds > previous[stage] * (1 + threshold):
+                regressions.append(Regression(case, stage, previous[stage], seconds))
+    return regressions
@@ -0,0 +1,168 @@
+import time
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only needed for Parquet/Arrow input and output
+    pa = None
+    pc = None
+    pq = None
+
+from .batch import HighsModelPool, QueryAnalysis, failed_analysis
+from .corpus_stats import PackedCorpus, pack_tokens
+from .store import ResultStore
+
+# Result columns appended after the optional id column, in QueryAnalysis order
+RESULT_COLUMNS = ("vertex_count", "edge_count", "rank", "rho_star", "tau_star", "agm_bound", "elapsed", "error")
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("pyarrow is not installed")
+
+
+def result_schema(id_field=None) -> "pa.Schema":
+    fields = [id_field] if id_field is not None else []
+    fields += [
+        pa.field("vertex_count", pa.int64()),
+        pa.field("edge_count", pa.int64()),
+        pa.field("rank", pa.int64()),
+        pa.field("rho_star", pa.float64()),
+        pa.field("tau_star", pa.float64()),
+        pa.field("agm_bound", pa.float64()),
+        pa.field("elapsed", pa.float64()),
+        pa.field("error", pa.string()),
+    ]
+    return pa.schema(fields)
+
+
+def tokenized_relations(batch: "pa.RecordBatch", arguments_column: str, relations_column: Optional[str] = None
+                        ) -> List[Union[None, ValueError, List[Tuple[str, List[str]]]]]:
+    """Relations per row from list<list<string>> arguments and optional list<string> names.
+
+    The argument strings are converted once per batch and sliced by the
+    Arrow offsets; a null row gives None. A malformed row (names and
+    arguments of different lengths, or null names, atoms or variables) gives
+    a ValueError to report for that row. Without names, atoms are R0, R1, ...
+    """
+    arguments = batch.column(arguments_column)
+    atoms = arguments.values
+    atom_offsets = arguments.offsets.to_numpy()
+    atom_valid = atoms.is_valid().to_numpy(zero_copy_only=False)
+    value_offsets = atoms.offsets.to_numpy()
+    values = atoms.values.to_pylist()
+    names = None
+    if relations_column is not None:
+        relation_names = batch.column(relations_column)
+        names = relation_names.values.to_pylist()
+        name_offsets = relation_names.offsets.to_numpy()
+        names_valid = relation_names.is_valid().to_numpy(zero_copy_only=False)
+    valid = arguments.is_valid().to_numpy(zero_copy_only=False)
+
+    rows = []
+    for row in range(len(batch)):
+        if not valid[row]:
+            rows.append(None)
+            continue
+        first, last = atom_offsets[row], atom_offsets[row + 1]
+        if names is not None:
+            if not names_valid[row] or name_offsets[row + 1] - name_offsets[row] != last - first:
+                rows.append(ValueError(f"{relations_column} and {arguments_column} differ in length"))
+                continue
+            row_names = names[name_offsets[row]:name_offsets[row + 1]]
+        else:
+            row_names = [f"R{i}" for i in range(last - first)]
+        relations = [(name, values[value_offsets[atom]:value_offsets[atom + 1]])
+                     for name, atom in zip(row_names, range(first, last))]
+        if not atom_valid[first:last].all() or any(name is None or None in args for name, args in relations):
+            rows.append(ValueError(f"Null relation name, atom or variable in {arguments_column}"))
+            continue
+        rows.append(relations)
+    return rows
+
+
+def pack_batch(batch: "pa.RecordBatch", arguments_column: str) -> PackedCorpus:
+    """A PackedCorpus straight from list<list<string>> arguments, via Arrow dictionary codes"""
+    _require_pyarrow()
+    arguments = batch.column(arguments_column)
+    query_offsets = arguments.offsets.to_numpy().astype(np.int64)
+    atom_offsets = arguments.values.offsets.to_numpy().astype(np.int64)
+    edge_offsets = atom_offsets[query_offsets[0]:query_offsets[-1] + 1]
+    strings = arguments.values.values.slice(edge_offsets[0], edge_offsets[-1] - edge_offsets[0])
+    tokens = pc.dictionary_encode(strings).indices.to_numpy(zero_copy_only=False)
+    return pack_tokens(query_offsets - query_offsets[0], edge_offsets - edge_offsets[0], tokens)
+
+
+def _results_batch(analyses: Sequence[QueryAnalysis], schema: "pa.Schema",
+                   ids: Optional["pa.Array"]) -> "pa.RecordBatch":
+    columns = [ids] if ids is not None else []
+    columns += [pa.array([getattr(analysis, name) for analysis in analyses], type=schema.field(name).type)
+                for name in RESULT_COLUMNS]
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def analyze_record_batches(batches: Iterable["pa.RecordBatch"], pool: HighsModelPool,
+                           query_column: str = "query", arguments_column: Optional[str] = None,
+                           relations_column: Optional[str] = None,
+                           id_column: Optional[str] = None) -> Iterator["pa.RecordBatch"]:
+    """One result batch per input batch, rows in input order.
+
+    Queries come from the ``query_column`` text, or from ``arguments_column``
+    (list<list<string>>, one list of variables per atom) and the optional
+    ``relations_column`` (list<string>) when given; malformed rows are
+    reported as failed like unparsable text. The ``id_column`` is passed
+    through unchanged as the first output column.
+    """
+    _require_pyarrow()
+    schema = None
+    for batch in batches:
+        ids = batch.column(id_column) if id_column is not None else None
+        if schema is None:
+            schema = result_schema(batch.schema.field(id_column) if id_column is not None else None)
+        if arguments_column is not None:
+            start = time.perf_counter()
+            rows = tokenized_relations(batch, arguments_column, relations_column)
+            solved = pool.imap_relations(row or [] for row in rows if not isinstance(row, ValueError))
+            analyses = [failed_analysis("", row, start) if isinstance(row, ValueError) else next(solved)
+                        for row in rows]
+        else:
+            texts = batch.column(query_column).to_pylist()
+            analyses = list(pool.imap(text or "" for text in texts))
+        yield _results_batch(analyses, schema, ids)
+
+
+def analyze_parquet(source: str, destination: str, query_column: str = "query",
+                    arguments_column: Optional[str] = None, relations_column: Optional[str] = None,
+                    id_column: Optional[str] = None, batch_size: int = 8192,
+                    max_workers: Optional[int] = None, store: Optional[ResultStore] = None) -> int:
+    """Stream a Parquet file of queries through the batch pool into a Parquet file of results.
+
+    Only the needed columns are read, ``batch_size`` rows at a time, and
+    each result batch is written before the next is read. Returns the row count.
+    """
+    _require_pyarrow()
+    columns = [arguments_column, relations_column] if arguments_column is not None else [query_column]
+    columns = [column for column in columns + [id_column] if column is not None]
+    parquet_file = pq.ParquetFile(source)
+    rows = 0
+    writer = None
+    try:
+        with HighsModelPool(max_workers, store=store) as pool:
+            batches = parquet_file.iter_batches(batch_size=batch_size, columns=columns)
+            for result in analyze_record_batches(batches, pool, query_column, arguments_column,
+                                                 relations_column, id_column):
+                if writer is None:
+                    writer = pq.ParquetWriter(destination, result.schema)
+                writer.write_batch(result)
+                rows += len(result)
+        if writer is None:
+            id_field = parquet_file.schema_arrow.field(id_column) if id_column is not None else None
+            writer = pq.ParquetWriter(destination, result_schema(id_field))
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
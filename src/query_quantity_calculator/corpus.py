@@ -0,0 +1,87 @@
+import io
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Sequence, Union
+
+import numpy as np
+
+from .batch import QueryAnalysis
+
+# pandas is imported by the table functions only: shard and pipeline workers
+# read corpora through split_queries and should not pay for it at startup
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Columns of the results table that can be sorted and histogrammed
+NUMERIC_COLUMNS = ("vertex_count", "edge_count", "rank", "rho_star", "tau_star", "agm_bound", "elapsed")
+
+
+def split_queries(lines: Iterable[Union[str, bytes]]) -> Iterator[str]:
+    """Queries from a corpus file: one atom per line, queries separated by blank lines.
+
+    Lines starting with ``#`` are comments. Works on any line iterator, so a
+    file is read one query at a time.
+    """
+    atoms: List[str] = []
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        line = line.strip()
+        if line.startswith("#"):
+            continue
+        if line:
+            atoms.append(line)
+        elif atoms:
+            yield "\n".join(atoms)
+            atoms = []
+    if atoms:
+        yield "\n".join(atoms)
+
+
+def read_corpus(data: Union[str, bytes]) -> List[str]:
+    stream = io.BytesIO(data) if isinstance(data, bytes) else io.StringIO(data)
+    return list(split_queries(stream))
+
+
+def results_frame(analyses: Sequence[QueryAnalysis]) -> "pd.DataFrame":
+    """One row per analysis; failed queries have missing values instead of zeros"""
+    import pandas as pd
+
+    frame = pd.DataFrame.from_records(analyses, columns=QueryAnalysis._fields)
+    frame = frame.astype({"vertex_count": "Int64", "edge_count": "Int64", "rank": "Int64"})
+    failed = frame["error"].notna()
+    frame.loc[failed, ["vertex_count", "edge_count", "rank"]] = pd.NA
+    frame.loc[failed, ["rho_star", "tau_star", "agm_bound"]] = np.nan
+    return frame
+
+
+def page(frame: "pd.DataFrame", number: int, size: int, sort_by: str = None,
+         ascending: bool = True) -> "pd.DataFrame":
+    """Rows of the 0-based page ``number``; failed queries sort last"""
+    if sort_by is not None:
+        if sort_by not in frame.columns:
+            raise ValueError(f"Unknown column: {sort_by}")
+        frame = frame.sort_values(sort_by, ascending=ascending, kind="stable", na_position="last")
+    return frame.iloc[number * size:(number + 1) * size]
+
+
+def page_count(frame: "pd.DataFrame", size: int) -> int:
+    return max(1, -(-len(frame) // size))
+
+
+def histograms(frame: "pd.DataFrame", columns: Sequence[str] = ("rho_star", "tau_star"),
+               bins: int = 20) -> Dict[str, "pd.DataFrame"]:
+    """Bin counts per column over the successfully analyzed queries"""
+    import pandas as pd
+
+    solved = frame[frame["error"].isna()]
+    result = {}
+    for column in columns:
+        counts, edges = np.histogram(solved[column].to_numpy(dtype=float), bins=bins)
+        labels = [f"{low:.3g}–{high:.3g}" for low, high in zip(edges[:-1], edges[1:])]
+        result[column] = pd.DataFrame({"bin": labels, "low": edges[:-1], "high": edges[1:], "count": counts})
+    return result
+
+
+def summary(frame: "pd.DataFrame") -> "pd.DataFrame":
+    """count/mean/min/quantiles/max of the numeric columns over the solved queries"""
+    solved = frame[frame["error"].isna()]
+    return solved[list(NUMERIC_COLUMNS)].describe()
@@ -0,0 +1,228 @@
+from typing import Iterable, NamedTuple, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+
+class PackedCorpus(NamedTuple):
+    """Many hypergraphs in one CSR layout.
+
+    Query q owns edges ``query_offsets[q]:query_offsets[q+1]``, edge e owns
+    entries ``edge_offsets[e]:edge_offsets[e+1]`` of ``vertex_ids``, and the
+    vertex ids of query q are ``vertex_offsets[q]:vertex_offsets[q+1]``.
+    """
+    query_offsets: np.ndarray
+    edge_offsets: np.ndarray
+    vertex_ids: np.ndarray
+    vertex_offsets: np.ndarray
+
+    @property
+    def n_queries(self) -> int:
+        return len(self.query_offsets) - 1
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.edge_offsets) - 1
+
+    @property
+    def n_vertices(self) -> int:
+        return int(self.vertex_offsets[-1])
+
+
+def pack_tokens(query_offsets: np.ndarray, edge_offsets: np.ndarray, tokens: np.ndarray) -> PackedCorpus:
+    """Pack integer-coded atoms, e.g. dictionary codes of variable names.
+
+    Equal tokens within a query are the same vertex; tokens need not be
+    contiguous or query-local. A token repeated within an atom counts once,
+    as in ``Hypergraph.from_relations``.
+    """
+    query_offsets = np.asarray(query_offsets, dtype=np.int64)
+    edge_offsets = np.asarray(edge_offsets, dtype=np.int64)
+    tokens = np.asarray(tokens, dtype=np.int64)
+    if query_offsets[-1] != len(edge_offsets) - 1 or edge_offsets[-1] != len(tokens):
+        raise ValueError("Offsets do not match the number of edges and tokens")
+    n_queries = len(query_offsets) - 1
+    entry_edge = _segment_ids(edge_offsets)
+    entry_query = _segment_ids(query_offsets)[entry_edge]
+
+    # Number the distinct (query, token) pairs consecutively
+    order = np.lexsort((tokens, entry_query))
+    sorted_query, sorted_token = entry_query[order], tokens[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (sorted_query[1:] != sorted_query[:-1]) | (sorted_token[1:] != sorted_token[:-1])
+    vertex_ids = np.empty(len(order), dtype=np.int64)
+    vertex_ids[order] = np.cumsum(first) - 1
+    vertex_offsets = np.concatenate(([0], np.cumsum(np.bincount(sorted_query[first], minlength=n_queries))))
+
+    # Drop repeated vertices within an edge
+    n_vertices = int(vertex_offsets[-1])
+    keys = entry_edge * max(n_vertices, 1) + vertex_ids
+    order = np.argsort(keys, kind="stable")
+    repeated = np.zeros(len(keys), dtype=bool)
+    repeated[order[1:]] = keys[order[1:]] == keys[order[:-1]]
+    if repeated.any():
+        vertex_ids = vertex_ids[~repeated]
+        sizes = np.bincount(entry_edge[~repeated], minlength=len(edge_offsets) - 1)
+        edge_offsets = np.concatenate(([0], np.cumsum(sizes)))
+    return PackedCorpus(query_offsets, edge_offsets, vertex_ids, vertex_offsets.astype(np.int64))
+
+
+def pack(relation_lists: Iterable[Sequence[Tuple[str, Sequence[str]]]]) -> PackedCorpus:
+    """Pack parsed queries, e.g. from ``DatalogParser.parse_query``"""
+    codes = {}
+    tokens = []
+    edge_sizes = []
+    query_sizes = []
+    for relations in relation_lists:
+        query_sizes.append(len(relations))
+        for _, args in relations:
+            edge_sizes.append(len(args))
+            tokens.extend(codes.setdefault(arg, len(codes)) for arg in args)
+    return pack_tokens(_offsets(query_sizes), _offsets(edge_sizes), np.asarray(tokens, dtype=np.int64))
+
+
+def _offsets(sizes: Sequence[int]) -> np.ndarray:
+    return np.concatenate(([0], np.cumsum(np.asarray(sizes, dtype=np.int64))))
+
+
+def _segment_ids(offsets: np.ndarray) -> np.ndarray:
+    """The segment of every position covered by ``offsets``"""
+    return np.repeat(np.arange(len(offsets) - 1, dtype=np.int64), np.diff(offsets))
+
+
+def _segment_max(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Maximum per segment; 0 for empty segments"""
+    sizes = np.diff(offsets)
+    result = np.zeros(len(sizes), dtype=values.dtype)
+    nonempty = sizes > 0
+    if nonempty.any():
+        result[nonempty] = np.maximum.reduceat(values, offsets[:-1][nonempty])
+    return result
+
+
+def _edge_pairs(entry_vertex: np.ndarray, entry_edge: np.ndarray,
+                n_edges: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Every pair of edges a < b sharing a vertex, with |a ∩ b|.
+
+    Pairs are generated per vertex, so memory grows with the sum of
+    squared degrees.
+    """
+    order = np.lexsort((entry_edge, entry_vertex))
+    vertex, edge = entry_vertex[order], entry_edge[order]
+    n = len(order)
+    if n == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    starts = np.flatnonzero(np.concatenate(([True], vertex[1:] != vertex[:-1])))
+    ends = np.append(starts[1:], n)
+    group_end = np.repeat(ends, ends - starts)
+    # Position i pairs with every later position of its vertex group
+    partners = group_end - np.arange(n) - 1
+    first = np.repeat(np.arange(n), partners)
+    second = first + 1 + np.arange(len(first)) - np.repeat(np.cumsum(partners) - partners, partners)
+    keys = np.sort(edge[first] * n_edges + edge[second])
+    if len(keys) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    pair_starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    counts = np.diff(np.append(pair_starts, len(keys)))
+    unique = keys[pair_starts]
+    return unique // n_edges, unique % n_edges, counts
+
+
+def _acyclic(corpus: PackedCorpus, entry_edge: np.ndarray, edge_query: np.ndarray) -> np.ndarray:
+    """α-acyclicity per query by GYO reduction, run on all queries at once.
+
+    Each round removes vertices in a single edge and then edges contained
+    in another edge of the same query. A query is acyclic when nothing is
+    left; a query where a round removes nothing is stuck and so cyclic.
+    """
+    n_queries, n_edges = corpus.n_queries, corpus.n_edges
+    acyclic = np.zeros(n_queries, dtype=bool)
+    vertex, edge = corpus.vertex_ids, entry_edge
+    active = np.ones(n_queries, dtype=bool)
+    while True:
+        degrees = np.bincount(vertex, minlength=corpus.n_vertices)
+        ear = degrees[vertex] == 1
+        removed_per_query = np.bincount(edge_query[edge[ear]], minlength=n_queries)
+        vertex, edge = vertex[~ear], edge[~ear]
+
+        sizes = np.bincount(edge, minlength=n_edges)
+        a, b, shared = _edge_pairs(vertex, edge, n_edges)
+        contained = np.zeros(n_edges, dtype=bool)
+        # Of identical edges only the one with the larger index stays
+        contained[a[shared == sizes[a]]] = True
+        contained[b[(shared == sizes[b]) & (sizes[a] > shared)]] = True
+        removed_per_query += np.bincount(edge_query[contained], minlength=n_queries)
+        keep = ~contained[edge]
+        vertex, edge = vertex[keep], edge[keep]
+
+        remaining = np.bincount(edge_query[edge], minlength=n_queries)
+        acyclic |= active & (remaining == 0)
+        # Stuck queries stay cyclic; finished ones have nothing left
+        active &= (remaining > 0) & (removed_per_query > 0)
+        if not active.any():
+            return acyclic
+        keep = active[edge_query[edge]]
+        vertex, edge = vertex[keep], edge[keep]
+
+
+def corpus_statistics(corpus: PackedCorpus, acyclicity: bool = True) -> pd.DataFrame:
+    """One row of structural statistics per query.
+
+    ``intersection_total`` is the sum of |e ∩ f| over edge pairs and
+    ``max_intersection`` the largest one; ``components`` counts connected
+    components and ``acyclic`` is α-acyclicity (GYO).
+    """
+    query_offsets, edge_offsets, vertex_ids, vertex_offsets = corpus
+    n_queries, n_edges, n_vertices = corpus.n_queries, corpus.n_edges, corpus.n_vertices
+    edge_sizes = np.diff(edge_offsets)
+    edge_query = _segment_ids(query_offsets)
+    entry_edge = _segment_ids(edge_offsets)
+
+    degrees = np.bincount(vertex_ids, minlength=n_vertices)
+    vertex_counts = np.diff(vertex_offsets)
+    incidences = np.bincount(edge_query[entry_edge], minlength=n_queries)
+    vertex_query = _segment_ids(vertex_offsets)
+    intersection_total = np.bincount(vertex_query, weights=degrees * (degrees - 1) // 2,
+                                     minlength=n_queries).astype(np.int64)
+
+    a, _, shared = _edge_pairs(vertex_ids, entry_edge, max(n_edges, 1))
+    max_intersection = np.zeros(n_queries, dtype=np.int64)
+    np.maximum.at(max_intersection, edge_query[a], shared)
+    intersecting_pairs = np.bincount(edge_query[a], minlength=n_queries)
+
+    # Components of the vertex-edge incidence graph, counted over vertices only
+    graph = coo_matrix((np.ones(len(vertex_ids)), (vertex_ids, n_vertices + entry_edge)),
+                       shape=(n_vertices + n_edges, n_vertices + n_edges))
+    _, labels = connected_components(graph, directed=False)
+    vertex_labels = labels[:n_vertices]
+    first_of_component = np.unique(vertex_labels, return_index=True)[1]
+    components = np.bincount(vertex_query[first_of_component], minlength=n_queries)
+
+    statistics = {
+        "vertex_count": vertex_counts,
+        "edge_count": np.diff(query_offsets),
+        "rank": _segment_max(edge_sizes, query_offsets),
+        "max_degree": _segment_max(degrees, vertex_offsets),
+        "mean_degree": np.divide(incidences, vertex_counts, out=np.zeros(n_queries), where=vertex_counts > 0),
+        "intersecting_pairs": intersecting_pairs,
+        "intersection_total": intersection_total,
+        "max_intersection": max_intersection,
+        "components": components,
+    }
+    if acyclicity:
+        statistics["acyclic"] = _acyclic(corpus, entry_edge, edge_query)
+    return pd.DataFrame(statistics)
+
+
+def degree_distribution(corpus: PackedCorpus) -> np.ndarray:
+    """counts[d] is the number of vertices of degree d over the whole corpus"""
+    return np.bincount(np.bincount(corpus.vertex_ids, minlength=corpus.n_vertices))
+
+
+def rank_distribution(corpus: PackedCorpus) -> np.ndarray:
+    """counts[k] is the number of edges with k distinct vertices"""
+    return np.bincount(np.diff(corpus.edge_offsets))
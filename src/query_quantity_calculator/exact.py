@@ -0,0 +1,122 @@
+import math
+from fractions import Fraction
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .backends import LPProblem
+
+# Optimal vertices of the ρ*/τ* LPs have small denominators in practice
+MAX_DENOMINATOR = 10 ** 6
+# Beyond this many unknowns a missing dual is not reconstructed and the result stays uncertified
+MAX_DUAL_SYSTEM = 2000
+
+
+class ExactResult(NamedTuple):
+    """An LP optimum as a rational number.
+
+    ``certified`` means the snapped ``weights`` and ``dual`` were checked in
+    exact arithmetic to be feasible with equal objectives, so ``value`` is the
+    optimum; otherwise ``value`` is only the nearest small-denominator
+    fraction of the floating-point objective, and ``weights``/``dual`` are
+    None where they had no common denominator up to MAX_DENOMINATOR.
+    """
+    value: Fraction
+    weights: Optional[List[Fraction]]
+    dual: Optional[List[Fraction]]
+    certified: bool
+
+
+def snap(value: float, max_denominator: int = MAX_DENOMINATOR) -> Fraction:
+    return Fraction(float(value)).limit_denominator(max_denominator)
+
+
+def exact_optimum(problem: LPProblem, value: float, weights: np.ndarray, covering: bool,
+                  dual: Optional[np.ndarray] = None, max_denominator: int = MAX_DENOMINATOR) -> ExactResult:
+    """The exact optimum of the edge cover (``covering``) or edge packing LP from a floating-point solution.
+
+    ``dual`` is the solver's vertex packing (for the cover) or vertex cover
+    (for the packing). Without it the dual is reconstructed by complementary
+    slackness: weighted edges are tight and only vertices with a tight row
+    carry weight. Primal and dual are snapped to fractions and checked with
+    integer arithmetic; no LP is re-solved.
+    """
+    if problem.n_edges == 0 or problem.n_vertices == 0:
+        return ExactResult(Fraction(0), [Fraction(0)] * problem.n_edges, [Fraction(0)] * problem.n_vertices, True)
+    approximate = snap(value, max_denominator)
+    snapped = _snap_all(weights, max_denominator)
+    if snapped is None:
+        return ExactResult(approximate, None, None, False)
+    x, x_numerators, x_denominator = snapped
+    if (x_numerators < 0).any():
+        return ExactResult(approximate, x, None, False)
+    loads = _vertex_sums(problem, x_numerators)
+    if (loads < x_denominator).any() if covering else (loads > x_denominator).any():
+        return ExactResult(approximate, x, None, False)
+    primal_value = Fraction(int(x_numerators.sum()), x_denominator)
+
+    if dual is None:
+        dual = _reconstruct_dual(problem, x_numerators > 0, loads == x_denominator)
+        if dual is None:
+            return ExactResult(approximate, x, None, False)
+    snapped = _snap_all(dual, max_denominator)
+    if snapped is None:
+        return ExactResult(approximate, x, None, False)
+    y, y_numerators, y_denominator = snapped
+    if (y_numerators < 0).any() or Fraction(int(y_numerators.sum()), y_denominator) != primal_value:
+        return ExactResult(approximate, x, y, False)
+    edge_loads = np.add.reduceat(y_numerators[problem.vertex_ids], problem.offsets[:-1])
+    if (edge_loads > y_denominator).any() if covering else (edge_loads < y_denominator).any():
+        return ExactResult(approximate, x, y, False)
+    return ExactResult(primal_value, x, y, True)
+
+
+def _snap_all(values: np.ndarray, max_denominator: int) -> Optional[Tuple[List[Fraction], np.ndarray, int]]:
+    """(fractions, numerators over a common denominator, that denominator); None if that exceeds max_denominator.
+
+    A basic solution has one common denominator, det(B), so a larger one
+    means some value was snapped to the wrong fraction.
+    """
+    # LP solutions repeat few distinct values; snap each once
+    distinct = {}
+    fractions = []
+    for value in np.asarray(values, dtype=float).tolist():
+        fraction = distinct.get(value)
+        if fraction is None:
+            fraction = distinct[value] = snap(value, max_denominator)
+        fractions.append(fraction)
+    denominator = 1
+    for fraction in set(distinct.values()):
+        denominator = denominator * fraction.denominator // math.gcd(denominator, fraction.denominator)
+        if denominator > max_denominator:
+            return None
+    scaled = {fraction: fraction.numerator * (denominator // fraction.denominator) for fraction in distinct.values()}
+    largest = max((abs(n) for n in scaled.values()), default=0)
+    # Sums over an edge or a vertex must stay exact: fall back to Python ints when int64 could overflow
+    dtype = np.int64 if largest * max(len(fractions), 1) < 2 ** 62 else object
+    numerators = np.array([scaled[fraction] for fraction in fractions], dtype=dtype)
+    return fractions, numerators, denominator
+
+
+def _vertex_sums(problem: LPProblem, numerators: np.ndarray) -> np.ndarray:
+    sums = np.zeros(problem.n_vertices, dtype=numerators.dtype)
+    np.add.at(sums, problem.vertex_ids, np.repeat(numerators, problem.edge_sizes))
+    return sums
+
+
+def _reconstruct_dual(problem: LPProblem, support: np.ndarray, tight: np.ndarray) -> Optional[np.ndarray]:
+    tight_vertices = np.flatnonzero(tight)
+    support_edges = np.flatnonzero(support)
+    if len(tight_vertices) > MAX_DUAL_SYSTEM or len(support_edges) > MAX_DUAL_SYSTEM:
+        return None
+    # Sum of y over each supported edge's tight vertices = 1
+    column = np.full(problem.n_vertices, -1)
+    column[tight_vertices] = np.arange(len(tight_vertices))
+    system = np.zeros((len(support_edges), len(tight_vertices)))
+    for row, e in enumerate(support_edges):
+        members = column[problem.vertex_ids[problem.offsets[e]:problem.offsets[e + 1]]]
+        system[row, members[members >= 0]] = 1.0
+    y = np.zeros(problem.n_vertices)
+    if len(system):
+        y[tight_vertices] = np.linalg.lstsq(system, np.ones(len(system)), rcond=None)[0]
+    return y
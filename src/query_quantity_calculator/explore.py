@@ -0,0 +1,145 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import networkx as nx
+import numpy as np
+import plotly.graph_objects as go
+
+from . import instrumentation
+from .hypergraph import Hypergraph, hyperedge_trace, style_figure, vertex_trace
+
+
+class NeighbourhoodExplorer:
+    """Draws k-hop neighbourhoods of a hypergraph too large to draw whole.
+
+    A vertex -> edge index is built once, so a neighbourhood costs time
+    proportional to its own size. Positions are laid out only for newly
+    shown vertices, with the already placed ones held fixed, and kept for
+    later expansions and re-focusing. ``expand`` adds traces to the current
+    figure instead of rebuilding it.
+    """
+
+    def __init__(self, hypergraph: Hypergraph, max_vertices: int = 300):
+        self.hypergraph = hypergraph
+        # Growing a neighbourhood stops once it has this many vertices
+        self.max_vertices = max_vertices
+        offsets, vertex_ids = hypergraph.get_incidence_arrays()
+        self.edge_offsets = offsets
+        self.edge_vertices = vertex_ids
+        self.names = hypergraph.get_vertices_list()
+        self.index = {name: i for i, name in enumerate(self.names)}
+        entry_edge = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+        self.vertex_edges = entry_edge[np.argsort(vertex_ids, kind="stable")]
+        self.vertex_offsets = np.concatenate(([0], np.cumsum(np.bincount(vertex_ids, minlength=len(self.names)))))
+
+        self.positions: Dict[int, Tuple[float, float]] = {}
+        self.visible_vertices: Set[int] = set()
+        self.visible_edges: Set[int] = set()
+        self.figure: Optional[go.Figure] = None
+        # True when the last neighbourhood was cut off at max_vertices
+        self.truncated = False
+        self._rng = np.random.default_rng(0)
+
+    def edges_of(self, vertex: int) -> List[int]:
+        return self.vertex_edges[self.vertex_offsets[vertex]:self.vertex_offsets[vertex + 1]].tolist()
+
+    def vertices_of(self, edge: int) -> List[int]:
+        return self.edge_vertices[self.edge_offsets[edge]:self.edge_offsets[edge + 1]].tolist()
+
+    def neighbourhood(self, vertices: Iterable[int], hops: int, edges: Iterable[int] = (),
+                      known_vertices: Set[int] = frozenset(),
+                      known_edges: Set[int] = frozenset()) -> Tuple[Set[int], Set[int]]:
+        """Vertices and edges within ``hops`` edge steps, excluding the known ones"""
+        new_edges = set(edges) - known_edges
+        frontier = set(vertices)
+        for e in new_edges:
+            frontier.update(self.vertices_of(e))
+        seen = set(frontier)
+        n_new = len(seen - known_vertices)
+        budget = self.max_vertices - len(known_vertices)
+        self.truncated = False
+        for _ in range(hops):
+            next_frontier = set()
+            for v in frontier:
+                for e in self.edges_of(v):
+                    if e in known_edges or e in new_edges:
+                        continue
+                    if n_new >= budget:
+                        self.truncated = True
+                        return seen - known_vertices, new_edges
+                    new_edges.add(e)
+                    reached = [u for u in self.vertices_of(e) if u not in seen]
+                    seen.update(reached)
+                    next_frontier.update(reached)
+                    n_new += sum(1 for u in reached if u not in known_vertices)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        return seen - known_vertices, new_edges
+
+    def focus(self, vertex: Optional[str] = None, relation: Optional[int] = None, hops: int = 1) -> go.Figure:
+        """A new figure of the neighbourhood of a vertex name or relation index"""
+        self.visible_vertices = set()
+        self.visible_edges = set()
+        self.figure = go.Figure()
+        style_figure(self.figure, title="Hypergraph Neighbourhood")
+        self._grow(self._seed(vertex, relation), hops)
+        return self.figure
+
+    def expand(self, vertex: str, hops: int = 1) -> go.Figure:
+        """Add the neighbourhood of a shown vertex to the current figure"""
+        if self.figure is None:
+            return self.focus(vertex=vertex, hops=hops)
+        self._grow(self._seed(vertex, None), hops)
+        return self.figure
+
+    def _seed(self, vertex: Optional[str], relation: Optional[int]) -> Tuple[List[int], List[int]]:
+        if relation is not None:
+            if not 0 <= relation < len(self.edge_offsets) - 1:
+                raise ValueError(f"No relation with index {relation}")
+            return [], [relation]
+        if vertex not in self.index:
+            raise ValueError(f"Unknown vertex: {vertex}")
+        return [self.index[vertex]], []
+
+    def _grow(self, seed: Tuple[List[int], List[int]], hops: int):
+        vertices, edges = self.neighbourhood(seed[0], hops, seed[1], self.visible_vertices, self.visible_edges)
+        self.visible_vertices |= vertices
+        self.visible_edges |= edges
+        self._place(vertices)
+
+        pos = {self.names[v]: self.positions[v] for v in self.visible_vertices}
+        traces = [hyperedge_trace(e, self.hypergraph.get_edge_name(e), [self.names[v] for v in self.vertices_of(e)],
+                                  pos)
+                  for e in sorted(edges)]
+        added = sorted(vertices)
+        if added:
+            traces.append(vertex_trace([self.names[v] for v in added], [self.positions[v][0] for v in added],
+                                       [self.positions[v][1] for v in added],
+                                       name=f"Vertices ({len(self.visible_vertices)} shown)"))
+        self.figure.add_traces([trace for trace in traces if trace is not None])
+
+    def _place(self, vertices: Set[int]):
+        """Lay out the unplaced vertices around their placed neighbours, which stay fixed"""
+        new = [v for v in vertices if v not in self.positions]
+        if not new:
+            return
+        graph = nx.Graph()
+        graph.add_nodes_from(new)
+        # One hub node per edge keeps the graph linear in the edge sizes
+        for e in self.visible_edges:
+            members = [v for v in self.vertices_of(e) if v in self.visible_vertices]
+            if any(v in vertices for v in members):
+                graph.add_edges_from((("edge", e), v) for v in members)
+        fixed = [node for node in graph if node in self.positions]
+        initial = {node: self.positions[node] for node in fixed}
+        for node in graph:
+            if node not in initial:
+                # Placed vertices sharing an edge with the node, directly (hubs) or via a hub (vertices)
+                near = graph[node] if isinstance(node, tuple) else [u for hub in graph[node] for u in graph[hub]]
+                anchors = [self.positions[v] for v in near if v in self.positions]
+                center = np.mean(anchors, axis=0) if anchors else (0.0, 0.0)
+                initial[node] = tuple(np.asarray(center) + self._rng.normal(scale=0.1, size=2))
+        with instrumentation.span("layout"):
+            layout = nx.spring_layout(graph, pos=initial, fixed=fixed or None, iterations=50, seed=0)
+        for v in new:
+            self.positions[v] = (float(layout[v][0]), float(layout[v][1]))
@@ -0,0 +1,147 @@
+import hashlib
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, NamedTuple, Optional, Union
+
+import numpy as np
+
+from . import instrumentation
+
+# Whitespace between two name characters is part of a name; anywhere else it is insignificant
+_INNER_WHITESPACE = re.compile(r"\w\s+\w")
+_WHITESPACE = re.compile(r"\s+")
+_AROUND_PUNCTUATION = re.compile(r" ?(->|[(),\[\];=]) ?")
+
+
+def query_fingerprint(query_text: Union[str, Iterable[str]]) -> str:
+    """A digest of the query text that ignores whitespace, atom order and repeated atoms.
+
+    Works line by line on the raw text (or any iterable of lines, such as an
+    open file) without parsing it: the fingerprint hashes the sorted set of
+    normalized non-blank lines. Queries with equal fingerprints parse to the
+    same set of atoms.
+    """
+    if isinstance(query_text, str) and not _INNER_WHITESPACE.search(query_text):
+        atoms = {"".join(line.split()) for line in query_text.splitlines()}
+    else:
+        lines = query_text.splitlines() if isinstance(query_text, str) else query_text
+        atoms = {_normalize(line) for line in lines}
+    atoms.discard("")
+    return hashlib.blake2b("\n".join(sorted(atoms)).encode(), digest_size=16).hexdigest()
+
+
+def _normalize(line: str) -> str:
+    if _INNER_WHITESPACE.search(line):
+        return _AROUND_PUNCTUATION.sub(r"\1", _WHITESPACE.sub(" ", line).strip())
+    return "".join(line.split())
+
+
+def approximate_size(value: object) -> int:
+    """Bytes held by a result: containers are followed, arrays count their buffers
+    and Plotly figures their JSON-like dict"""
+    seen = set()
+    stack = [value]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, np.ndarray):
+            # getsizeof counts the buffer of an array that owns its data, not of a view
+            if item.base is not None:
+                total += item.nbytes
+        elif isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, "to_plotly_json"):
+            stack.append(item.to_plotly_json())
+    return total
+
+
+class CacheStats(NamedTuple):
+    entries: int
+    bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+
+
+class FingerprintCache:
+    """Finished results keyed by query fingerprint, dropped after ``ttl`` seconds
+    and least recently used first beyond ``max_entries`` or ``max_bytes``"""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 256 * 2 ** 20, ttl: Optional[float] = 3600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("Cache limits must be positive")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (value, size, expiry)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._hits = self._misses = self._evictions = self._expirations = 0
+
+    def get(self, key: Hashable) -> Optional[object]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= self._clock():
+                self._remove(key)
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                instrumentation.count("cache_requests", cache="fingerprint", result="miss")
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        instrumentation.count("cache_requests", cache="fingerprint", result="hit")
+        return entry[0]
+
+    def put(self, key: Hashable, value: object, size: Optional[int] = None):
+        """Store ``value``; ``size`` defaults to approximate_size. Values over max_bytes are not kept"""
+        if size is None:
+            size = approximate_size(value)
+        expiry = self._clock() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size, expiry)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+            instrumentation.observe("fingerprint_cache_bytes", self._bytes)
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(len(self._entries), self._bytes, self._hits, self._misses, self._evictions,
+                              self._expirations)
@@ -0,0 +1,75 @@
+import math
+import random
+from typing import Callable, Dict, List, Optional, Tuple
+
+Relations = List[Tuple[str, List[str]]]
+
+
+def cycle(n_atoms: int, seed: Optional[int] = None) -> Relations:
+    """R_i(x_i, x_{i+1}) closed into a cycle"""
+    return [(f"R{i}", [f"x{i}", f"x{(i + 1) % n_atoms}"]) for i in range(n_atoms)]
+
+
+def clique(n_atoms: int, seed: Optional[int] = None) -> Relations:
+    """Every pair of the largest vertex set with at most n_atoms pairs"""
+    k = max(int((1 + math.isqrt(1 + 8 * n_atoms)) // 2), 2)
+    pairs = [(i, j) for i in range(k) for j in range(i + 1, k)]
+    return [(f"R{n}", [f"x{i}", f"x{j}"]) for n, (i, j) in enumerate(pairs)]
+
+
+def star(n_atoms: int, seed: Optional[int] = None) -> Relations:
+    return [(f"R{i}", ["c", f"x{i}"]) for i in range(n_atoms)]
+
+
+def grid(n_atoms: int, seed: Optional[int] = None) -> Relations:
+    """Horizontal and vertical edges of a square grid with about n_atoms edges"""
+    side = max(int(math.isqrt(max(n_atoms // 2, 1))), 1) + 1
+    relations = []
+    for i in range(side):
+        for j in range(side):
+            if j + 1 < side:
+                relations.append((f"H{i}_{j}", [f"x{i}_{j}", f"x{i}_{j + 1}"]))
+            if i + 1 < side:
+                relations.append((f"V{i}_{j}", [f"x{i}_{j}", f"x{i + 1}_{j}"]))
+    return relations
+
+
+def random_uniform(n_atoms: int, seed: Optional[int] = 0, arity: int = 3) -> Relations:
+    """n_atoms random arity-k edges over about n_atoms / 2 vertices"""
+    rng = random.Random(seed)
+    n_vertices = max(arity, n_atoms // 2)
+    return [(f"R{i}", [f"x{v}" for v in sorted(rng.sample(range(n_vertices), arity))])
+            for i in range(n_atoms)]
+
+
+def loomis_whitney(n_atoms: int, seed: Optional[int] = None, dimension: int = 4) -> Relations:
+    """Disjoint copies of the Loomis–Whitney query: all (d-1)-subsets of d variables"""
+    relations = []
+    for copy in range(max(n_atoms // dimension, 1)):
+        variables = [f"x{copy}_{i}" for i in range(dimension)]
+        for skipped in range(dimension):
+            relations.append((f"R{copy}_{skipped}", [v for i, v in enumerate(variables) if i != skipped]))
+    return relations
+
+
+FAMILIES: Dict[str, Callable[..., Relations]] = {
+    "cycle": cycle,
+    "clique": clique,
+    "star": star,
+    "grid": grid,
+    "random_uniform": random_uniform,
+    "loomis_whitney": loomis_whitney,
+}
+
+
+def generate(family: str, n_atoms: int, seed: Optional[int] = 0) -> Relations:
+    if family not in FAMILIES:
+        raise ValueError(f"Unknown hypergraph family: {family}")
+    if n_atoms < 1:
+        raise ValueError("n_atoms must be at least 1")
+    return FAMILIES[family](n_atoms, seed)
+
+
+def to_query(relations: Relations) -> str:
+    """Datalog text accepted by DatalogParser, one atom per line"""
+    return "\n".join(f"{name}({', '.join(args)})" for name, args in relations)
@@ -1,35 +1,91 @@
-from typing import List, Tuple, Set, Dict
-import plotly.graph_objects as go
-import plotly.express as px
-import networkx as nx
+import math
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple, Set, Dict
 import numpy as np
+from . import instrumentation
 from .parser import DatalogParser
 
+# Plotly and NetworkX are imported where a drawing is made, so that solving
+# alone does not pay for them at startup
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+# ColorBrewer Set3 (Plotly's qualitative.Set3), shared by the Plotly and SVG drawings
+HYPEREDGE_COLORS = ("#8dd3c7", "#ffffb3", "#bebada", "#fb8072", "#80b1d3", "#fdb462",
+                    "#b3de69", "#fccde5", "#d9d9d9", "#bc80bd", "#ccebc5", "#ffed6f")
+
 
 class Hypergraph:
     def __init__(self):
-        self.vertices: Set[str] = set()
-        self.edges: List[Tuple[str, Set[str]]] = []
-    
+        self._vertices: Set[str] = set()
+        self._edges: List[Tuple[str, Set[str]]] = []
+        # Set by from_csr: (offsets, vertex_ids, names); vertices/edges are then built on first access
+        self._csr: Optional[Tuple[np.ndarray, np.ndarray, List[str]]] = None
+
+    @property
+    def vertices(self) -> Set[str]:
+        self._materialize()
+        return self._vertices
+
+    @property
+    def edges(self) -> List[Tuple[str, Set[str]]]:
+        self._materialize()
+        return self._edges
+
     def from_relations(self, relations: List[Tuple[str, List[str]]]):
-        self.vertices.clear()
-        self.edges.clear()
-        
-        for relation_name, args in relations:
-            edge_vertices = set(args)
-            self.vertices.update(edge_vertices)
-            self.edges.append((relation_name, edge_vertices))
-    
+        with instrumentation.span("build"):
+            self._csr = None
+            self._vertices = set()
+            self._edges = []
+
+            for relation_name, args in relations:
+                edge_vertices = set(args)
+                self._vertices.update(edge_vertices)
+                self._edges.append((relation_name, edge_vertices))
+
+    @classmethod
+    def from_csr(cls, offsets: np.ndarray, vertex_ids: np.ndarray,
+                 names: Optional[Sequence[str]] = None) -> "Hypergraph":
+        """Wrap an edge-major CSR incidence without copying it.
+
+        Edge i holds ``vertex_ids[offsets[i]:offsets[i + 1]]``; vertex j is
+        called ``names[j]`` (``v<j>`` by default) and vertices are listed in
+        id order. Every vertex must lie in some edge, and no edge may be
+        empty or repeat a vertex. Int64 arrays go to the LP unchanged.
+        """
+        offsets = np.asarray(offsets)
+        vertex_ids = np.asarray(vertex_ids)
+        with instrumentation.span("build"):
+            n_vertices = _validate_csr(offsets, vertex_ids, names)
+            hypergraph = cls()
+            names = list(names) if names is not None else [f"v{i}" for i in range(n_vertices)]
+            hypergraph._csr = (offsets, vertex_ids, names)
+        return hypergraph
+
+    def _materialize(self):
+        if self._csr is None or self._edges:
+            return
+        offsets, vertex_ids, names = self._csr
+        bounds = offsets.tolist()
+        ids = vertex_ids.tolist()
+        self._vertices = set(names)
+        self._edges = [(f"e{i}", {names[v] for v in ids[bounds[i]:bounds[i + 1]]}) for i in range(len(bounds) - 1)]
+
     def get_vertex_count(self) -> int:
-        return len(self.vertices)
-    
+        if self._csr is not None:
+            return len(self._csr[2])
+        return len(self._vertices)
+
     def get_edge_count(self) -> int:
-        return len(self.edges)
-    
+        if self._csr is not None:
+            return len(self._csr[0]) - 1
+        return len(self._edges)
+
     def get_rank(self) -> int:
-        if not self.edges:
+        if self._csr is not None:
+            return int(np.diff(self._csr[0]).max()) if len(self._csr[0]) > 1 else 0
+        if not self._edges:
             return 0
-        return max(len(edge_vertices) for _, edge_vertices in self.edges)
+        return max(len(edge_vertices) for _, edge_vertices in self._edges)
     
     def get_edges_containing_vertex(self, vertex: str) -> List[int]:
         result = []
@@ -39,19 +95,36 @@ class Hypergraph:
         return result
     
     def get_vertices_list(self) -> List[str]:
-        return sorted(list(self.vertices))
+        """Sorted names, or the from_csr names in id order"""
+        if self._csr is not None:
+            return list(self._csr[2])
+        return sorted(list(self._vertices))
     
     def get_edge_size(self, edge_index: int) -> int:
-        return len(self.edges[edge_index][1])
+        if self._csr is not None:
+            offsets = self._csr[0]
+            return int(offsets[edge_index + 1] - offsets[edge_index])
+        return len(self._edges[edge_index][1])
     
     def get_edge_name(self, edge_index: int) -> str:
         return self.edges[edge_index][0]
-    
-    def create_visualization(self):
-        """Create hypergraph visualization"""
-        if not self.vertices or not self.edges:
-            return None
-        
+
+    def get_incidence_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Edge-major CSR incidence: (offsets, vertex_ids) over get_vertices_list() order"""
+        if self._csr is not None:
+            return self._csr[0], self._csr[1]
+        vertex_to_index = {v: i for i, v in enumerate(self.get_vertices_list())}
+        offsets = np.zeros(len(self._edges) + 1, dtype=np.int64)
+        vertex_ids = []
+        for i, (_, edge_vertices) in enumerate(self._edges):
+            vertex_ids.extend(sorted(vertex_to_index[v] for v in edge_vertices))
+            offsets[i + 1] = len(vertex_ids)
+        return offsets, np.asarray(vertex_ids, dtype=np.int64)
+
+    def layout_positions(self, seed: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Vertex positions shared by the Plotly and SVG drawings"""
+        import networkx as nx
+
         # NetworkXグラフを作成（頂点のみのグラフ）
         G = nx.Graph()
         
@@ -60,108 +133,166 @@ class Hypergraph:
             G.add_node(vertex)
         
         # レイアウトを計算（頂点のみ）
-        pos = nx.spring_layout(G, k=3, iterations=50)
+        with instrumentation.span("layout"):
+            return nx.spring_layout(G, k=3, iterations=50, seed=seed)
+
+    def create_visualization(self):
+        """Create hypergraph visualization"""
+        if not self.vertices or not self.edges:
+            return None
+        
+        import plotly.graph_objects as go
+
+        pos = self.layout_positions()
         
         # 頂点の座標
-        vertex_x = [pos[vertex][0] for vertex in self.vertices]
-        vertex_y = [pos[vertex][1] for vertex in self.vertices]
         vertex_labels = list(self.vertices)
+        vertex_x = [pos[vertex][0] for vertex in vertex_labels]
+        vertex_y = [pos[vertex][1] for vertex in vertex_labels]
         
         # Plotlyの図を作成
         fig = go.Figure()
         
         # ハイパーエッジを描画（多角形として）
-        colors = px.colors.qualitative.Set3
         for i, (edge_name, edge_vertices) in enumerate(self.edges):
-            if len(edge_vertices) < 2:
-                continue
-                
-            # エッジに含まれる頂点の座標を取得
-            edge_vertex_list = list(edge_vertices)
-            edge_x = [pos[v][0] for v in edge_vertex_list if v in pos]
-            edge_y = [pos[v][1] for v in edge_vertex_list if v in pos]
-            
-            if len(edge_x) < 2:
-                continue
-            
-            # 凸包を計算して多角形を描画
-            if len(edge_x) >= 3:
-                # 重心を計算
-                center_x = sum(edge_x) / len(edge_x)
-                center_y = sum(edge_y) / len(edge_y)
-                
-                # 角度でソート
-                def angle_from_center(point_idx):
-                    import math
-                    return math.atan2(edge_y[point_idx] - center_y, edge_x[point_idx] - center_x)
-                
-                sorted_indices = sorted(range(len(edge_x)), key=angle_from_center)
-                sorted_edge_x = [edge_x[i] for i in sorted_indices]
-                sorted_edge_y = [edge_y[i] for i in sorted_indices]
-                
-                # 多角形を閉じる
-                sorted_edge_x.append(sorted_edge_x[0])
-                sorted_edge_y.append(sorted_edge_y[0])
-                
-                # ハイパーエッジを多角形として描画
-                fig.add_trace(go.Scatter(
-                    x=sorted_edge_x, y=sorted_edge_y,
-                    fill="toself",
-                    fillcolor=colors[i % len(colors)],
-                    opacity=0.3,
-                    line=dict(width=2, color=colors[i % len(colors)]),
-                    hoverinfo='text',
-                    hovertext=f"Relation: {edge_name}<br>Vertices: {', '.join(edge_vertex_list)}",
-                    name=f"Relation {edge_name}",
-                    showlegend=True,
-                    mode='lines'
-                ))
-            else:
-                # 2頂点の場合は線として描画
-                fig.add_trace(go.Scatter(
-                    x=edge_x, y=edge_y,
-                    line=dict(width=4, color=colors[i % len(colors)]),
-                    hoverinfo='text',
-                    hovertext=f"Relation: {edge_name}<br>Vertices: {', '.join(edge_vertex_list)}",
-                    name=f"Relation {edge_name}",
-                    showlegend=True,
-                    mode='lines'
-                ))
+            trace = hyperedge_trace(i, edge_name, list(edge_vertices), pos)
+            if trace is not None:
+                fig.add_trace(trace)
         
         # 頂点を最後に描画（上に表示されるように）
-        fig.add_trace(go.Scatter(
-            x=vertex_x, y=vertex_y,
-            mode='markers+text',
-            marker=dict(
-                size=25,
-                color='white',
-                line=dict(width=3, color='darkblue')
-            ),
-            text=vertex_labels,
-            textposition="middle center",
+        fig.add_trace(vertex_trace(vertex_labels, vertex_x, vertex_y))
+        style_figure(fig)
+        return fig
+
+
+def hyperedge_outline(edge_x: List[float], edge_y: List[float]) -> Tuple[List[float], List[float]]:
+    """Points of a hyperedge in drawing order: a closed polygon around 3+ vertices, else a line"""
+    if len(edge_x) < 3:
+        return list(edge_x), list(edge_y)
+    # 重心を計算
+    center_x = sum(edge_x) / len(edge_x)
+    center_y = sum(edge_y) / len(edge_y)
+    
+    # 角度でソート
+    def angle_from_center(point_idx):
+        return math.atan2(edge_y[point_idx] - center_y, edge_x[point_idx] - center_x)
+    
+    sorted_indices = sorted(range(len(edge_x)), key=angle_from_center)
+    sorted_edge_x = [edge_x[i] for i in sorted_indices]
+    sorted_edge_y = [edge_y[i] for i in sorted_indices]
+    
+    # 多角形を閉じる
+    sorted_edge_x.append(sorted_edge_x[0])
+    sorted_edge_y.append(sorted_edge_y[0])
+    return sorted_edge_x, sorted_edge_y
+
+
+def hyperedge_color(index: int) -> str:
+    return HYPEREDGE_COLORS[index % len(HYPEREDGE_COLORS)]
+
+
+def hyperedge_trace(index: int, edge_name: str, edge_vertex_list: List[str], pos: Dict) -> Optional["go.Scatter"]:
+    """The polygon (or line, for two vertices) of one hyperedge; None if fewer than two vertices are placed"""
+    import plotly.graph_objects as go
+
+    color = hyperedge_color(index)
+    # エッジに含まれる頂点の座標を取得
+    edge_vertex_list = [v for v in edge_vertex_list if v in pos]
+    if len(edge_vertex_list) < 2:
+        return None
+    edge_x, edge_y = hyperedge_outline([pos[v][0] for v in edge_vertex_list], [pos[v][1] for v in edge_vertex_list])
+    hovertext = f"Relation: {edge_name}<br>Vertices: {', '.join(edge_vertex_list)}"
+    if len(edge_vertex_list) >= 3:
+        # ハイパーエッジを多角形として描画
+        return go.Scatter(
+            x=edge_x, y=edge_y,
+            fill="toself",
+            fillcolor=color,
+            opacity=0.3,
+            line=dict(width=2, color=color),
             hoverinfo='text',
-            hovertext=[f"Vertex: {label}" for label in vertex_labels],
-            name="Vertices (Attributes)",
-            showlegend=True
-        ))
-        
-        # レイアウトを設定
-        fig.update_layout(
-            title="Hypergraph Structure",
+            hovertext=hovertext,
+            name=f"Relation {edge_name}",
             showlegend=True,
-            hovermode='closest',
-            margin=dict(b=20,l=5,r=5,t=40),
-            annotations=[ dict(
-                text="White circles: vertices (attributes), colored areas: hyperedges (relations)",
-                showarrow=False,
-                xref="paper", yref="paper",
-                x=0.005, y=-0.002,
-                xanchor='left', yanchor='bottom',
-                font=dict(size=12)
-            )],
-            xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-            plot_bgcolor='white'
+            mode='lines'
         )
-        
-        return fig
\ No newline at end of file
+    # 2頂点の場合は線として描画
+    return go.Scatter(
+        x=edge_x, y=edge_y,
+        line=dict(width=4, color=color),
+        hoverinfo='text',
+        hovertext=hovertext,
+        name=f"Relation {edge_name}",
+        showlegend=True,
+        mode='lines'
+    )
+
+
+def vertex_trace(vertex_labels: List[str], vertex_x: List[float], vertex_y: List[float],
+                 name: str = "Vertices (Attributes)") -> "go.Scatter":
+    import plotly.graph_objects as go
+
+    return go.Scatter(
+        x=vertex_x, y=vertex_y,
+        mode='markers+text',
+        marker=dict(
+            size=25,
+            color='white',
+            line=dict(width=3, color='darkblue')
+        ),
+        text=vertex_labels,
+        textposition="middle center",
+        hoverinfo='text',
+        hovertext=[f"Vertex: {label}" for label in vertex_labels],
+        name=name,
+        showlegend=True
+    )
+
+
+def style_figure(fig: "go.Figure", title: str = "Hypergraph Structure"):
+    # レイアウトを設定
+    fig.update_layout(
+        title=title,
+        showlegend=True,
+        hovermode='closest',
+        margin=dict(b=20,l=5,r=5,t=40),
+        annotations=[ dict(
+            text="White circles: vertices (attributes), colored areas: hyperedges (relations)",
+            showarrow=False,
+            xref="paper", yref="paper",
+            x=0.005, y=-0.002,
+            xanchor='left', yanchor='bottom',
+            font=dict(size=12)
+        )],
+        xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+        yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+        plot_bgcolor='white'
+    )
+
+
+def _validate_csr(offsets: np.ndarray, vertex_ids: np.ndarray, names: Optional[Sequence[str]]) -> int:
+    """Whole-array checks of a from_csr input; returns the vertex count"""
+    if offsets.ndim != 1 or vertex_ids.ndim != 1:
+        raise ValueError("offsets and vertex_ids must be one-dimensional")
+    if not (np.issubdtype(offsets.dtype, np.integer) and np.issubdtype(vertex_ids.dtype, np.integer)):
+        raise ValueError("offsets and vertex_ids must be integer arrays")
+    if len(offsets) == 0 or offsets[0] != 0 or offsets[-1] != len(vertex_ids):
+        raise ValueError("offsets must start at 0 and end at len(vertex_ids)")
+    sizes = np.diff(offsets)
+    if np.any(sizes <= 0):
+        raise ValueError("offsets must be strictly increasing: edges cannot be empty")
+    if names is not None:
+        n_vertices = len(names)
+        if len(set(names)) != n_vertices:
+            raise ValueError("Vertex names must be unique")
+    else:
+        n_vertices = int(vertex_ids.max()) + 1 if len(vertex_ids) else 0
+    if len(vertex_ids) and (vertex_ids.min() < 0 or vertex_ids.max() >= n_vertices):
+        raise ValueError(f"Vertex ids must lie in [0, {n_vertices})")
+    if np.any(np.bincount(vertex_ids, minlength=n_vertices) == 0):
+        raise ValueError("Every vertex must belong to at least one edge")
+    edge_of_entry = np.repeat(np.arange(len(sizes), dtype=np.int64), sizes)
+    keys = np.sort(edge_of_entry * n_vertices + vertex_ids)
+    if np.any(keys[1:] == keys[:-1]):
+        raise ValueError("An edge contains the same vertex twice")
+    return n_vertices
@@ -0,0 +1,192 @@
+"""Process-wide timing spans, value observations and counters.
+
+Recording is off by default. While it is off, ``span`` returns a shared no-op
+context manager and ``observe``/``count`` return after one flag check, so the
+calls can stay in hot paths. Metric names may carry labels as keyword
+arguments, e.g. ``count("cache_requests", cache="result_store", result="hit")``.
+"""
+
+import threading
+import time
+from contextlib import nullcontext
+from typing import Dict, Tuple
+
+Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+_enabled = False
+_lock = threading.Lock()
+_spans: Dict[Key, "Stats"] = {}
+_values: Dict[Key, "Stats"] = {}
+_counters: Dict[Key, float] = {}
+_NULL_SPAN = nullcontext()
+
+
+class Stats:
+    __slots__ = ("count", "total", "max", "last")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.last = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {"count": self.count, "total": self.total, "mean": self.mean, "max": self.max, "last": self.last}
+
+
+def _key(name: str, labels: Dict[str, object]) -> Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class _Span:
+    __slots__ = ("key", "start")
+
+    def __init__(self, key: Key):
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        with _lock:
+            _spans.setdefault(self.key, Stats()).add(elapsed)
+        return False
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _values.clear()
+        _counters.clear()
+
+
+def span(name: str, **labels):
+    """Context manager timing its body into the ``name`` span"""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(_key(name, labels))
+
+
+def observe(name: str, value: float, **labels):
+    """Record one observation of a size or count, e.g. LP nnz or solver iterations"""
+    if not _enabled:
+        return
+    with _lock:
+        _values.setdefault(_key(name, labels), Stats()).add(float(value))
+
+
+def count(name: str, amount: float = 1, **labels):
+    if not _enabled:
+        return
+    with _lock:
+        key = _key(name, labels)
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def hit_rate(cache: str) -> float:
+    """Share of ``cache_requests`` for ``cache`` that were hits; 0 before any request"""
+    with _lock:
+        hits = _counters.get(_key("cache_requests", {"cache": cache, "result": "hit"}), 0)
+        misses = _counters.get(_key("cache_requests", {"cache": cache, "result": "miss"}), 0)
+    return hits / (hits + misses) if hits + misses else 0.0
+
+
+def _format_key(key: Key) -> str:
+    name, labels = key
+    return name if not labels else name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+
+def snapshot() -> Dict[str, Dict[str, object]]:
+    """Plain-dict copy of everything recorded so far, keyed by ``name{label=value}``"""
+    with _lock:
+        return {
+            "spans": {_format_key(k): s.as_dict() for k, s in _spans.items()},
+            "values": {_format_key(k): s.as_dict() for k, s in _values.items()},
+            "counters": {_format_key(k): v for k, v in _counters.items()},
+        }
+
+
+def difference(before: Dict[str, Dict[str, object]], after: Dict[str, Dict[str, object]]) -> Dict[str, Dict[str, object]]:
+    """What was recorded between two snapshots, in the snapshot layout.
+
+    Counts, totals and counters are subtracted and means recomputed; ``max``
+    and ``last`` are those of ``after``. Entries that did not change are left out.
+    """
+    result = {}
+    for section in ("spans", "values"):
+        entries = {}
+        for name, stats in after[section].items():
+            old = before[section].get(name, {"count": 0, "total": 0.0})
+            calls = stats["count"] - old["count"]
+            if calls > 0:
+                total = stats["total"] - old["total"]
+                entries[name] = {"count": calls, "total": total, "mean": total / calls, "max": stats["max"],
+                                 "last": stats["last"]}
+        result[section] = entries
+    result["counters"] = {name: value - before["counters"].get(name, 0)
+                          for name, value in after["counters"].items()
+                          if value != before["counters"].get(name, 0)}
+    return result
+
+
+def _prometheus_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+
+def _metric_name(prefix: str, name: str) -> str:
+    return prefix + "".join(c if c.isalnum() or c == "_" else "_" for c in name)
+
+
+def to_prometheus(prefix: str = "qqc_") -> str:
+    """Prometheus text exposition: spans and observations as summaries, counters as counters"""
+    with _lock:
+        spans = sorted(_spans.items())
+        values = sorted(_values.items())
+        counters = sorted(_counters.items())
+    lines = []
+    for entries, suffix in ((spans, "_seconds"), (values, "")):
+        declared = set()
+        for (name, labels), stats in entries:
+            metric = _metric_name(prefix, name) + suffix
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} summary")
+                declared.add(metric)
+            lines.append(f"{metric}_sum{_prometheus_labels(labels)} {stats.total!r}")
+            lines.append(f"{metric}_count{_prometheus_labels(labels)} {stats.count}")
+    declared = set()
+    for (name, labels), value in counters:
+        metric = _metric_name(prefix, name) + "_total"
+        if metric not in declared:
+            lines.append(f"# TYPE {metric} counter")
+            declared.add(metric)
+        lines.append(f"{metric}{_prometheus_labels(labels)} {value!r}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,263 @@
+import heapq
+import math
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .hypergraph import Hypergraph
+from .lp import CSC, ReusableLP
+
+EPSILON = 1e-6
+
+
+class IntegralResult(NamedTuple):
+    value: int
+    # Proven bound on the integral optimum: lower for ρ, upper for τ
+    bound: int
+    fractional: float
+    integrality_gap: float
+    optimal: bool
+    edges: List[int]
+    nodes: int
+
+
+class IntegralSolver:
+    """Exact ρ (minimum edge cover) and τ (maximum matching) by LP-based branch-and-bound.
+
+    Reductions fix dominated and forced edges first, greedy and LP-rounded
+    solutions seed the incumbent, and every node re-solves one persistent LP
+    whose column bounds encode the branching decisions. With ``time_limit``
+    the search stops early and reports the incumbent with the best bound.
+    """
+
+    def __init__(self, hypergraph: Hypergraph):
+        offsets, vertex_ids = hypergraph.get_incidence_arrays()
+        self.n_vertices = hypergraph.get_vertex_count()
+        self.n_edges = hypergraph.get_edge_count()
+        self.edge_masks: List[int] = []
+        for i in range(self.n_edges):
+            mask = 0
+            for v in vertex_ids[offsets[i]:offsets[i + 1]]:
+                mask |= 1 << int(v)
+            self.edge_masks.append(mask)
+        self.matrix = CSC(np.ones(len(vertex_ids)), vertex_ids, offsets, (self.n_vertices, self.n_edges))
+
+    def solve_edge_cover(self, time_limit: Optional[float] = None) -> IntegralResult:
+        if self.n_vertices == 0 or self.n_edges == 0:
+            return IntegralResult(0, 0, 0.0, 1.0, True, [], 0)
+
+        forced, excluded, uncovered = self._reduce_cover()
+        row_lower = np.zeros(self.n_vertices)
+        row_lower[list(_bits(uncovered))] = 1.0
+        lp = ReusableLP(self.matrix, np.ones(self.n_edges), row_lower, np.full(self.n_vertices, np.inf))
+        return _BranchAndBound(self, lp, True, forced, excluded, uncovered).run(time_limit)
+
+    def solve_edge_packing(self, time_limit: Optional[float] = None) -> IntegralResult:
+        if self.n_vertices == 0 or self.n_edges == 0:
+            return IntegralResult(0, 0, 0.0, 1.0, True, [], 0)
+
+        forced, excluded = self._reduce_packing()
+        lp = ReusableLP(self.matrix, -np.ones(self.n_edges), np.zeros(self.n_vertices), np.ones(self.n_vertices))
+        return _BranchAndBound(self, lp, False, forced, excluded, 0).run(time_limit)
+
+    def _reduce_cover(self) -> Tuple[int, int, int]:
+        """(forced edges, excluded edges, vertices still to cover) as bitmasks"""
+        forced = excluded = 0
+        uncovered = (1 << self.n_vertices) - 1
+        changed = True
+        while changed:
+            changed = False
+            live = [e for e in range(self.n_edges) if not (forced | excluded) >> e & 1]
+            # An edge whose uncovered part lies inside another edge's is never needed
+            for e in live:
+                restricted = self.edge_masks[e] & uncovered
+                for f in live:
+                    if f == e or excluded >> f & 1:
+                        continue
+                    other = self.edge_masks[f] & uncovered
+                    if restricted & ~other == 0 and (restricted != other or f < e):
+                        excluded |= 1 << e
+                        changed = True
+                        break
+            # A vertex left with a single candidate edge forces that edge
+            for v in _bits(uncovered):
+                if not uncovered >> v & 1:
+                    continue
+                candidates = [e for e in range(self.n_edges)
+                              if self.edge_masks[e] >> v & 1 and not (forced | excluded) >> e & 1]
+                if len(candidates) == 1:
+                    forced |= 1 << candidates[0]
+                    uncovered &= ~self.edge_masks[candidates[0]]
+                    changed = True
+        return forced, excluded, uncovered
+
+    def _reduce_packing(self) -> Tuple[int, int]:
+        forced = excluded = 0
+        for e in range(self.n_edges):
+            for f in range(self.n_edges):
+                if f == e:
+                    continue
+                inner, outer = self.edge_masks[f], self.edge_masks[e]
+                # A superset of another edge can always be swapped for it
+                if inner & ~outer == 0 and (inner != outer or f < e):
+                    excluded |= 1 << e
+                    break
+        for e in range(self.n_edges):
+            if excluded >> e & 1:
+                continue
+            if all(f == e or excluded >> f & 1 or not self.edge_masks[e] & self.edge_masks[f]
+                   for f in range(self.n_edges)):
+                forced |= 1 << e
+        return forced, excluded
+
+    def greedy_cover(self, uncovered: int, allowed: int, priority: Optional[np.ndarray] = None) -> int:
+        chosen = 0
+        while uncovered:
+            best = max((e for e in _bits(allowed) if self.edge_masks[e] & uncovered),
+                       key=lambda e: (bin(self.edge_masks[e] & uncovered).count('1'),
+                                      0.0 if priority is None else priority[e]),
+                       default=None)
+            if best is None:
+                return -1
+            chosen |= 1 << best
+            uncovered &= ~self.edge_masks[best]
+        return chosen
+
+    def prune_cover(self, chosen: int, required: int) -> int:
+        """Drop edges whose vertices stay covered without them"""
+        for e in sorted(_bits(chosen), key=lambda e: bin(self.edge_masks[e]).count('1')):
+            covered = 0
+            for f in _bits(chosen & ~(1 << e)):
+                covered |= self.edge_masks[f]
+            if required & ~covered == 0:
+                chosen &= ~(1 << e)
+        return chosen
+
+    def greedy_packing(self, allowed: int, taken: int, priority: Optional[np.ndarray] = None) -> int:
+        used = 0
+        for e in _bits(taken):
+            used |= self.edge_masks[e]
+        order = sorted(_bits(allowed), key=lambda e: (-(0.0 if priority is None else priority[e]),
+                                                      bin(self.edge_masks[e]).count('1')))
+        for e in order:
+            if not self.edge_masks[e] & used:
+                taken |= 1 << e
+                used |= self.edge_masks[e]
+        return taken
+
+
+class _BranchAndBound:
+    def __init__(self, solver: IntegralSolver, lp: ReusableLP, cover: bool,
+                 forced: int, excluded: int, uncovered: int):
+        self.solver = solver
+        self.lp = lp
+        self.cover = cover
+        self.forced = forced
+        self.excluded = excluded
+        self.uncovered = uncovered
+        self.all_edges = (1 << solver.n_edges) - 1
+        self.incumbent = -1
+        self.incumbent_value = math.inf if cover else -math.inf
+        self.nodes = 0
+
+    def _offer(self, edges: int):
+        if edges < 0:
+            return
+        value = bin(edges).count('1')
+        if (value < self.incumbent_value) if self.cover else (value > self.incumbent_value):
+            self.incumbent, self.incumbent_value = edges, value
+
+    def _heuristics(self, ones: int, zeros: int, x: Optional[np.ndarray]):
+        solver = self.solver
+        allowed = self.all_edges & ~zeros & ~self.excluded
+        if self.cover:
+            remaining = self.uncovered
+            for e in _bits(ones):
+                remaining &= ~solver.edge_masks[e]
+            required = (1 << solver.n_vertices) - 1
+            for priority in self._priorities(ones, zeros, x):
+                greedy = solver.greedy_cover(remaining, allowed & ~ones, priority)
+                if greedy >= 0:
+                    self._offer(solver.prune_cover(greedy | ones | self.forced, required))
+        else:
+            for priority in self._priorities(ones, zeros, x):
+                self._offer(solver.greedy_packing(allowed & ~ones & ~self.forced, ones | self.forced, priority))
+
+    @staticmethod
+    def _priorities(ones: int, zeros: int, x: Optional[np.ndarray]):
+        # Plain greedy only at the root; deeper nodes are guided by their LP solution
+        return (None, x) if ones == zeros == 0 else (x,)
+
+    def _bound(self, objective: float) -> int:
+        forced = bin(self.forced).count('1')
+        if self.cover:
+            return forced + math.ceil(objective - EPSILON)
+        return forced + math.floor(-objective + EPSILON)
+
+    def _solve_node(self, ones: int, zeros: int) -> Tuple[Optional[float], Optional[np.ndarray]]:
+        self.nodes += 1
+        lower = np.zeros(self.solver.n_edges)
+        upper = np.full(self.solver.n_edges, np.inf)
+        lower[list(_bits(ones))] = 1.0
+        upper[list(_bits(zeros | self.excluded | self.forced))] = 0.0
+        self.lp.set_col_bounds(lower, upper)
+        return self.lp.solve()
+
+    def _is_pruned(self, bound: int) -> bool:
+        return bound >= self.incumbent_value if self.cover else bound <= self.incumbent_value
+
+    def run(self, time_limit: Optional[float]) -> IntegralResult:
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        root, x = self._solve_node(0, 0)
+        if root is None:
+            raise RuntimeError("Integral problem is infeasible")
+        fractional = abs(root) + bin(self.forced).count('1')
+        root_bound = self._bound(root)
+        self._heuristics(0, 0, x)
+
+        # Best-first search; the sign makes the heap pop the weakest bound first
+        sign = 1 if self.cover else -1
+        heap = [(sign * root_bound, 0, 0, 0, root, x)]
+        counter = 1
+        while heap:
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            key, _, ones, zeros, objective, x = heapq.heappop(heap)
+            if self._is_pruned(sign * key):
+                continue
+            if objective is None:
+                objective, x = self._solve_node(ones, zeros)
+                if objective is None or self._is_pruned(self._bound(objective)):
+                    continue
+                self._heuristics(ones, zeros, x)
+
+            fractional_parts = np.abs(x - np.round(x))
+            if fractional_parts.max(initial=0.0) <= EPSILON:
+                self._offer(int(sum(1 << int(e) for e in np.flatnonzero(x > 0.5))) | self.forced)
+                continue
+            branch = int(np.argmax(fractional_parts))
+            bound = self._bound(objective)
+            for child_ones, child_zeros in ((ones | 1 << branch, zeros), (ones, zeros | 1 << branch)):
+                heapq.heappush(heap, (sign * bound, counter, child_ones, child_zeros, None, None))
+                counter += 1
+
+        open_bounds = [sign * entry[0] for entry in heap if not self._is_pruned(sign * entry[0])]
+        if open_bounds:
+            best_bound = min(open_bounds) if self.cover else max(open_bounds)
+        else:
+            best_bound = self.incumbent_value
+        value = int(self.incumbent_value)
+        if self.cover:
+            gap = value / fractional if fractional > 0 else 1.0
+        else:
+            gap = fractional / value if value > 0 else 1.0
+        return IntegralResult(value, int(best_bound), fractional, gap, not open_bounds,
+                              sorted(_bits(self.incumbent)), self.nodes)
+
+
+def _bits(mask: int):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
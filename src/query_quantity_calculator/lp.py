@@ -0,0 +1,156 @@
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from . import instrumentation
+
+try:
+    import highspy
+except ImportError:  # optional: without it every solve goes through linprog
+    highspy = None
+
+
+class CSC(NamedTuple):
+    """A column-major sparse matrix as bare arrays, the layout HiGHS takes.
+
+    Building models from it does not import scipy, which only the linprog
+    fallback needs.
+    """
+    data: np.ndarray
+    indices: np.ndarray
+    indptr: np.ndarray
+    shape: Tuple[int, int]
+
+
+class ReusableLP:
+    """min cost·x  s.t.  row_lower <= A x <= row_upper,  col_lower <= x <= col_upper
+
+    The constraint matrix is fixed; callers change bounds between solves. With
+    highspy the model is passed to HiGHS once and only changed bounds are
+    pushed, so every solve hot-starts from the previous basis. Without it each
+    solve is a ``linprog`` call on the prebuilt sparse matrix. An existing
+    ``highspy.Highs`` instance can be handed in to be reloaded instead of
+    creating a new one. ``matrix`` is a scipy sparse matrix or a ``CSC``.
+    """
+
+    def __init__(self, matrix, cost: np.ndarray,
+                 row_lower: np.ndarray, row_upper: np.ndarray,
+                 col_lower: Optional[np.ndarray] = None, col_upper: Optional[np.ndarray] = None,
+                 highs=None):
+        if getattr(matrix, "format", "csc") != "csc" or not hasattr(matrix, "indptr"):
+            from scipy.sparse import csc_matrix
+            matrix = csc_matrix(matrix)
+        self.matrix = matrix
+        self._rows = None
+        self.cost = np.asarray(cost, dtype=float)
+        self.n_rows, self.n_cols = self.matrix.shape
+        self.row_lower = np.asarray(row_lower, dtype=float).copy()
+        self.row_upper = np.asarray(row_upper, dtype=float).copy()
+        self.col_lower = np.zeros(self.n_cols) if col_lower is None else np.asarray(col_lower, dtype=float).copy()
+        self.col_upper = np.full(self.n_cols, np.inf) if col_upper is None else np.asarray(col_upper, dtype=float).copy()
+        self.lp_count = 0
+        self._row_duals: Optional[np.ndarray] = None
+        self._highs = self._build_highs_model(highs) if highspy is not None else None
+
+    @property
+    def rows(self):
+        """The constraint matrix as scipy CSR"""
+        if self._rows is None:
+            from scipy.sparse import csc_matrix
+            self._rows = csc_matrix((self.matrix.data, self.matrix.indices, self.matrix.indptr),
+                                    shape=self.matrix.shape).tocsr()
+        return self._rows
+
+    def _build_highs_model(self, highs):
+        lp = highspy.HighsLp()
+        lp.num_col_ = self.n_cols
+        lp.num_row_ = self.n_rows
+        lp.col_cost_ = self.cost
+        lp.col_lower_ = self.col_lower
+        lp.col_upper_ = self.col_upper
+        lp.row_lower_ = self.row_lower
+        lp.row_upper_ = self.row_upper
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        lp.a_matrix_.start_ = self.matrix.indptr
+        lp.a_matrix_.index_ = self.matrix.indices
+        lp.a_matrix_.value_ = self.matrix.data
+        if highs is None:
+            highs = highspy.Highs()
+            highs.silent()
+        highs.passModel(lp)
+        return highs
+
+    def set_cost(self, cost: np.ndarray):
+        changed = np.flatnonzero(cost != self.cost)
+        if len(changed) == 0:
+            return
+        self.cost = np.asarray(cost, dtype=float).copy()
+        if self._highs is not None:
+            self._highs.changeColsCost(len(changed), changed.astype(np.int32), self.cost[changed])
+
+    def set_row_bounds(self, lower: np.ndarray, upper: np.ndarray):
+        changed = np.flatnonzero((lower != self.row_lower) | (upper != self.row_upper))
+        if len(changed) == 0:
+            return
+        self.row_lower[changed] = lower[changed]
+        self.row_upper[changed] = upper[changed]
+        if self._highs is not None:
+            self._highs.changeRowsBounds(len(changed), changed.astype(np.int32),
+                                         self.row_lower[changed], self.row_upper[changed])
+
+    def set_col_bounds(self, lower: np.ndarray, upper: np.ndarray):
+        changed = np.flatnonzero((lower != self.col_lower) | (upper != self.col_upper))
+        if len(changed) == 0:
+            return
+        self.col_lower[changed] = lower[changed]
+        self.col_upper[changed] = upper[changed]
+        if self._highs is not None:
+            self._highs.changeColsBounds(len(changed), changed.astype(np.int32),
+                                         self.col_lower[changed], self.col_upper[changed])
+
+    def solve(self) -> Tuple[Optional[float], Optional[np.ndarray]]:
+        """(objective, x); (None, None) when infeasible, RuntimeError on any other failure"""
+        self.lp_count += 1
+        if self._highs is None:
+            return self._solve_linprog()
+        self._highs.run()
+        if instrumentation.enabled():
+            info = self._highs.getInfo()
+            instrumentation.observe("lp_iterations", info.simplex_iteration_count + info.ipm_iteration_count,
+                                    backend="highs-persistent")
+        status = self._highs.getModelStatus()
+        if status == highspy.HighsModelStatus.kInfeasible:
+            return None, None
+        if status != highspy.HighsModelStatus.kOptimal:
+            raise RuntimeError(f"LP solve failed: {self._highs.modelStatusToString(status)}")
+        return self._highs.getObjectiveValue(), np.asarray(self._highs.getSolution().col_value)
+
+    def row_duals(self) -> Optional[np.ndarray]:
+        """Row duals of the last optimal solve in HiGHS' sign convention (>= 0 at a lower bound, <= 0 at an upper one)"""
+        if self._highs is not None:
+            return np.asarray(self._highs.getSolution().row_dual)
+        return self._row_duals
+
+    def _solve_linprog(self) -> Tuple[Optional[float], Optional[np.ndarray]]:
+        from scipy.optimize import linprog
+        from scipy.sparse import vstack
+        upper_rows = np.flatnonzero(np.isfinite(self.row_upper))
+        lower_rows = np.flatnonzero(np.isfinite(self.row_lower))
+        A_ub = vstack([self.rows[upper_rows], -self.rows[lower_rows]], format='csr')
+        b_ub = np.concatenate([self.row_upper[upper_rows], -self.row_lower[lower_rows]])
+        bounds = np.column_stack([self.col_lower, self.col_upper])
+        if A_ub.shape[0] == 0:
+            A_ub, b_ub = None, None
+        result = linprog(self.cost, A_ub=A_ub, b_ub=b_ub, bounds=bounds, method='highs')
+        instrumentation.observe("lp_iterations", result.nit, backend="highs")
+        if result.status == 2:
+            return None, None
+        if not result.success:
+            raise RuntimeError(f"LP solve failed: {result.message}")
+        self._row_duals = np.zeros(self.n_rows)
+        if A_ub is not None:
+            marginals = result.ineqlin.marginals
+            self._row_duals[upper_rows] += marginals[:len(upper_rows)]
+            self._row_duals[lower_rows] -= marginals[len(upper_rows):]
+        return result.fun, result.x
+
@@ -1,32 +1,104 @@
 import re
-from typing import List, Tuple, Set
+from typing import List, NamedTuple, Tuple, Set
+
+from . import instrumentation
+
+
+class RelationStatistic(NamedTuple):
+    """deg_R(y | x) <= bound: every x-value of atom ``atom`` has at most ``bound`` y-values.
+
+    ``x`` empty is a cardinality |R| <= bound, and ``bound`` 1 a functional
+    dependency x -> y. ``y`` includes ``x``.
+    """
+    relation: str
+    atom: int
+    x: Tuple[str, ...]
+    y: Tuple[str, ...]
+    bound: float
 
 
 class DatalogParser:
     def __init__(self):
-        self.pattern = re.compile(r'^([A-Za-z][A-Za-z0-9_]*)\s*\(\s*([^)]+)\s*\)$')
-    
+        self.pattern = re.compile(r'^([A-Za-z][A-Za-z0-9_]*)\s*\(\s*([^)]+)\s*\)(?:\s*\[(.*)\])?$')
+        self.size_pattern = re.compile(r'^size\s*=\s*([0-9.eE+]+)$')
+        self.degree_pattern = re.compile(r'^deg\s*\(\s*([^)]+)\s*\)\s*=\s*([0-9.eE+]+)$')
+        self.dependency_pattern = re.compile(r'^([^-]+)->(.+)$')
+
     def parse_query(self, query_text: str) -> List[Tuple[str, List[str]]]:
-        relations = []
-        for line in query_text.strip().split('\n'):
-            line = line.strip()
-            if not line:
+        return self.parse_annotated_query(query_text)[0]
+
+    def parse_annotated_query(self, query_text: str) -> Tuple[List[Tuple[str, List[str]]], List[RelationStatistic]]:
+        """Relations and their optional statistics, written after an atom in brackets:
+
+            R(a, b, c) [size=1000; deg(a)=20; a, b -> c]
+
+        ``size`` bounds |R|, ``deg(x)`` the number of tuples per x-value and
+        ``x -> y`` is a functional dependency.
+        """
+        with instrumentation.span("parse"):
+            relations = []
+            statistics = []
+            for line in query_text.strip().split('\n'):
+                line = line.strip()
+                if not line:
+                    continue
+
+                match = self.pattern.match(line)
+                if not match:
+                    raise ValueError(f"Invalid relation format: {line}")
+
+                relation_name = match.group(1)
+                args_str = match.group(2)
+                args = [arg.strip() for arg in args_str.split(',')]
+                if match.group(3) is not None:
+                    statistics.extend(self._parse_statistics(relation_name, len(relations), args, match.group(3)))
+
+                relations.append((relation_name, args))
+
+            return relations, statistics
+
+    def _parse_statistics(self, relation_name: str, atom: int, args: List[str],
+                          annotation: str) -> List[RelationStatistic]:
+        variables = tuple(sorted(set(args)))
+        result = []
+        for item in annotation.split(';'):
+            item = item.strip()
+            if not item:
                 continue
-            
-            match = self.pattern.match(line)
-            if not match:
-                raise ValueError(f"Invalid relation format: {line}")
-            
-            relation_name = match.group(1)
-            args_str = match.group(2)
-            args = [arg.strip() for arg in args_str.split(',')]
-            
-            relations.append((relation_name, args))
-        
-        return relations
-    
+            size = self.size_pattern.match(item)
+            degree = self.degree_pattern.match(item)
+            dependency = self.dependency_pattern.match(item)
+            if size:
+                x, y, bound = (), variables, _number(size.group(1), item)
+            elif degree:
+                x, y, bound = _variables(degree.group(1)), variables, _number(degree.group(2), item)
+            elif dependency:
+                x = _variables(dependency.group(1))
+                x, y, bound = x, tuple(sorted(set(x) | set(_variables(dependency.group(2))))), 1.0
+            else:
+                raise ValueError(f"Invalid statistic for {relation_name}: {item}")
+            unknown = (set(x) | set(y)) - set(variables)
+            if unknown:
+                raise ValueError(f"{relation_name} has no variables {', '.join(sorted(unknown))}: {item}")
+            result.append(RelationStatistic(relation_name, atom, x, y, bound))
+        return result
+
     def get_all_variables(self, relations: List[Tuple[str, List[str]]]) -> Set[str]:
         variables = set()
         for _, args in relations:
             variables.update(args)
-        return variables
\ No newline at end of file
+        return variables
+
+
+def _variables(text: str) -> Tuple[str, ...]:
+    return tuple(sorted({name.strip() for name in text.split(',') if name.strip()}))
+
+
+def _number(text: str, item: str) -> float:
+    try:
+        value = float(text)
+    except ValueError:
+        raise ValueError(f"Invalid number in statistic: {item}")
+    if value < 1:
+        raise ValueError(f"Statistics must be at least 1: {item}")
+    return value
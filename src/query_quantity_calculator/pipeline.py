@@ -0,0 +1,298 @@
+"""Streaming analysis with bounded memory.
+
+Read, parse, build, solve and write run on their own threads and hand
+queries on through bounded queues. At most ``max_in_flight`` queries are
+between reading and writing at any time, so memory stays flat however large
+the input is: a slow stage makes the ones before it wait. Results come out
+in input order.
+
+    python -m src.query_quantity_calculator.pipeline corpus.txt results.jsonl --solvers 4
+"""
+
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, TextIO
+
+from .backends import LPBackend
+from .batch import QueryAnalysis, analyze_hypergraph, failed_analysis
+from .hypergraph import Hypergraph
+from .parser import DatalogParser
+from .shards import read_corpus_file
+from .store import ResultStore
+
+STAGE_NAMES = ("read", "parse", "build", "solve", "write")
+
+# Marks the end of the input on a queue
+_END = object()
+# How often blocked stages check whether the pipeline was stopped
+_POLL = 0.1
+
+
+class StageReport(NamedTuple):
+    stage: str
+    items: int
+    # Seconds spent working, excluding waits on the queues
+    busy: float
+    # Items per busy second
+    throughput: float
+    # Depth of the stage's input queue, sampled at every item
+    max_queue: int
+    mean_queue: float
+
+
+class PipelineReport(NamedTuple):
+    items: int
+    elapsed: float
+    stages: List[StageReport]
+
+
+class _Stopped(Exception):
+    pass
+
+
+class _Stage:
+    def __init__(self, name: str, function: Callable, inbox: Optional[queue.Queue], outbox: Optional[queue.Queue],
+                 workers: int = 1):
+        self.name = name
+        self.function = function
+        self.inbox = inbox
+        self.outbox = outbox
+        self.workers = workers
+        self.items = 0
+        self.busy = 0.0
+        self.max_queue = 0
+        self.queue_total = 0
+        self._lock = threading.Lock()
+        self._running = workers
+
+    def record(self, busy: float):
+        depth = self.inbox.qsize() if self.inbox is not None else 0
+        with self._lock:
+            self.items += 1
+            self.busy += busy
+            self.max_queue = max(self.max_queue, depth)
+            self.queue_total += depth
+
+    def worker_done(self) -> bool:
+        """True for the last worker of the stage to finish"""
+        with self._lock:
+            self._running -= 1
+            return self._running == 0
+
+    def report(self) -> StageReport:
+        with self._lock:
+            return StageReport(self.name, self.items, self.busy, self.items / self.busy if self.busy else 0.0,
+                               self.max_queue, self.queue_total / self.items if self.items else 0.0)
+
+
+class StreamingPipeline:
+    """read → parse → build → solve → write over bounded queues.
+
+    ``solve_workers`` threads share the solve stage (HiGHS releases the GIL,
+    and each thread keeps its own model); the writer restores input order.
+    ``report()`` can be polled from another thread while a run is going.
+    """
+
+    def __init__(self, queue_size: int = 64, solve_workers: int = 1, max_in_flight: Optional[int] = None,
+                 backend: Optional[LPBackend] = None, store: Optional[ResultStore] = None):
+        if queue_size < 1 or solve_workers < 1:
+            raise ValueError("Queue size and solver count must be positive")
+        self.queue_size = queue_size
+        self.solve_workers = solve_workers
+        self.max_in_flight = max_in_flight or queue_size * len(STAGE_NAMES) + solve_workers
+        self.backend = backend
+        self.store = store
+        self._stages: List[_Stage] = []
+        self._started = 0.0
+        self._finished: Optional[float] = None
+
+    def report(self) -> PipelineReport:
+        stages = [stage.report() for stage in self._stages]
+        end = self._finished if self._finished is not None else time.perf_counter()
+        return PipelineReport(stages[-1].items if stages else 0, end - self._started if stages else 0.0, stages)
+
+    def run(self, queries: Iterable[str], write: Callable[[QueryAnalysis], None]) -> PipelineReport:
+        """Analyze every query and pass the results to ``write`` in input order; the calling thread is the write stage"""
+        for analysis in self._run(queries):
+            write(analysis)
+        return self.report()
+
+    def stream(self, queries: Iterable[str]) -> Iterator[QueryAnalysis]:
+        """The results as a generator; the caller's loop is the write stage. Closing it stops the pipeline"""
+        return self._run(queries)
+
+    def _run(self, queries: Iterable[str]) -> Iterator[QueryAnalysis]:
+        stop = threading.Event()
+        window = threading.Semaphore(self.max_in_flight)
+        errors: List[BaseException] = []
+        parser = DatalogParser()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(STAGE_NAMES) - 1)]
+
+        # Items are (index, query text, payload, start) until a stage fails them,
+        # after which they are (index, QueryAnalysis) and pass straight through
+        def parse(item):
+            index, query_text, start = item
+            try:
+                relations = parser.parse_query(query_text)
+            except ValueError as e:
+                return index, failed_analysis(query_text, e, start)
+            if not relations:
+                return index, failed_analysis(query_text, ValueError("No valid query has been entered"), start)
+            return index, query_text, relations, start
+
+        def build(item):
+            if len(item) == 2:
+                return item
+            index, query_text, relations, start = item
+            hypergraph = Hypergraph()
+            hypergraph.from_relations(relations)
+            return index, query_text, hypergraph, start
+
+        def solve(item):
+            if len(item) == 2:
+                return item
+            index, query_text, hypergraph, start = item
+            return index, analyze_hypergraph(hypergraph, query_text, self.backend, self.store, start)
+
+        read = _Stage("read", None, None, queues[0])
+        self._stages = [read,
+                        _Stage("parse", parse, queues[0], queues[1]),
+                        _Stage("build", build, queues[1], queues[2]),
+                        _Stage("solve", solve, queues[2], queues[3], self.solve_workers)]
+        writer = _Stage("write", None, queues[3], None)
+        self._stages.append(writer)
+        self._started = time.perf_counter()
+        self._finished = None
+
+        threads = [threading.Thread(target=self._read, args=(read, iter(queries), window, stop, errors),
+                                    name="qqc-pipeline-read", daemon=True)]
+        for stage in self._stages[1:-1]:
+            for i in range(stage.workers):
+                threads.append(threading.Thread(target=self._work, args=(stage, stop, errors),
+                                                name=f"qqc-pipeline-{stage.name}-{i}", daemon=True))
+        for thread in threads:
+            thread.start()
+
+        pending = {}
+        next_index = 0
+        try:
+            while True:
+                item = _get(writer.inbox, stop)
+                if item is _END:
+                    break
+                index, analysis = item
+                pending[index] = analysis
+                while next_index in pending:
+                    analysis = pending.pop(next_index)
+                    next_index += 1
+                    start = time.perf_counter()
+                    yield analysis
+                    writer.record(time.perf_counter() - start)
+                    window.release()
+        except _Stopped:
+            pass
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            self._finished = time.perf_counter()
+        if errors:
+            raise errors[0]
+
+    def _read(self, stage: _Stage, queries: Iterator[str], window: threading.Semaphore,
+              stop: threading.Event, errors: List[BaseException]):
+        try:
+            index = 0
+            while True:
+                while not window.acquire(timeout=_POLL):
+                    if stop.is_set():
+                        return
+                start = time.perf_counter()
+                query_text = next(queries, _END)
+                if query_text is _END:
+                    break
+                stage.record(time.perf_counter() - start)
+                _put(stage.outbox, (index, query_text, start), stop)
+                index += 1
+            _put(stage.outbox, _END, stop)
+        except _Stopped:
+            pass
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+
+    def _work(self, stage: _Stage, stop: threading.Event, errors: List[BaseException]):
+        try:
+            while True:
+                item = _get(stage.inbox, stop)
+                if item is _END:
+                    # Leave the marker for the stage's other workers
+                    _put(stage.inbox, _END, stop)
+                    break
+                start = time.perf_counter()
+                result = stage.function(item)
+                stage.record(time.perf_counter() - start)
+                _put(stage.outbox, result, stop)
+            if stage.worker_done():
+                _put(stage.outbox, _END, stop)
+        except _Stopped:
+            pass
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+
+
+def _get(inbox: queue.Queue, stop: threading.Event):
+    while True:
+        try:
+            return inbox.get(timeout=_POLL)
+        except queue.Empty:
+            if stop.is_set():
+                raise _Stopped()
+
+
+def _put(outbox: queue.Queue, item, stop: threading.Event):
+    while True:
+        try:
+            outbox.put(item, timeout=_POLL)
+            return
+        except queue.Full:
+            if stop.is_set():
+                raise _Stopped()
+
+
+def jsonl_writer(out: TextIO) -> Callable[[QueryAnalysis], None]:
+    """A write stage appending one JSON line per result to an open text file"""
+    def write(analysis: QueryAnalysis):
+        out.write(json.dumps(analysis._asdict()) + "\n")
+    return write
+
+
+def format_report(report: PipelineReport) -> str:
+    lines = [f"{report.items} queries in {report.elapsed:.2f}s",
+             f"{'stage':<6} {'items':>8} {'busy_s':>8} {'items/s':>10} {'max_q':>6} {'mean_q':>7}"]
+    lines.extend(f"{s.stage:<6} {s.items:>8} {s.busy:>8.2f} {s.throughput:>10.0f} {s.max_queue:>6} "
+                 f"{s.mean_queue:>7.1f}" for s in report.stages)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="corpus file: one atom per line, blank lines between queries")
+    parser.add_argument("output", help="JSON lines, one result per query")
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--solvers", type=int, default=1, help="solve stage threads")
+    args = parser.parse_args(argv)
+
+    pipeline = StreamingPipeline(queue_size=args.queue_size, solve_workers=args.solvers)
+    with open(args.output, "w", encoding="utf-8") as out:
+        report = pipeline.run(read_corpus_file(args.input), jsonl_writer(out))
+    print(format_report(report), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import instrumentation
+from .admission import AdmissionPolicy, admit
+from .fingerprint import FingerprintCache, approximate_size, query_fingerprint
+from .hypergraph import Hypergraph
+from .parser import DatalogParser
+from .solver import QuerySolver
+from .store import ResultStore
+
+# Stages in the order their results become available
+STAGE_STATISTICS = "statistics"
+STAGE_RHO_STAR = "rho_star"
+STAGE_TAU_STAR = "tau_star"
+STAGE_AGM_BOUND = "agm_bound"
+STAGE_VISUALIZATION = "visualization"
+STAGES = (STAGE_STATISTICS, STAGE_RHO_STAR, STAGE_TAU_STAR, STAGE_AGM_BOUND, STAGE_VISUALIZATION)
+
+
+class QueryRejected(ValueError):
+    pass
+
+
+class AnalysisJob:
+    """Results of one analysis, published stage by stage from a worker thread"""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.results: Dict[str, object] = {}
+        self.messages: List[str] = []
+        self.error: Optional[str] = None
+        self.done = False
+        self._changed = threading.Condition()
+
+    def publish(self, stage: str, value: object):
+        with self._changed:
+            self.results[stage] = value
+            self._changed.notify_all()
+
+    def finish(self, error: Optional[str] = None):
+        with self._changed:
+            self.error = error
+            self.done = True
+            self._changed.notify_all()
+
+    def wait(self, seen: int, timeout: Optional[float] = None) -> int:
+        """Block until more than ``seen`` stages are published or the job is done; returns the count"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.done or len(self.results) > seen, timeout)
+            return len(self.results)
+
+    @property
+    def progress(self) -> float:
+        return 1.0 if self.done else len(self.results) / len(STAGES)
+
+
+class JobRegistry:
+    """Runs analyses on a shared pool; identical requests in flight share one job.
+
+    With a ``cache``, successfully finished jobs are kept under their key and
+    a later submission of the same key gets the finished job back without
+    parsing or solving anything.
+    """
+
+    def __init__(self, max_workers: int = 4, cache: Optional[FingerprintCache] = None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="qqc-progressive")
+        self._lock = threading.Lock()
+        self._running: Dict[str, AnalysisJob] = {}
+        self.cache = cache
+
+    def submit(self, key: str, work: Callable[[AnalysisJob], None]) -> AnalysisJob:
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        with self._lock:
+            job = self._running.get(key)
+            if job is not None:
+                return job
+            job = self._running[key] = AnalysisJob(key)
+        self._executor.submit(self._run, job, work)
+        return job
+
+    def _run(self, job: AnalysisJob, work: Callable[[AnalysisJob], None]):
+        error = None
+        try:
+            work(job)
+        except QueryRejected as e:
+            error = str(e)
+        except ValueError as e:
+            error = f"Parse Error: {e}"
+        except RuntimeError as e:
+            error = f"Calculation Error: {e}"
+        except Exception as e:
+            error = f"Unexpected Error: {e}"
+        finally:
+            if error is None and self.cache is not None:
+                self.cache.put(job.key, job, approximate_size((job.results, job.messages)))
+            with self._lock:
+                self._running.pop(job.key, None)
+            job.finish(error)
+
+    def running(self) -> int:
+        with self._lock:
+            return len(self._running)
+
+
+def analysis_key(query_text: str, policy: AdmissionPolicy) -> str:
+    """Equal for queries that differ only in whitespace, atom order or repeated atoms"""
+    digest = hashlib.sha256(query_fingerprint(query_text).encode())
+    digest.update(repr(tuple(policy)).encode())
+    return digest.hexdigest()
+
+
+def analysis_work(query_text: str, policy: AdmissionPolicy,
+                  store: Optional[ResultStore] = None) -> Callable[[AnalysisJob], None]:
+    """The app's pipeline as job stages: statistics first, then ρ*, τ*, AGM and the figure.
+
+    Repeated atoms are dropped (they do not change the query), so every
+    stage depends only on the set of atoms, as the cache key does; the
+    details keep the order in which the atoms first appear.
+    """
+    def work(job: AnalysisJob):
+        relations = _distinct_atoms(DatalogParser().parse_query(query_text))
+        if not relations:
+            raise ValueError("No valid query has been entered")
+        decision = admit(relations, policy)
+        job.messages.extend(decision.messages)
+        if not decision.admitted:
+            raise QueryRejected("Query rejected: " + " ".join(decision.messages))
+
+        hypergraph = Hypergraph()
+        hypergraph.from_relations(relations)
+        job.publish(STAGE_STATISTICS, {
+            "vertex_count": hypergraph.get_vertex_count(),
+            "edge_count": hypergraph.get_edge_count(),
+            "rank": hypergraph.get_rank(),
+            "relations": relations,
+            "approximate": decision.approximate,
+        })
+        solver = QuerySolver(hypergraph, approximate=decision.approximate, epsilon=policy.epsilon, store=store)
+        job.publish(STAGE_RHO_STAR, solver.solve_fractional_edge_cover())
+        job.publish(STAGE_TAU_STAR, solver.solve_fractional_edge_packing())
+        job.publish(STAGE_AGM_BOUND, solver.compute_agm_bound())
+        visualization = None
+        if decision.visualize:
+            with instrumentation.span("visualization"):
+                visualization = hypergraph.create_visualization()
+        job.publish(STAGE_VISUALIZATION, visualization)
+    return work
+
+
+def _distinct_atoms(relations: List[Tuple[str, List[str]]]) -> List[Tuple[str, List[str]]]:
+    seen = set()
+    distinct = []
+    for name, args in relations:
+        atom = (name, tuple(args))
+        if atom not in seen:
+            seen.add(atom)
+            distinct.append((name, args))
+    return distinct
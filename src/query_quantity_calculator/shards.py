@@ -0,0 +1,237 @@
+"""Sharded batch runs over a shared directory.
+
+Query i of the input belongs to shard ``i % shard_count``, so any number of
+machines can each run one shard of the same input file against the same
+directory. A shard appends one JSON line per query to its result file and
+checkpoints after every chunk; rerunning it after a crash resumes from the
+last checkpoint. ``merge`` interleaves the finished shards back into input
+order.
+
+    python -m src.query_quantity_calculator.shards work corpus.txt runs/ --shard 0 --shards 4
+    python -m src.query_quantity_calculator.shards merge runs/ results.jsonl
+    python -m src.query_quantity_calculator.shards run corpus.txt runs/ --shards 4
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .batch import HighsModelPool
+from .corpus import split_queries
+from .startup import preload
+
+MANIFEST = "manifest.json"
+
+
+class ShardStatus(NamedTuple):
+    shard_index: int
+    rows: int
+    # Input position the shard resumes from
+    next_index: int
+    complete: bool
+
+
+def _result_path(directory: str, shard_index: int, shard_count: int) -> str:
+    return os.path.join(directory, f"shard-{shard_index:05d}-of-{shard_count:05d}.jsonl")
+
+
+def _checkpoint_path(directory: str, shard_index: int, shard_count: int) -> str:
+    return _result_path(directory, shard_index, shard_count)[:-len(".jsonl")] + ".checkpoint.json"
+
+
+def _write_json_atomic(path: str, data: dict):
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def prepare(directory: str, shard_count: int, input_digest: Optional[str] = None) -> dict:
+    """Create or check the run's manifest; ValueError if it was started with other settings"""
+    os.makedirs(directory, exist_ok=True)
+    manifest = {"shard_count": shard_count, "input_digest": input_digest}
+    path = os.path.join(directory, MANIFEST)
+    try:
+        with open(path) as f:
+            existing = json.load(f)
+    except FileNotFoundError:
+        # Two workers racing here write the same content
+        _write_json_atomic(path, manifest)
+        return manifest
+    if existing != manifest:
+        raise ValueError(f"{directory} holds a run with {existing}, not {manifest}")
+    return existing
+
+
+def read_checkpoint(directory: str, shard_index: int, shard_count: int) -> ShardStatus:
+    try:
+        with open(_checkpoint_path(directory, shard_index, shard_count)) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return ShardStatus(shard_index, 0, shard_index, False)
+    return ShardStatus(shard_index, data["rows"], data["next_index"], data["complete"])
+
+
+def run_shard(queries: Iterable[str], directory: str, shard_index: int, shard_count: int,
+              chunk_size: int = 1000, max_workers: Optional[int] = None) -> ShardStatus:
+    """Analyze this shard's queries, resuming after the last checkpoint.
+
+    Results are appended to the shard file; after each chunk the file is
+    synced and the checkpoint (byte length, rows, next input position) is
+    replaced atomically. Anything past the checkpointed length, such as a
+    half-written chunk from a crash, is truncated on resume.
+    """
+    if not 0 <= shard_index < shard_count:
+        raise ValueError(f"Shard index must lie in [0, {shard_count})")
+    status = read_checkpoint(directory, shard_index, shard_count)
+    if status.complete:
+        return status
+    checkpoint = _checkpoint_path(directory, shard_index, shard_count)
+    offset = 0
+    if os.path.exists(checkpoint):
+        with open(checkpoint) as f:
+            offset = json.load(f)["offset"]
+
+    mine = ((i, query_text) for i, query_text in enumerate(queries)
+            if i % shard_count == shard_index and i >= status.next_index)
+    path = _result_path(directory, shard_index, shard_count)
+    rows, next_index = status.rows, status.next_index
+    with HighsModelPool(max_workers) as pool, open(path, "a+b") as out:
+        out.truncate(offset)
+        out.seek(offset)
+        while True:
+            chunk = list(islice(mine, chunk_size))
+            if chunk:
+                indices, texts = zip(*chunk)
+                for index, analysis in zip(indices, pool.imap(texts)):
+                    out.write(json.dumps({"index": index, **analysis._asdict()}).encode() + b"\n")
+                out.flush()
+                os.fsync(out.fileno())
+                rows += len(chunk)
+                next_index = indices[-1] + shard_count
+            status = ShardStatus(shard_index, rows, next_index, not chunk)
+            _write_json_atomic(checkpoint, {"offset": out.tell(), "rows": rows, "next_index": next_index,
+                                            "complete": status.complete})
+            if status.complete:
+                return status
+
+
+def status(directory: str) -> List[ShardStatus]:
+    with open(os.path.join(directory, MANIFEST)) as f:
+        shard_count = json.load(f)["shard_count"]
+    return [read_checkpoint(directory, i, shard_count) for i in range(shard_count)]
+
+
+def _read_shard(path: str) -> Iterator[Tuple[int, dict]]:
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            yield record["index"], record
+
+
+def merge(directory: str, destination: str) -> int:
+    """Write all shards' results to one JSON Lines file in input order; returns the row count.
+
+    RuntimeError if a shard has not finished.
+    """
+    shards = status(directory)
+    unfinished = [shard.shard_index for shard in shards if not shard.complete]
+    if unfinished:
+        raise RuntimeError(f"Shards {unfinished} have not finished")
+    shard_count = len(shards)
+    streams = [_read_shard(_result_path(directory, i, shard_count)) for i in range(shard_count)]
+    rows = 0
+    with open(destination, "w") as out:
+        for _, record in heapq.merge(*streams, key=lambda item: item[0]):
+            out.write(json.dumps(record) + "\n")
+            rows += 1
+    return rows
+
+
+def read_corpus_file(path: str) -> Iterator[str]:
+    with open(path, encoding="utf-8") as f:
+        yield from split_queries(f)
+
+
+def run_shard_file(input_path: str, directory: str, shard_index: int, shard_count: int,
+                   chunk_size: int = 1000, max_workers: Optional[int] = None) -> ShardStatus:
+    """run_shard on a corpus file (blank-line separated queries), checking it against the manifest"""
+    prepare(directory, shard_count, file_digest(input_path))
+    return run_shard(read_corpus_file(input_path), directory, shard_index, shard_count, chunk_size, max_workers)
+
+
+def coordinate(input_path: str, directory: str, shard_count: int, destination: Optional[str] = None,
+               processes: Optional[int] = None, chunk_size: int = 1000,
+               max_workers: Optional[int] = 1) -> Dict[int, ShardStatus]:
+    """Run every shard of a corpus file in local processes, then merge if ``destination`` is given.
+
+    Finished shards are skipped and interrupted ones resume, so rerunning
+    after a crash continues the run. The solver's modules are loaded once
+    here rather than in every worker.
+    """
+    prepare(directory, shard_count, file_digest(input_path))
+    preload()
+    with ProcessPoolExecutor(max_workers=processes or shard_count, initializer=preload) as executor:
+        futures = {i: executor.submit(run_shard_file, input_path, directory, i, shard_count, chunk_size, max_workers)
+                   for i in range(shard_count)}
+        results = {i: future.result() for i, future in futures.items()}
+    if destination is not None:
+        merge(directory, destination)
+    return results
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    work = commands.add_parser("work", help="run (or resume) one shard")
+    work.add_argument("input")
+    work.add_argument("directory")
+    work.add_argument("--shard", type=int, required=True)
+    work.add_argument("--shards", type=int, required=True)
+    work.add_argument("--chunk-size", type=int, default=1000)
+    work.add_argument("--workers", type=int, default=None, help="solver threads")
+    merge_command = commands.add_parser("merge", help="merge finished shards in input order")
+    merge_command.add_argument("directory")
+    merge_command.add_argument("destination")
+    run = commands.add_parser("run", help="run all shards locally, then merge")
+    run.add_argument("input")
+    run.add_argument("directory")
+    run.add_argument("--shards", type=int, required=True)
+    run.add_argument("--processes", type=int, default=None)
+    run.add_argument("--chunk-size", type=int, default=1000)
+    run.add_argument("--output", default=None, help="merged results (default: DIRECTORY/results.jsonl)")
+    commands.add_parser("status", help="rows and completion per shard").add_argument("directory")
+    args = parser.parse_args(argv)
+
+    if args.command == "work":
+        shard = run_shard_file(args.input, args.directory, args.shard, args.shards, args.chunk_size, args.workers)
+        print(f"shard {shard.shard_index}: {shard.rows} rows")
+    elif args.command == "merge":
+        print(f"{merge(args.directory, args.destination)} rows written to {args.destination}")
+    elif args.command == "run":
+        output = args.output or os.path.join(args.directory, "results.jsonl")
+        shards = coordinate(args.input, args.directory, args.shards, output, args.processes, args.chunk_size)
+        print(f"{sum(shard.rows for shard in shards.values())} rows written to {output}")
+    else:
+        for shard in status(args.directory):
+            print(f"shard {shard.shard_index}: {shard.rows} rows, "
+                  f"{'complete' if shard.complete else f'next query {shard.next_index}'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,77 +1,123 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 import numpy as np
-from scipy.optimize import linprog
-from typing import List, Tuple
+from . import instrumentation
+from .approximate import ApproximateResult, ApproximateSolver
+from .backends import ApproximateBackend, LPBackend, LPProblem, default_selector
+from .degree_bounds import PolymatroidBound, polymatroid_bound
+from .exact import ExactResult, exact_optimum
 from .hypergraph import Hypergraph
+from .integral import IntegralResult, IntegralSolver
+from .parser import RelationStatistic
+from .store import ResultStore, StoredResult, hypergraph_key
+from .subsets import Subset, SubsetCoverTable
+from .threshold import ThresholdDecider, ThresholdDecision, decide_agm_bound
 
 
 class QuerySolver:
-    def __init__(self, hypergraph: Hypergraph):
+    def __init__(self, hypergraph: Hypergraph, approximate: bool = False, epsilon: float = 0.05,
+                 backend: Optional[LPBackend] = None, store: Optional[ResultStore] = None):
         self.hypergraph = hypergraph
+        # Approximate mode answers ρ*/τ* with the feasible side of a (1 ± ε) bracket
+        self.approximate = approximate
+        self.epsilon = epsilon
+        # None picks a backend per instance size through the default selector
+        self.backend = backend
+        # Exact results are looked up in and saved to the store
+        self.store = store
+        self._analysis: Optional[StoredResult] = None
+
+    def select_backend(self, problem: LPProblem) -> LPBackend:
+        if self.backend is not None:
+            return self.backend
+        if self.approximate:
+            return ApproximateBackend(self.epsilon)
+        return default_selector().select(problem)
     
-    def solve_fractional_edge_cover(self) -> float:
+    def fractional_edge_cover_solution(self) -> Tuple[float, np.ndarray]:
+        """(ρ*, optimal edge weights in hypergraph edge order)"""
         n_vertices = self.hypergraph.get_vertex_count()
         n_edges = self.hypergraph.get_edge_count()
         
         if n_vertices == 0 or n_edges == 0:
-            return 0.0
-        
-        vertices = self.hypergraph.get_vertices_list()
-        vertex_to_index = {v: i for i, v in enumerate(vertices)}
-        
-        A_ub = []
-        b_ub = []
-        
-        for vertex in vertices:
-            constraint = [0.0] * n_edges
-            edges_containing_vertex = self.hypergraph.get_edges_containing_vertex(vertex)
-            
-            for edge_idx in edges_containing_vertex:
-                constraint[edge_idx] = 1.0
-            
-            A_ub.append([-x for x in constraint])
-            b_ub.append(-1.0)
+            return 0.0, np.zeros(n_edges)
         
-        c = [1.0] * n_edges
-        bounds = [(0, None) for _ in range(n_edges)]
-        
-        result = linprog(c, A_ub=A_ub, b_ub=b_ub, bounds=bounds, method='highs')
-        
-        if result.success:
-            return result.fun
-        else:
-            raise RuntimeError("Failed to solve fractional edge cover")
+        problem = LPProblem.from_hypergraph(self.hypergraph)
+        backend = self.select_backend(problem)
+        _observe_problem(problem)
+        with instrumentation.span("lp", problem="edge_cover", backend=backend.name):
+            return backend.edge_cover_solution(problem)
     
-    def solve_fractional_edge_packing(self) -> float:
+    def fractional_edge_packing_solution(self) -> Tuple[float, np.ndarray]:
+        """(τ*, optimal edge weights in hypergraph edge order)"""
         n_vertices = self.hypergraph.get_vertex_count()
         n_edges = self.hypergraph.get_edge_count()
         
         if n_vertices == 0 or n_edges == 0:
-            return 0.0
-        
-        vertices = self.hypergraph.get_vertices_list()
+            return 0.0, np.zeros(n_edges)
         
-        A_ub = []
-        b_ub = []
-        
-        for vertex in vertices:
-            constraint = [0.0] * n_edges
-            edges_containing_vertex = self.hypergraph.get_edges_containing_vertex(vertex)
-            
-            for edge_idx in edges_containing_vertex:
-                constraint[edge_idx] = 1.0
-            
-            A_ub.append(constraint)
-            b_ub.append(1.0)
-        
-        c = [-1.0] * n_edges
-        bounds = [(0, None) for _ in range(n_edges)]
-        
-        result = linprog(c, A_ub=A_ub, b_ub=b_ub, bounds=bounds, method='highs')
-        
-        if result.success:
-            return -result.fun
-        else:
-            raise RuntimeError("Failed to solve fractional edge packing")
+        problem = LPProblem.from_hypergraph(self.hypergraph)
+        backend = self.select_backend(problem)
+        _observe_problem(problem)
+        with instrumentation.span("lp", problem="edge_packing", backend=backend.name):
+            return backend.edge_packing_solution(problem)
+
+    def solve_fractional_edge_cover(self) -> float:
+        if self.store is not None:
+            return self.analyze().rho_star
+        return self.fractional_edge_cover_solution()[0]
+    
+    def solve_fractional_edge_packing(self) -> float:
+        if self.store is not None:
+            return self.analyze().tau_star
+        return self.fractional_edge_packing_solution()[0]
+
+    def exact_fractional_edge_cover(self) -> ExactResult:
+        """ρ* as a Fraction, certified with the solver's dual instead of a high-precision re-solve"""
+        return self._exact_optimum(covering=True)
+
+    def exact_fractional_edge_packing(self) -> ExactResult:
+        """τ* as a Fraction, certified with the solver's dual instead of a high-precision re-solve"""
+        return self._exact_optimum(covering=False)
+
+    def _exact_optimum(self, covering: bool) -> ExactResult:
+        problem = LPProblem.from_hypergraph(self.hypergraph)
+        if self.store is not None or self._analysis is not None:
+            # Stored results keep only the primal weights; the dual is reconstructed
+            result = self.analyze()
+            value, weights = (result.rho_star, result.cover_weights) if covering else \
+                (result.tau_star, result.packing_weights)
+            return exact_optimum(problem, value, weights, covering)
+        if problem.n_vertices == 0 or problem.n_edges == 0:
+            return exact_optimum(problem, 0.0, np.zeros(problem.n_edges), covering)
+        backend = self.select_backend(problem)
+        _observe_problem(problem)
+        name = "edge_cover" if covering else "edge_packing"
+        with instrumentation.span("lp", problem=name, backend=backend.name):
+            if covering:
+                value, weights, dual = backend.edge_cover_certificate(problem)
+            else:
+                value, weights, dual = backend.edge_packing_certificate(problem)
+        return exact_optimum(problem, value, weights, covering, dual)
+
+    def analyze(self) -> StoredResult:
+        """Every quantity with the optimal weights, from the store when it has them"""
+        if self._analysis is not None:
+            return self._analysis
+        key = hypergraph_key(self.hypergraph) if self.store is not None else None
+        result = self.store.get(key) if key is not None else None
+        if result is None:
+            rho_star, cover_weights = self.fractional_edge_cover_solution()
+            tau_star, packing_weights = self.fractional_edge_packing_solution()
+            result = StoredResult(self.hypergraph.get_vertex_count(), self.hypergraph.get_edge_count(),
+                                  self.hypergraph.get_rank(), rho_star, tau_star, self.compute_agm_bound(),
+                                  cover_weights, packing_weights)
+            if key is not None and self._exact():
+                self.store.put(key, result)
+        self._analysis = result
+        return result
+
+    def _exact(self) -> bool:
+        return not self.approximate and (self.backend is None or self.backend.exact)
     
     def compute_agm_bound(self) -> float:
         n_edges = self.hypergraph.get_edge_count()
@@ -84,4 +130,44 @@ class QuerySolver:
             edge_size = self.hypergraph.get_edge_size(i)
             product *= (1.0 ** (1.0 / edge_size))
         
-        return product
\ No newline at end of file
+        return product
+
+    def polymatroid_bound(self, statistics: Sequence[RelationStatistic], exact: bool = False) -> PolymatroidBound:
+        """Output-size bound from the cardinalities, degrees and functional dependencies of parse_annotated_query"""
+        return polymatroid_bound(self.hypergraph, statistics, exact)
+
+    def approximate_fractional_edge_cover(self, epsilon: Optional[float] = None) -> ApproximateResult:
+        return ApproximateSolver.from_hypergraph(self.hypergraph).edge_cover(epsilon or self.epsilon)
+
+    def approximate_fractional_edge_packing(self, epsilon: Optional[float] = None) -> ApproximateResult:
+        return ApproximateSolver.from_hypergraph(self.hypergraph).edge_packing(epsilon or self.epsilon)
+
+    def edge_cover_at_most(self, threshold: float,
+                           cardinalities: Optional[Sequence[float]] = None) -> ThresholdDecision:
+        """Is ρ* (or, with cardinalities, log2 of the AGM bound) <= threshold? The LP runs only if cheap bounds can't tell"""
+        return ThresholdDecider(self.hypergraph, cardinalities).decide(threshold)
+
+    def agm_bound_at_most(self, limit: float, cardinalities: Sequence[float]) -> ThresholdDecision:
+        return decide_agm_bound(self.hypergraph, cardinalities, limit)
+
+    def solve_integral_edge_cover(self, time_limit: Optional[float] = None) -> IntegralResult:
+        """Minimum edge cover ρ, with ρ* as the root bound; stops with the incumbent after time_limit seconds"""
+        return IntegralSolver(self.hypergraph).solve_edge_cover(time_limit)
+
+    def solve_integral_edge_packing(self, time_limit: Optional[float] = None) -> IntegralResult:
+        """Maximum matching τ, with τ* as the root bound; stops with the incumbent after time_limit seconds"""
+        return IntegralSolver(self.hypergraph).solve_edge_packing(time_limit)
+
+    def subset_cover_table(self, cardinalities: Optional[Sequence[float]] = None) -> SubsetCoverTable:
+        return SubsetCoverTable(self.hypergraph, cardinalities)
+
+    def solve_subset_edge_covers(self, subsets: Optional[Iterable[Subset]] = None,
+                                 cardinalities: Optional[Sequence[float]] = None) -> Dict[int, float]:
+        """ρ* per vertex bitmask (bit i = get_vertices_list()[i]); all connected subsets by default"""
+        return self.subset_cover_table(cardinalities).compute(subsets)
+
+
+def _observe_problem(problem: LPProblem):
+    instrumentation.observe("lp_rows", problem.n_vertices)
+    instrumentation.observe("lp_cols", problem.n_edges)
+    instrumentation.observe("lp_nnz", problem.nnz)
@@ -0,0 +1,49 @@
+"""Warm starts for worker pools.
+
+The core path imports only numpy and highspy: scipy is loaded by the first
+LP that needs linprog or a large matching, NetworkX by the first layout and
+Plotly by the first interactive figure. A short-lived worker that solves a
+few small queries never loads them. A pool that forks many workers should
+instead load them once in the parent, so every child starts with them in
+memory:
+
+    preload()
+    with ProcessPoolExecutor(initializer=preload) as executor:
+        ...
+
+``initializer`` covers start methods that do not fork; in a forked child it
+finds everything already imported and costs one small solve.
+"""
+
+import importlib
+from typing import List
+
+LP_MODULES = ("highspy", "scipy.sparse", "scipy.sparse.csgraph", "scipy.optimize")
+# The layout shared by the SVG and Plotly drawings; Plotly figures are built in
+# the app's own process, not in pools
+VISUALIZATION_MODULES = ("networkx",)
+
+# The query solved to warm the solver's per-thread state
+_TRIANGLE = "R(a, b)\nS(b, c)\nT(a, c)"
+
+
+def preload(lp: bool = True, visualization: bool = False) -> List[str]:
+    """Import the heavy optional modules and solve a triangle query; the modules that were imported.
+
+    Modules that are not installed are skipped: their fallbacks are then
+    what a worker would use anyway.
+    """
+    from .batch import build_hypergraph
+    from .solver import QuerySolver
+
+    names = (LP_MODULES if lp else ()) + (VISUALIZATION_MODULES if visualization else ())
+    loaded = []
+    for name in names:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        loaded.append(name)
+    if lp:
+        QuerySolver(build_hypergraph(_TRIANGLE)).analyze()
+    return loaded
@@ -0,0 +1,154 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import instrumentation
+from .hypergraph import Hypergraph
+
+SCHEMA_VERSION = 1
+
+# SQLite's default limit on host parameters in one statement
+_MAX_PARAMETERS = 999
+
+
+class StoredResult(NamedTuple):
+    vertex_count: int
+    edge_count: int
+    rank: int
+    rho_star: float
+    tau_star: float
+    agm_bound: float
+    # Optimal edge weights, in the edge order of the hypergraph they were looked up for
+    cover_weights: np.ndarray
+    packing_weights: np.ndarray
+
+
+class HypergraphKey(NamedTuple):
+    digest: str
+    # order[i] is the hypergraph edge at canonical position i
+    order: np.ndarray
+
+
+def hypergraph_key(hypergraph: Hypergraph) -> HypergraphKey:
+    """Hash of the sorted list of edges, each a sorted tuple of vertex names.
+
+    Relation names, atom order and argument order do not change the key.
+    Duplicate atoms do, since every atom carries its own weight.
+    """
+    edges = [tuple(sorted(vertices)) for _, vertices in hypergraph.edges]
+    order = sorted(range(len(edges)), key=edges.__getitem__)
+    digest = hashlib.sha256()
+    for i in order:
+        digest.update("\x1f".join(edges[i]).encode())
+        digest.update(b"\x1e")
+    return HypergraphKey(digest.hexdigest(), np.asarray(order, dtype=np.int64))
+
+
+class ResultStore:
+    """On-disk ρ*/τ*/AGM results shared between processes, keyed by ``hypergraph_key``.
+
+    SQLite in WAL mode: any number of readers run concurrently with one
+    writer. Each thread gets its own connection. A file written with a
+    different schema version is dropped and recreated, as it only holds
+    recomputable results.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._create_schema()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _create_schema(self):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            row = connection.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if row is not None and int(row[0]) != SCHEMA_VERSION:
+                connection.execute("DROP TABLE IF EXISTS results")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, vertex_count INTEGER NOT NULL, edge_count INTEGER NOT NULL,"
+                " rank INTEGER NOT NULL, rho_star REAL NOT NULL, tau_star REAL NOT NULL,"
+                " agm_bound REAL NOT NULL, cover_weights BLOB NOT NULL, packing_weights BLOB NOT NULL,"
+                " created REAL NOT NULL)")
+            connection.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def get(self, key: HypergraphKey) -> Optional[StoredResult]:
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: Sequence[HypergraphKey]) -> List[Optional[StoredResult]]:
+        """Stored result or None per key, in order; one query per 999 distinct keys"""
+        digests = list(dict.fromkeys(key.digest for key in keys))
+        rows = {}
+        connection = self._connection()
+        for start in range(0, len(digests), _MAX_PARAMETERS):
+            chunk = digests[start:start + _MAX_PARAMETERS]
+            for row in connection.execute(f"SELECT * FROM results WHERE key IN ({','.join('?' * len(chunk))})",
+                                          chunk):
+                rows[row[0]] = row
+        results = [_from_row(rows[key.digest], key.order) if key.digest in rows else None for key in keys]
+        hits = sum(result is not None for result in results)
+        instrumentation.count("cache_requests", hits, cache="result_store", result="hit")
+        instrumentation.count("cache_requests", len(keys) - hits, cache="result_store", result="miss")
+        return results
+
+    def put(self, key: HypergraphKey, result: StoredResult):
+        self.put_many([(key, result)])
+
+    def put_many(self, items: Iterable[Tuple[HypergraphKey, StoredResult]]):
+        rows = [_to_row(key, result) for key, result in items]
+        if not rows:
+            return
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+def _to_row(key: HypergraphKey, result: StoredResult) -> tuple:
+    # Weights are stored in canonical edge order so any atom order can read them
+    return (key.digest, result.vertex_count, result.edge_count, result.rank, result.rho_star, result.tau_star,
+            result.agm_bound, np.asarray(result.cover_weights, dtype='<f8')[key.order].tobytes(),
+            np.asarray(result.packing_weights, dtype='<f8')[key.order].tobytes(), time.time())
+
+
+def _from_row(row: tuple, order: np.ndarray) -> StoredResult:
+    weights: List[np.ndarray] = []
+    for blob in row[7:9]:
+        canonical = np.frombuffer(blob, dtype='<f8')
+        restored = np.empty_like(canonical)
+        restored[order] = canonical
+        weights.append(restored)
+    return StoredResult(row[1], row[2], row[3], row[4], row[5], row[6], weights[0], weights[1])
@@ -0,0 +1,224 @@
+import math
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .hypergraph import Hypergraph
+from .lp import CSC, ReusableLP
+
+Subset = Union[int, Iterable[str]]
+
+
+class SubsetCoverTable:
+    """ρ* of the sub-queries induced by vertex subsets, keyed by vertex bitmask.
+
+    Bit i of a mask stands for ``hypergraph.get_vertices_list()[i]``. With
+    ``cardinalities`` (one per edge, in edge order) the objective is
+    ``sum(x_e * log2 |R_e|)``, i.e. the log of the AGM bound of the sub-query.
+    """
+
+    def __init__(self, hypergraph: Hypergraph, cardinalities: Optional[Sequence[float]] = None):
+        self.vertices = hypergraph.get_vertices_list()
+        self.vertex_to_index = {v: i for i, v in enumerate(self.vertices)}
+        n_vertices = len(self.vertices)
+        n_edges = hypergraph.get_edge_count()
+
+        if cardinalities is None:
+            self.weights = np.ones(n_edges)
+        else:
+            if len(cardinalities) != n_edges:
+                raise ValueError("Expected one cardinality per relation")
+            if any(size < 1 for size in cardinalities):
+                raise ValueError("Relation cardinalities must be at least 1")
+            self.weights = np.array([math.log2(size) for size in cardinalities], dtype=float)
+        self.weighted = cardinalities is not None
+
+        offsets, vertex_ids = hypergraph.get_incidence_arrays()
+        self.edge_masks: List[int] = []
+        for i in range(n_edges):
+            mask = 0
+            for v in vertex_ids[offsets[i]:offsets[i + 1]]:
+                mask |= 1 << int(v)
+            self.edge_masks.append(mask)
+
+        # For each vertex: the edges covering it and its neighbours in the primal graph
+        self.vertex_edges = [0] * n_vertices
+        self.neighbours = [0] * n_vertices
+        for e, mask in enumerate(self.edge_masks):
+            for v in _bits(mask):
+                self.vertex_edges[v] |= 1 << e
+                self.neighbours[v] |= mask
+        for v in range(n_vertices):
+            self.neighbours[v] &= ~(1 << v)
+
+        # u dominates v when every edge covering u also covers v: once u is
+        # covered so is v, and v's row can be dropped from the LP.
+        self.dominators = [0] * n_vertices
+        for v in range(n_vertices):
+            for u in range(n_vertices):
+                if u == v:
+                    continue
+                eu, ev = self.vertex_edges[u], self.vertex_edges[v]
+                if eu & ~ev == 0 and (eu != ev or u < v):
+                    self.dominators[v] |= 1 << u
+
+        matrix = CSC(np.ones(len(vertex_ids)), vertex_ids, offsets, (n_vertices, n_edges))
+        # Rows of vertices outside the current subset keep the vacuous bound 0
+        self._lp = ReusableLP(matrix, self.weights, np.zeros(n_vertices), np.full(n_vertices, np.inf))
+        self._cache: Dict[int, float] = {}
+        # Vertices covered by the optimal solution found for a subset
+        self._covered: Dict[int, int] = {}
+        self.pruned_count = 0
+
+    @property
+    def lp_count(self) -> int:
+        return self._lp.lp_count
+
+    def subset_mask(self, subset: Subset) -> int:
+        if isinstance(subset, int):
+            return subset
+        mask = 0
+        for vertex in subset:
+            if vertex not in self.vertex_to_index:
+                raise ValueError(f"Unknown vertex: {vertex}")
+            mask |= 1 << self.vertex_to_index[vertex]
+        return mask
+
+    def mask_vertices(self, mask: int) -> List[str]:
+        return [self.vertices[v] for v in _bits(mask)]
+
+    def components(self, mask: int) -> List[int]:
+        result = []
+        remaining = mask
+        while remaining:
+            component = remaining & -remaining
+            frontier = component
+            while frontier:
+                grown = 0
+                for v in _bits(frontier):
+                    grown |= self.neighbours[v]
+                frontier = grown & remaining & ~component
+                component |= frontier
+            result.append(component)
+            remaining &= ~component
+        return result
+
+    def is_connected(self, mask: int) -> bool:
+        return mask != 0 and len(self.components(mask)) == 1
+
+    def connected_subsets(self) -> Iterator[int]:
+        """Each connected subset exactly once (EnumerateCsg of DPccp)"""
+        for mask, _ in self._connected_with_parents():
+            yield mask
+
+    def _connected_with_parents(self) -> Iterator[Tuple[int, int]]:
+        for i in reversed(range(len(self.vertices))):
+            start = 1 << i
+            yield start, 0
+            yield from self._grow(start, (start << 1) - 1)
+
+    def _grow(self, subset: int, excluded: int) -> Iterator[Tuple[int, int]]:
+        neighbourhood = 0
+        for v in _bits(subset):
+            neighbourhood |= self.neighbours[v]
+        neighbourhood &= ~excluded
+        if not neighbourhood:
+            return
+        extensions = list(_submasks(neighbourhood))
+        for extension in extensions:
+            yield subset | extension, subset
+        for extension in extensions:
+            yield from self._grow(subset | extension, excluded | neighbourhood)
+
+    def reduce(self, mask: int) -> int:
+        """Drop vertices dominated by another vertex of the subset"""
+        reduced = mask
+        for v in _bits(mask):
+            if self.dominators[v] & mask:
+                reduced &= ~(1 << v)
+        return reduced
+
+    def rho_star(self, subset: Subset) -> float:
+        return self._rho_star(self.subset_mask(subset), 0, False)
+
+    def _rho_star(self, mask: int, parent: int, connected: bool) -> float:
+        if mask == 0:
+            return 0.0
+        if mask in self._cache:
+            return self._cache[mask]
+
+        if parent and mask & ~self._covered.get(parent, 0) == 0:
+            # The parent's optimum already covers the added vertices, so it is
+            # feasible here; ρ* is monotone, hence the value carries over.
+            self.pruned_count += 1
+            value = self._cache[parent]
+            self._covered[mask] = self._covered[parent]
+        elif connected or len(self.components(mask)) == 1:
+            value = self._solve_connected(mask)
+        else:
+            # Disconnected sub-queries are cross products: the optimum is additive
+            components = self.components(mask)
+            value = sum(self._rho_star(component, 0, True) for component in components)
+            covered = 0
+            for component in components:
+                covered |= self._covered.get(component, 0)
+            self._covered[mask] = covered
+        self._cache[mask] = value
+        return value
+
+    def _solve_connected(self, mask: int) -> float:
+        reduced = self.reduce(mask)
+        if reduced != mask:
+            # Dropping dominated vertices can split the subset, e.g. a star
+            # reduces to its independent leaves.
+            self.pruned_count += 1
+            value = self._rho_star(reduced, 0, False)
+            self._covered[mask] = self._covered.get(reduced, 0)
+            return value
+
+        covering = [e for e, edge_mask in enumerate(self.edge_masks) if edge_mask & reduced == reduced]
+        if reduced & (reduced - 1) == 0 or (covering and not self.weighted):
+            # A single vertex (or, unweighted, a subset inside one edge) is
+            # covered optimally by the cheapest edge containing it.
+            best = min(covering, key=lambda e: self.weights[e])
+            value = float(self.weights[best])
+            covered = self.edge_masks[best]
+        else:
+            row_lower = np.zeros(len(self.vertices))
+            row_lower[list(_bits(reduced))] = 1.0
+            self._lp.set_row_bounds(row_lower, self._lp.row_upper)
+            value, x = self._lp.solve()
+            if value is None:
+                raise RuntimeError("Failed to solve subset edge cover")
+            activity = self._lp.rows @ x
+            covered = 0
+            for v in np.flatnonzero(activity >= 1.0 - 1e-9):
+                covered |= 1 << int(v)
+        self._covered[mask] = covered
+        return value
+
+    def compute(self, subsets: Optional[Iterable[Subset]] = None) -> Dict[int, float]:
+        """ρ* for the given subsets, or for every connected subset when omitted"""
+        table = {}
+        if subsets is None:
+            for mask, parent in self._connected_with_parents():
+                table[mask] = self._rho_star(mask, parent, True)
+            return table
+        for subset in subsets:
+            mask = self.subset_mask(subset)
+            table[mask] = self._rho_star(mask, 0, False)
+        return table
+
+
+def _bits(mask: int) -> Iterator[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _submasks(mask: int) -> Iterator[int]:
+    sub = mask
+    while sub:
+        yield sub
+        sub = (sub - 1) & mask
@@ -0,0 +1,95 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from html import escape
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from .batch import build_hypergraph
+from .hypergraph import Hypergraph, hyperedge_color, hyperedge_outline
+from .startup import preload
+
+_MARGIN = 12
+_VERTEX_RADIUS = 6
+
+
+def render_svg(hypergraph: Hypergraph, width: int = 240, height: int = 180, labels: bool = True,
+               seed: Optional[int] = 0) -> str:
+    """A static SVG of the hypergraph with the same layout and hyperedge polygons as create_visualization.
+
+    Coordinates are rounded to 0.1 px and styles are shared through groups,
+    so a small query takes a few hundred bytes. ``seed`` fixes the layout.
+    """
+    header = f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" ' \
+             f'viewBox="0 0 {width} {height}">'
+    if not hypergraph.vertices or not hypergraph.edges:
+        return header + "</svg>"
+
+    pos = hypergraph.layout_positions(seed)
+    names = list(pos)
+    coordinates = np.array([pos[name] for name in names], dtype=float).reshape(-1, 2)
+    low, high = coordinates.min(axis=0), coordinates.max(axis=0)
+    span = np.where(high - low > 0, high - low, 1.0)
+    size = np.array([width, height], dtype=float) - 2 * _MARGIN
+    scaled = _MARGIN + (coordinates - low) / span * size
+    # SVG y grows downwards
+    scaled[:, 1] = height - scaled[:, 1]
+    place = {name: (x, y) for name, (x, y) in zip(names, scaled.tolist())}
+
+    parts = [header]
+    for i, (edge_name, edge_vertices) in enumerate(hypergraph.edges):
+        edge_vertex_list = [v for v in edge_vertices if v in place]
+        if len(edge_vertex_list) < 2:
+            continue
+        edge_x, edge_y = hyperedge_outline([place[v][0] for v in edge_vertex_list],
+                                           [place[v][1] for v in edge_vertex_list])
+        points = " ".join(f"{x:.1f},{y:.1f}" for x, y in zip(edge_x, edge_y))
+        color = hyperedge_color(i)
+        title = f"<title>{escape(edge_name)}</title>"
+        if len(edge_vertex_list) >= 3:
+            parts.append(f'<polygon points="{points}" fill="{color}" fill-opacity="0.3" '
+                         f'stroke="{color}" stroke-width="2">{title}</polygon>')
+        else:
+            parts.append(f'<polyline points="{points}" fill="none" stroke="{color}" stroke-width="4">'
+                         f'{title}</polyline>')
+
+    parts.append(f'<g fill="white" stroke="darkblue" stroke-width="2">')
+    parts.extend(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{_VERTEX_RADIUS}"/>' for x, y in place.values())
+    parts.append("</g>")
+    if labels:
+        parts.append('<g font-family="sans-serif" font-size="7" text-anchor="middle" dominant-baseline="central">')
+        parts.extend(f'<text x="{x:.1f}" y="{y:.1f}">{escape(name)}</text>' for name, (x, y) in place.items())
+        parts.append("</g>")
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def render_query(query_text: str, width: int = 240, height: int = 180, labels: bool = True) -> Optional[str]:
+    """render_svg of a query's hypergraph; None if the query does not parse"""
+    try:
+        return render_svg(build_hypergraph(query_text), width, height, labels)
+    except ValueError:
+        return None
+
+
+def render_queries(queries: Iterable[str], processes: Optional[int] = None, width: int = 240,
+                   height: int = 180, labels: bool = True, chunksize: int = 16) -> Iterator[Optional[str]]:
+    """render_query over a corpus on a process pool, in input order; the layout modules are loaded before forking"""
+    render = partial(render_query, width=width, height=height, labels=labels)
+    warm = partial(preload, lp=False, visualization=True)
+    warm()
+    with ProcessPoolExecutor(max_workers=processes, initializer=warm) as executor:
+        yield from executor.map(render, queries, chunksize=chunksize)
+
+
+def html_report(queries: List[str], svgs: Iterable[Optional[str]], title: str = "Query hypergraphs") -> str:
+    """A self-contained HTML page with one inline SVG per query"""
+    parts = [f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{escape(title)}</title>"
+             "<style>figure{display:inline-block;margin:4px;vertical-align:top}"
+             "figcaption{font:10px monospace;white-space:pre;max-width:240px;overflow:hidden}</style>"
+             f"</head><body><h1>{escape(title)}</h1>"]
+    for query_text, svg in zip(queries, svgs):
+        picture = svg if svg is not None else "<p>Invalid query</p>"
+        parts.append(f"<figure>{picture}<figcaption>{escape(query_text)}</figcaption></figure>")
+    parts.append("</body></html>")
+    return "".join(parts)
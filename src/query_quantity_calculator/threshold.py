@@ -0,0 +1,129 @@
+import heapq
+import math
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from .hypergraph import Hypergraph
+from .lp import CSC, ReusableLP
+
+TOLERANCE = 1e-9
+
+STAGE_UPPER_BOUND = "upper_bound"
+STAGE_LOWER_BOUND = "lower_bound"
+STAGE_LP = "lp"
+
+
+class ThresholdDecision(NamedTuple):
+    within: bool
+    # Which check settled it: greedy cover, dual vertex weighting or the full LP
+    stage: str
+    lower: float
+    upper: float
+
+
+class ThresholdDecider:
+    """Answers "is ρ* <= k?" from cheap bounds, solving the LP only when they straddle k.
+
+    With ``cardinalities`` the objective is ``sum(x_e * log2 |R_e|)``, the
+    exponent of the AGM bound.
+    """
+
+    def __init__(self, hypergraph: Hypergraph, cardinalities: Optional[Sequence[float]] = None):
+        self.offsets, self.vertex_ids = hypergraph.get_incidence_arrays()
+        self.n_vertices = hypergraph.get_vertex_count()
+        self.n_edges = hypergraph.get_edge_count()
+        if cardinalities is None:
+            self.weights = np.ones(self.n_edges)
+        else:
+            if len(cardinalities) != self.n_edges:
+                raise ValueError("Expected one cardinality per relation")
+            if any(size < 1 for size in cardinalities):
+                raise ValueError("Relation cardinalities must be at least 1")
+            self.weights = np.log2(np.asarray(cardinalities, dtype=float))
+        self.sizes = np.diff(self.offsets)
+        self.edge_of_entry = np.repeat(np.arange(self.n_edges), self.sizes)
+
+    def degree_split_upper_bound(self) -> float:
+        """x_e = max over v in e of 1/deg(v) gives every vertex coverage >= 1"""
+        if self.n_vertices == 0:
+            return 0.0
+        degrees = np.bincount(self.vertex_ids, minlength=self.n_vertices)
+        split = np.zeros(self.n_edges)
+        np.maximum.at(split, self.edge_of_entry, 1.0 / degrees[self.vertex_ids])
+        return float(split @ self.weights)
+
+    def greedy_cover_upper_bound(self) -> float:
+        """Weighted greedy set cover, itself a feasible (integral) fractional cover"""
+        members = [self.vertex_ids[self.offsets[e]:self.offsets[e + 1]] for e in range(self.n_edges)]
+        covered = np.zeros(self.n_vertices, dtype=bool)
+        remaining = self.n_vertices
+        # Lazy heap on cost per newly covered vertex
+        heap = [(self.weights[e] / len(members[e]), e, len(members[e])) for e in range(self.n_edges) if len(members[e])]
+        heapq.heapify(heap)
+        cost = 0.0
+        while remaining and heap:
+            _, e, gain = heapq.heappop(heap)
+            current = int(np.count_nonzero(~covered[members[e]]))
+            if current == 0:
+                continue
+            if current != gain:
+                heapq.heappush(heap, (self.weights[e] / current, e, current))
+                continue
+            covered[members[e]] = True
+            remaining -= current
+            cost += self.weights[e]
+        return cost
+
+    def even_split_lower_bound(self) -> float:
+        """Each vertex takes the smallest w_e / |e| among its edges: a feasible dual"""
+        if self.n_vertices == 0:
+            return 0.0
+        even = np.full(self.n_vertices, np.inf)
+        np.minimum.at(even, self.vertex_ids, (self.weights / np.maximum(self.sizes, 1))[self.edge_of_entry])
+        return float(even.sum())
+
+    def greedy_dual_lower_bound(self) -> float:
+        """Low-degree vertices first, each taking all the slack its edges have left"""
+        order = np.argsort(self.vertex_ids, kind='stable')
+        vertex_edges = self.edge_of_entry[order]
+        vertex_offsets = np.concatenate([[0], np.cumsum(np.bincount(self.vertex_ids, minlength=self.n_vertices))])
+        slack = self.weights.astype(float).copy()
+        total = 0.0
+        for v in np.argsort(np.diff(vertex_offsets), kind='stable'):
+            edges = vertex_edges[vertex_offsets[v]:vertex_offsets[v + 1]]
+            amount = slack[edges].min()
+            slack[edges] -= amount
+            total += amount
+        return total
+
+    def solve_lp(self) -> float:
+        if self.n_vertices == 0:
+            return 0.0
+        matrix = CSC(np.ones(len(self.vertex_ids)), self.vertex_ids, self.offsets, (self.n_vertices, self.n_edges))
+        value, _ = ReusableLP(matrix, self.weights, np.ones(self.n_vertices), np.full(self.n_vertices, np.inf)).solve()
+        if value is None:
+            raise RuntimeError("Failed to solve fractional edge cover")
+        return value
+
+    def decide(self, threshold: float) -> ThresholdDecision:
+        lower, upper = 0.0, math.inf
+        # Vectorised bounds first, then the greedy ones, then the LP
+        for upper_bound, lower_bound in ((self.degree_split_upper_bound, self.even_split_lower_bound),
+                                         (self.greedy_cover_upper_bound, self.greedy_dual_lower_bound)):
+            upper = min(upper, upper_bound())
+            if upper <= threshold + TOLERANCE:
+                return ThresholdDecision(True, STAGE_UPPER_BOUND, lower, upper)
+            lower = max(lower, lower_bound())
+            if lower > threshold + TOLERANCE:
+                return ThresholdDecision(False, STAGE_LOWER_BOUND, lower, upper)
+        value = self.solve_lp()
+        return ThresholdDecision(value <= threshold + TOLERANCE, STAGE_LP, value, value)
+
+
+def decide_agm_bound(hypergraph: Hypergraph, cardinalities: Sequence[float], limit: float) -> ThresholdDecision:
+    """Is the AGM bound prod |R_e|^x_e at most ``limit``? Bounds are reported as sizes, not exponents"""
+    if limit <= 0:
+        return ThresholdDecision(False, STAGE_LOWER_BOUND, 1.0, math.inf)
+    decision = ThresholdDecider(hypergraph, cardinalities).decide(math.log2(limit))
+    return decision._replace(lower=2.0 ** decision.lower, upper=2.0 ** decision.upper)
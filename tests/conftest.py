@@ -0,0 +1,8 @@
+from src.query_quantity_calculator.hypergraph import Hypergraph
+
+
+def build(relations):
+    """A Hypergraph from (name, variables) pairs, for tests that skip the parser"""
+    hypergraph = Hypergraph()
+    hypergraph.from_relations(relations)
+    return hypergraph
@@ -0,0 +1,35 @@
+from src.query_quantity_calculator.admission import (
+    AdmissionPolicy, admit, estimate_cost, load_policy, save_policy
+)
+from src.query_quantity_calculator.generators import generate
+
+
+class TestAdmission:
+    def test_estimate(self):
+        estimate = estimate_cost([("R", ["a", "b", "a"]), ("S", ["b", "c", "d"])])
+        assert estimate.atoms == 2
+        assert estimate.vertices == 4
+        assert estimate.nnz == 5
+        assert estimate.rank == 3
+        assert estimate.layout_memory_bytes == 16 * 16
+
+    def test_small_query_is_admitted_unchanged(self):
+        decision = admit(generate("cycle", 10))
+        assert decision.admitted and not decision.approximate and decision.visualize
+        assert decision.messages == []
+
+    def test_policies(self):
+        relations = generate("random_uniform", 3000)
+        skip_layout = admit(relations)
+        assert skip_layout.admitted and not skip_layout.visualize
+        downgrade = admit(relations, AdmissionPolicy(approximate_min_nnz=5000))
+        assert downgrade.admitted and downgrade.approximate
+        reject = admit(relations, AdmissionPolicy(max_atoms=1000))
+        assert not reject.admitted
+        assert "3,000 atoms" in reject.messages[0]
+        assert not admit(relations, AdmissionPolicy(max_lp_memory_bytes=1000)).admitted
+
+    def test_policy_round_trip(self, tmp_path):
+        path = str(tmp_path / "policy.json")
+        save_policy(AdmissionPolicy(max_atoms=7), path)
+        assert load_policy(path) == AdmissionPolicy(max_atoms=7)
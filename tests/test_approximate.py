@@ -0,0 +1,81 @@
+import random
+import numpy as np
+import pytest
+from src.query_quantity_calculator.approximate import ApproximateSolver
+from src.query_quantity_calculator.solver import QuerySolver
+from tests.conftest import build
+
+
+def random_relations(seed, n_vertices, n_edges):
+    rng = random.Random(seed)
+    variables = [f"v{i}" for i in range(n_vertices)]
+    return [(f"R{i}", rng.sample(variables, rng.randint(1, 4))) for i in range(n_edges)]
+
+
+class TestApproximateSolver:
+    def test_triangle_bracket(self):
+        solver = QuerySolver(build([("R", ["a", "b"]), ("S", ["b", "c"]), ("T", ["a", "c"])]))
+
+        cover = solver.approximate_fractional_edge_cover(0.05)
+        packing = solver.approximate_fractional_edge_packing(0.05)
+
+        assert cover.converged and packing.converged
+        assert cover.lower - 1e-9 <= 1.5 <= cover.upper + 1e-9
+        assert packing.lower - 1e-9 <= 1.5 <= packing.upper + 1e-9
+
+    @pytest.mark.parametrize("epsilon", [0.1, 0.03])
+    def test_bounds_bracket_exact_lp(self, epsilon):
+        hypergraph = build(random_relations(3, 60, 150))
+        exact = QuerySolver(hypergraph)
+        approximate = ApproximateSolver.from_hypergraph(hypergraph)
+
+        rho_star = exact.solve_fractional_edge_cover()
+        tau_star = exact.solve_fractional_edge_packing()
+        cover = approximate.edge_cover(epsilon)
+        packing = approximate.edge_packing(epsilon)
+
+        assert cover.lower - 1e-6 <= rho_star <= cover.upper + 1e-6
+        assert packing.lower - 1e-6 <= tau_star <= packing.upper + 1e-6
+        assert cover.upper <= (1 + epsilon) * cover.lower
+        assert packing.upper <= (1 + epsilon) * packing.lower
+
+    def test_weights_are_feasible(self):
+        hypergraph = build(random_relations(5, 40, 90))
+        offsets, vertex_ids = hypergraph.get_incidence_arrays()
+        edge_of_entry = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+        approximate = ApproximateSolver(offsets, vertex_ids, hypergraph.get_vertex_count())
+
+        cover = approximate.edge_cover(0.1)
+        coverage = np.bincount(vertex_ids, weights=cover.weights[edge_of_entry])
+        assert coverage.min() >= 1 - 1e-9
+        assert abs(cover.weights.sum() - cover.upper) < 1e-6
+
+        packing = approximate.edge_packing(0.1)
+        load = np.bincount(vertex_ids, weights=packing.weights[edge_of_entry])
+        assert load.max() <= 1 + 1e-9
+        assert abs(packing.weights.sum() - packing.lower) < 1e-6
+
+    def test_unconverged_bounds_stay_valid(self):
+        hypergraph = build(random_relations(9, 60, 150))
+        rho_star = QuerySolver(hypergraph).solve_fractional_edge_cover()
+
+        cover = ApproximateSolver.from_hypergraph(hypergraph).edge_cover(0.01, max_iterations=5)
+        assert not cover.converged
+        assert cover.lower - 1e-6 <= rho_star <= cover.upper + 1e-6
+
+    def test_approximate_mode_on_query_solver(self):
+        hypergraph = build([("R", ["a", "b"]), ("S", ["a", "c"]), ("T", ["a", "d"])])
+        solver = QuerySolver(hypergraph, approximate=True, epsilon=0.05)
+
+        assert 3.0 - 1e-9 <= solver.solve_fractional_edge_cover() <= 3.0 * 1.05
+        assert 1.0 / 1.05 <= solver.solve_fractional_edge_packing() <= 1.0 + 1e-9
+
+    def test_invalid_epsilon(self):
+        solver = ApproximateSolver.from_hypergraph(build([("R", ["a", "b"])]))
+        with pytest.raises(ValueError):
+            solver.edge_cover(1.5)
+
+    def test_empty_hypergraph(self):
+        solver = ApproximateSolver.from_hypergraph(build([]))
+        assert solver.edge_cover().value == 0.0
+        assert solver.edge_packing().value == 0.0
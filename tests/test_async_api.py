@@ -0,0 +1,69 @@
+import asyncio
+import time
+import pytest
+from src.query_quantity_calculator import lp
+from src.query_quantity_calculator.async_api import AsyncQueryAnalyzer, packing_bounds
+from src.query_quantity_calculator.generators import generate, to_query
+from src.query_quantity_calculator.hypergraph import Hypergraph
+from src.query_quantity_calculator.solver import QuerySolver
+
+TRIANGLE = "R(a, b)\nS(b, c)\nT(a, c)"
+# Dual simplex needs minutes on this instance
+SLOW = to_query(generate("random_uniform", 10000))
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class TestAsyncApi:
+    def test_analyze(self):
+        async def main():
+            async with AsyncQueryAnalyzer(max_concurrency=2) as analyzer:
+                return await analyzer.analyze_many([TRIANGLE, "R(a, b, c)\nS(c, d)", "bad query"], timeout=10)
+
+        triangle, path, bad = run(main())
+        assert triangle.complete and triangle.rho_star == pytest.approx(1.5) and triangle.tau_star == pytest.approx(1.5)
+        assert path.rho_star == pytest.approx(2.0)
+        assert not bad.complete and bad.error is not None
+
+    def test_timeout_returns_bounds(self):
+        async def main():
+            async with AsyncQueryAnalyzer(max_concurrency=1) as analyzer:
+                start = time.monotonic()
+                result = await analyzer.analyze(SLOW, timeout=0.5)
+                return result, time.monotonic() - start
+
+        result, elapsed = run(main())
+        assert elapsed < 2.0
+        assert not result.complete and result.error is None
+        assert result.edge_count == 10000
+        assert result.rho_star is None
+        assert 0 < result.rho_bounds[0] <= result.rho_bounds[1] < float("inf")
+        assert 0 < result.tau_bounds[0] <= result.tau_bounds[1] < float("inf")
+
+    @pytest.mark.skipif(lp.highspy is None, reason="highspy is not installed")
+    def test_cancellation_frees_the_slot(self):
+        async def main():
+            async with AsyncQueryAnalyzer(max_concurrency=1) as analyzer:
+                task = asyncio.ensure_future(analyzer.analyze(SLOW, timeout=60))
+                await asyncio.sleep(0.5)
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+                start = time.monotonic()
+                result = await analyzer.analyze(TRIANGLE, timeout=10)
+                return result, time.monotonic() - start
+
+        result, waited = run(main())
+        assert result.complete
+        # The interrupted solve gives its single slot back promptly
+        assert waited < 2.0
+
+    def test_packing_bounds_bracket_tau_star(self):
+        for relations in (generate("grid", 40), generate("loomis_whitney", 8), generate("random_uniform", 60, seed=3)):
+            hypergraph = Hypergraph()
+            hypergraph.from_relations(relations)
+            lower, upper = packing_bounds(hypergraph)
+            tau_star = QuerySolver(hypergraph).solve_fractional_edge_packing()
+            assert lower - 1e-9 <= tau_star <= upper + 1e-9
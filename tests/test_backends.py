@@ -0,0 +1,169 @@
+import random
+import pytest
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import maximum_bipartite_matching
+from src.query_quantity_calculator import backends, lp
+from src.query_quantity_calculator.backends import (
+    ApproximateBackend, BackendSelector, CombinatorialBackend, DualSimplexBackend, InteriorPointBackend,
+    LPProblem, PersistentHighsBackend, SelectionThresholds, calibrate, load_thresholds, save_thresholds
+)
+from src.query_quantity_calculator.hypergraph import Hypergraph
+from src.query_quantity_calculator.solver import QuerySolver
+
+
+def problem_for(relations):
+    hypergraph = Hypergraph()
+    hypergraph.from_relations(relations)
+    return LPProblem.from_hypergraph(hypergraph)
+
+
+def random_relations(rng, arity=None):
+    variables = [f"v{i}" for i in range(rng.randint(2, 10))]
+    return [(f"R{i}", rng.sample(variables, min(arity or rng.randint(1, 4), len(variables))))
+            for i in range(rng.randint(1, 12))]
+
+
+def exact_backends():
+    backends = [DualSimplexBackend(), InteriorPointBackend()]
+    if lp.highspy is not None:
+        backends.append(PersistentHighsBackend())
+    return backends
+
+
+class TestBackends:
+    def test_exact_backends_agree(self):
+        rng = random.Random(1)
+        for _ in range(30):
+            problem = problem_for(random_relations(rng))
+            covers = [backend.edge_cover(problem) for backend in exact_backends()]
+            packings = [backend.edge_packing(problem) for backend in exact_backends()]
+            assert max(covers) - min(covers) < 1e-6
+            assert max(packings) - min(packings) < 1e-6
+
+    def test_combinatorial_matches_lp_on_graphs(self):
+        rng = random.Random(2)
+        combinatorial = CombinatorialBackend()
+        for _ in range(30):
+            problem = problem_for(random_relations(rng, arity=2))
+            assert combinatorial.supports(problem)
+            assert abs(combinatorial.edge_cover(problem) - DualSimplexBackend().edge_cover(problem)) < 1e-6
+            assert abs(combinatorial.edge_packing(problem) - DualSimplexBackend().edge_packing(problem)) < 1e-6
+
+    def test_small_graph_matching_is_maximum(self):
+        rng = random.Random(5)
+        for _ in range(50):
+            problem = problem_for(random_relations(rng, arity=2))
+            indptr, indices, matching = CombinatorialBackend()._matching(problem)
+            n = problem.n_vertices
+            adjacency = csr_matrix((np.ones(len(indices)), indices, indptr), shape=(n, n))
+            expected = maximum_bipartite_matching(adjacency, perm_type='column')
+            assert (matching >= 0).sum() == (expected >= 0).sum()
+            for row, column in enumerate(matching):
+                if column >= 0:
+                    assert column in indices[indptr[row]:indptr[row + 1]]
+            assert len(set(matching[matching >= 0].tolist())) == (matching >= 0).sum()
+
+    def test_combinatorial_matches_lp_on_large_graphs(self, monkeypatch):
+        rng = random.Random(6)
+        relations = [(f"R{i}", rng.sample([f"v{j}" for j in range(40)], 2)) for i in range(60)]
+        problem = problem_for(relations)
+        monkeypatch.setattr(backends, "SMALL_GRAPH_VERTICES", 10)
+        combinatorial = CombinatorialBackend()
+        assert abs(combinatorial.edge_cover(problem) - DualSimplexBackend().edge_cover(problem)) < 1e-6
+        assert abs(combinatorial.edge_packing(problem) - DualSimplexBackend().edge_packing(problem)) < 1e-6
+
+    def test_solutions_are_feasible_and_attain_the_value(self):
+        rng = random.Random(4)
+        for i in range(40):
+            problem = problem_for(random_relations(rng, arity=2 if i % 2 else None))
+            coverage = problem.matrix().toarray()
+            for backend in exact_backends() + [CombinatorialBackend(), ApproximateBackend(0.1)]:
+                if not backend.supports(problem):
+                    continue
+                cover, cover_weights = backend.edge_cover_solution(problem)
+                packing, packing_weights = backend.edge_packing_solution(problem)
+                assert (coverage @ cover_weights >= 1 - 1e-6).all()
+                assert (coverage @ packing_weights <= 1 + 1e-6).all()
+                assert abs(cover_weights.sum() - cover) < 1e-6
+                assert abs(packing_weights.sum() - packing) < 1e-6
+
+    def test_combinatorial_disjoint_edges(self):
+        problem = problem_for([("R", ["a", "b", "c"]), ("S", ["d"]), ("T", ["e", "f"])])
+        combinatorial = CombinatorialBackend()
+        assert combinatorial.supports(problem)
+        assert combinatorial.edge_cover(problem) == 3.0
+        assert combinatorial.edge_packing(problem) == 3.0
+
+    def test_combinatorial_rejects_hyperedges(self):
+        problem = problem_for([("R", ["a", "b", "c"]), ("S", ["c", "d"])])
+        assert not CombinatorialBackend().supports(problem)
+
+    def test_persistent_backend_reuses_model_across_problems(self):
+        if lp.highspy is None:
+            pytest.skip("highspy is not installed")
+        backend = PersistentHighsBackend()
+        triangle = problem_for([("R", ["a", "b"]), ("S", ["b", "c"]), ("T", ["a", "c"])])
+        star = problem_for([("R", ["a", "b", "x"]), ("S", ["a", "c", "y"]), ("T", ["a", "d"])])
+
+        assert abs(backend.edge_cover(triangle) - 1.5) < 1e-9
+        assert abs(backend.edge_packing(triangle) - 1.5) < 1e-9
+        assert abs(backend.edge_cover(star) - 3.0) < 1e-9
+        assert abs(backend.edge_packing(star) - 1.0) < 1e-9
+
+    def test_selector(self):
+        selector = BackendSelector(SelectionThresholds(persistent_max_nnz=10, ipm_min_nnz=20, approximate_min_nnz=30),
+                                   allow_approximate=True)
+        graph = problem_for([("R", ["a", "b"]), ("S", ["b", "c"])])
+        small = problem_for([("R", ["a", "b", "c"]), ("S", ["c", "d"])])
+        rng = random.Random(0)
+        variables = [f"v{i}" for i in range(12)]
+        medium = problem_for([(f"R{i}", rng.sample(variables, 3)) for i in range(8)])
+        large = problem_for([(f"R{i}", rng.sample(variables, 3)) for i in range(12)])
+
+        assert selector.select(graph).name == "combinatorial"
+        if lp.highspy is not None:
+            assert selector.select(small).name == "highs-persistent"
+        assert selector.select(medium).name == "highs-ipm"
+        assert selector.select(large).name == "approximate"
+        assert BackendSelector(selector.thresholds).select(large).name == "highs-ipm"
+
+    def test_selector_routes_edge_heavy_instances_to_ipm(self):
+        thresholds = SelectionThresholds(persistent_max_nnz=1000, ipm_min_nnz=10 ** 6, approximate_min_nnz=10 ** 6,
+                                         ipm_min_edge_ratio=4.0, ipm_shape_min_nnz=50)
+        selector = BackendSelector(thresholds)
+        rng = random.Random(3)
+        variables = [f"v{i}" for i in range(5)]
+        edge_heavy = problem_for([(f"R{i}", rng.sample(variables, 3)) for i in range(25)])
+        vertex_heavy = problem_for([(f"R{i}", [f"a{i}", f"b{i}", f"c{i}"]) for i in range(25)] +
+                                   [("S", ["a0", "a1", "a2"])])
+        tiny = problem_for([(f"R{i}", rng.sample(variables, 3)) for i in range(10)])
+        assert selector.select(edge_heavy).name == "highs-ipm"
+        assert selector.select(vertex_heavy).name != "highs-ipm"
+        assert selector.select(tiny).name != "highs-ipm"
+
+    def test_old_threshold_files_load(self, tmp_path):
+        path = tmp_path / "thresholds.json"
+        path.write_text('{"persistent_max_nnz": 1, "ipm_min_nnz": 2, "approximate_min_nnz": 3}')
+        assert load_thresholds(str(path)) == SelectionThresholds(1, 2, 3)
+
+    def test_thresholds_round_trip(self, tmp_path):
+        thresholds = SelectionThresholds(1, 2, 3)
+        save_thresholds(thresholds, str(tmp_path / "thresholds.json"))
+        assert load_thresholds(str(tmp_path / "thresholds.json")) == thresholds
+
+    def test_calibrate_small_grid(self):
+        thresholds = calibrate(sizes=[20, 200], repeats=1)
+        assert isinstance(thresholds, SelectionThresholds)
+        assert thresholds.persistent_max_nnz in (0, 20, 200)
+
+    def test_query_solver_with_explicit_backend(self):
+        hypergraph = Hypergraph()
+        hypergraph.from_relations([("R", ["a", "b"]), ("S", ["b", "c"]), ("T", ["a", "c"])])
+        for backend in exact_backends() + [CombinatorialBackend()]:
+            solver = QuerySolver(hypergraph, backend=backend)
+            assert abs(solver.solve_fractional_edge_cover() - 1.5) < 1e-6
+            assert abs(solver.solve_fractional_edge_packing() - 1.5) < 1e-6
+
+        approximate = QuerySolver(hypergraph, backend=ApproximateBackend(0.05))
+        assert 1.5 - 1e-9 <= approximate.solve_fractional_edge_cover() <= 1.5 * 1.05
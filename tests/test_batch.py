@@ -0,0 +1,57 @@
+import threading
+import pytest
+from src.query_quantity_calculator import lp
+from src.query_quantity_calculator.batch import HighsModelPool, analyze_queries, analyze_query
+
+QUERIES = [
+    "R(a, b)\nS(b, c)\nT(a, c)",
+    "R(a, b, c)\nS(c, d)\nT(d, e, a)\nU(e)",
+    "R(a)\nS(a, b)\nT(b, c)\nU(c, d)\nV(d, a)",
+    "R(x, y)",
+    "R(a, b, c, d)\nS(a, b)\nT(c, d)\nU(b, c)",
+]
+
+
+class TestBatch:
+    def test_analyze_query(self):
+        result = analyze_query(QUERIES[0])
+        assert result.error is None
+        assert result.vertex_count == 3
+        assert result.edge_count == 3
+        assert result.rank == 2
+        assert abs(result.rho_star - 1.5) < 1e-6
+        assert abs(result.tau_star - 1.5) < 1e-6
+
+    def test_errors_are_recorded(self):
+        result = analyze_query("not a query")
+        assert result.error is not None
+        assert result.edge_count == 0
+
+    def test_pool_matches_sequential(self):
+        queries = QUERIES * 8
+        sequential = [analyze_query(q) for q in queries]
+        with HighsModelPool(max_workers=4) as pool:
+            parallel = pool.map(queries)
+        assert [r.query for r in parallel] == queries
+        for a, b in zip(sequential, parallel):
+            assert abs(a.rho_star - b.rho_star) < 1e-6
+            assert abs(a.tau_star - b.tau_star) < 1e-6
+
+    def test_bounded_window_preserves_order(self):
+        queries = QUERIES * 4
+        with HighsModelPool(max_workers=2) as pool:
+            results = list(pool.imap(iter(queries), max_in_flight=3))
+        assert [r.query for r in results] == queries
+        assert analyze_queries(QUERIES, max_workers=2)[1].edge_count == 4
+
+    @pytest.mark.skipif(lp.highspy is None, reason="highspy is not installed")
+    def test_one_model_per_thread(self):
+        with HighsModelPool(max_workers=3) as pool:
+            barrier = threading.Barrier(3)
+
+            def model():
+                barrier.wait()
+                return id(pool.selector.persistent().highs)
+
+            models = {f.result() for f in [pool._executor.submit(model) for _ in range(3)]}
+        assert len(models) == 3
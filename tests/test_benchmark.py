@@ -0,0 +1,29 @@
+import pytest
+from src.query_quantity_calculator.benchmark import compare, load_results, run_suite, save_results
+
+
+def results(**cases):
+    return {"meta": {}, "results": cases}
+
+
+class TestBenchmark:
+    def test_run_suite_times_every_stage(self, tmp_path):
+        suite = run_suite(["cycle", "loomis_whitney"], sizes=[10, 20], repeats=1, max_visualization_atoms=10)
+        assert set(suite["results"]) == {"cycle/10", "cycle/20", "loomis_whitney/10", "loomis_whitney/20"}
+        assert set(suite["results"]["cycle/10"]) == {"parse", "build", "rho_star", "tau_star", "visualization"}
+        assert "visualization" not in suite["results"]["cycle/20"]
+        path = str(tmp_path / "baseline.json")
+        save_results(suite, path)
+        assert load_results(path) == suite
+
+    def test_compare_flags_slowdowns(self):
+        baseline = results(**{"cycle/10": {"parse": 0.010, "rho_star": 0.100}})
+        current = results(**{"cycle/10": {"parse": 0.011, "rho_star": 0.150}})
+        regressions = compare(baseline, current, threshold=0.2)
+        assert [(r.case, r.stage) for r in regressions] == [("cycle/10", "rho_star")]
+        assert regressions[0].ratio == pytest.approx(1.5)
+
+    def test_compare_ignores_noise_and_new_cases(self):
+        baseline = results(**{"cycle/10": {"parse": 0.0001}})
+        current = results(**{"cycle/10": {"parse": 0.0005, "build": 1.0}, "star/10": {"parse": 5.0}})
+        assert compare(baseline, current, threshold=0.2, min_seconds=1e-3) == []
@@ -0,0 +1,69 @@
+import pytest
+from src.query_quantity_calculator import columnar
+from src.query_quantity_calculator.batch import HighsModelPool
+from src.query_quantity_calculator.corpus_stats import corpus_statistics
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+QUERIES = ["R(a, b)\nS(b, c)\nT(a, c)", "bad", None, "R(a, b, c)\nS(c, d)"]
+ARGUMENTS = [[["a", "b"], ["b", "c"], ["a", "c"]], [], None, [["a", "b", "c"], ["c", "d"]]]
+
+
+class TestColumnar:
+    def test_text_column_round_trip(self, tmp_path):
+        source, destination = str(tmp_path / "queries.parquet"), str(tmp_path / "results.parquet")
+        pq.write_table(pa.table({"id": [10, 11, 12, 13], "query": QUERIES}), source)
+        assert columnar.analyze_parquet(source, destination, id_column="id", batch_size=3, max_workers=2) == 4
+        results = pq.read_table(destination).to_pydict()
+        assert results["id"] == [10, 11, 12, 13]
+        assert results["vertex_count"][0] == 3
+        assert results["rho_star"][0] == pytest.approx(1.5)
+        assert results["rho_star"][3] == pytest.approx(2.0)
+        assert results["error"][0] is None
+        assert results["error"][1] is not None and results["error"][2] is not None
+
+    def test_tokenized_columns_match_text(self):
+        batch = pa.RecordBatch.from_pydict({
+            "query": QUERIES,
+            "arguments": pa.array(ARGUMENTS, type=pa.list_(pa.list_(pa.string()))),
+            "relations": [["R", "S", "T"], [], None, ["R", "S"]],
+        })
+        with HighsModelPool(max_workers=2) as pool:
+            text, = columnar.analyze_record_batches([batch], pool)
+            tokenized, = columnar.analyze_record_batches([batch], pool, arguments_column="arguments",
+                                                         relations_column="relations")
+            # Offsets of a sliced batch still line up
+            sliced, = columnar.analyze_record_batches([batch.slice(3)], pool, arguments_column="arguments")
+        for name in ("vertex_count", "edge_count", "rank", "rho_star", "tau_star", "agm_bound"):
+            assert tokenized.column(name).to_pylist() == text.column(name).to_pylist()
+        assert sliced.column("rho_star").to_pylist() == pytest.approx([2.0])
+        assert tokenized.column("error").to_pylist()[2] is not None
+
+    def test_malformed_rows_fail_alone(self):
+        good = [["a", "b"], ["b", "c"], ["a", "c"]]
+        batch = pa.RecordBatch.from_pydict({
+            "arguments": pa.array([good, good, good, [["a", None]], good, [["a", "b"], None], good, good],
+                                  type=pa.list_(pa.list_(pa.string()))),
+            "relations": [["R", "S", "T"], None, ["R", "S", "T"], ["R"], ["R", None, "T"], ["R", "S"],
+                          ["R", "S"], ["R", "S", "T"]],
+        })
+        with HighsModelPool(max_workers=2) as pool:
+            result, = columnar.analyze_record_batches([batch], pool, arguments_column="arguments",
+                                                      relations_column="relations")
+        assert len(result) == len(batch)
+        errors = result.column("error").to_pylist()
+        assert [error is None for error in errors] == [True, False, True, False, False, False, False, True]
+        assert result.column("rho_star").to_pylist()[7] == pytest.approx(1.5)
+
+    def test_pack_batch(self):
+        batch = pa.RecordBatch.from_pydict({"arguments": pa.array(ARGUMENTS, type=pa.list_(pa.list_(pa.string())))})
+        stats = corpus_statistics(columnar.pack_batch(batch.slice(1), "arguments"))
+        assert list(stats["vertex_count"]) == [0, 0, 4]
+        assert list(stats["acyclic"]) == [True, True, True]
+
+    def test_empty_source_writes_schema(self, tmp_path):
+        source, destination = str(tmp_path / "queries.parquet"), str(tmp_path / "results.parquet")
+        pq.write_table(pa.table({"query": pa.array([], type=pa.string())}), source)
+        assert columnar.analyze_parquet(source, destination) == 0
+        assert pq.read_table(destination).column_names == list(columnar.RESULT_COLUMNS)
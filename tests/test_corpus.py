@@ -0,0 +1,38 @@
+import math
+import pytest
+from src.query_quantity_calculator.batch import QueryAnalysis
+from src.query_quantity_calculator.corpus import (
+    histograms, page, page_count, read_corpus, results_frame, split_queries, summary
+)
+
+CORPUS = "# triangle\nR(a, b)\nS(b, c)\nT(a, c)\n\n\nR(x)\n  \nbad\n"
+
+
+def analysis(query, rho_star, error=None):
+    return QueryAnalysis(query, 2, 1, 2, rho_star, rho_star, 1.0, 0.01, error)
+
+
+class TestCorpus:
+    def test_split(self):
+        assert read_corpus(CORPUS) == ["R(a, b)\nS(b, c)\nT(a, c)", "R(x)", "bad"]
+        assert read_corpus(CORPUS.encode()) == read_corpus(CORPUS)
+        assert list(split_queries(iter(["R(a)", "S(a)"]))) == ["R(a)\nS(a)"]
+        assert read_corpus("\n# only a comment\n") == []
+
+    def test_frame_and_pages(self):
+        frame = results_frame([analysis("q1", 2.0), analysis("bad", 0.0, "Invalid"), analysis("q3", 1.0)])
+        assert math.isnan(frame["rho_star"][1])
+        assert page_count(frame, 2) == 2
+        assert list(page(frame, 0, 2, "rho_star")["query"]) == ["q3", "q1"]
+        assert list(page(frame, 1, 2, "rho_star")["query"]) == ["bad"]
+        assert list(page(frame, 0, 3, "rho_star", ascending=False)["query"]) == ["q1", "q3", "bad"]
+        with pytest.raises(ValueError):
+            page(frame, 0, 2, "missing")
+
+    def test_histograms_skip_failures(self):
+        frame = results_frame([analysis(f"q{i}", 1.0 + i / 10) for i in range(10)] + [analysis("bad", 0.0, "x")])
+        counts = histograms(frame, bins=5)
+        assert set(counts) == {"rho_star", "tau_star"}
+        assert counts["rho_star"]["count"].sum() == 10
+        assert counts["rho_star"]["low"].iloc[0] == pytest.approx(1.0)
+        assert summary(frame)["rho_star"]["count"] == 10
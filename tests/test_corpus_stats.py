@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from src.query_quantity_calculator.corpus_stats import (
+    corpus_statistics, degree_distribution, pack, pack_tokens, rank_distribution
+)
+from src.query_quantity_calculator.generators import generate
+
+TRIANGLE = [("R", ["a", "b"]), ("S", ["b", "c"]), ("T", ["a", "c"])]
+PATH = [("R", ["a", "b", "c"]), ("S", ["c", "d"]), ("T", ["d", "e"])]
+TWO_PARTS = [("R", ["a", "b"]), ("S", ["c", "d"]), ("T", ["d", "c", "d"])]
+COVERED_TRIANGLE = TRIANGLE + [("U", ["a", "b", "c"])]
+
+
+class TestCorpusStats:
+    def test_statistics(self):
+        stats = corpus_statistics(pack([TRIANGLE, PATH, TWO_PARTS, [], COVERED_TRIANGLE]))
+        assert list(stats["vertex_count"]) == [3, 5, 4, 0, 3]
+        assert list(stats["edge_count"]) == [3, 3, 3, 0, 4]
+        assert list(stats["rank"]) == [2, 3, 2, 0, 3]
+        assert list(stats["max_degree"]) == [2, 2, 2, 0, 3]
+        assert stats["mean_degree"][0] == pytest.approx(2.0)
+        assert list(stats["intersecting_pairs"]) == [3, 2, 1, 0, 6]
+        assert list(stats["intersection_total"]) == [3, 2, 2, 0, 9]
+        assert list(stats["max_intersection"]) == [1, 1, 2, 0, 2]
+        assert list(stats["components"]) == [1, 1, 2, 0, 1]
+        assert list(stats["acyclic"]) == [False, True, True, True, True]
+
+    def test_generated_families(self):
+        families = {"cycle": False, "clique": False, "star": True, "grid": False}
+        stats = corpus_statistics(pack([generate(family, 12) for family in families]))
+        assert list(stats["acyclic"]) == list(families.values())
+        assert list(stats["components"]) == [1, 1, 1, 1]
+
+    def test_tokens_are_renumbered_per_query(self):
+        corpus = pack_tokens(np.array([0, 1, 2]), np.array([0, 2, 4]), np.array([7, 9, 9, 7]))
+        assert corpus.n_vertices == 4
+        assert list(corpus.vertex_offsets) == [0, 2, 4]
+        assert list(corpus.vertex_ids) == [0, 1, 3, 2]
+        with pytest.raises(ValueError):
+            pack_tokens(np.array([0, 2]), np.array([0, 2, 4]), np.array([1, 2, 3]))
+
+    def test_distributions(self):
+        corpus = pack([TRIANGLE, PATH])
+        assert list(degree_distribution(corpus)) == [0, 3, 5]
+        assert list(rank_distribution(corpus)) == [0, 0, 5, 1]
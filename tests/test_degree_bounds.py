@@ -0,0 +1,68 @@
+import math
+import pytest
+from src.query_quantity_calculator import degree_bounds
+from src.query_quantity_calculator.hypergraph import Hypergraph
+from src.query_quantity_calculator.parser import DatalogParser, RelationStatistic
+from src.query_quantity_calculator.solver import QuerySolver
+
+
+def bound(query_text, exact=False):
+    relations, statistics = DatalogParser().parse_annotated_query(query_text)
+    hypergraph = Hypergraph()
+    hypergraph.from_relations(relations)
+    return QuerySolver(hypergraph).polymatroid_bound(statistics, exact)
+
+
+TRIANGLE = "R(a, b) [size=1024]\nS(b, c) [size=1024]\nT(a, c) [size=1024]"
+
+
+class TestPolymatroidBound:
+    def test_sizes_give_agm(self):
+        result = bound(TRIANGLE)
+        assert not result.exact
+        assert result.log2_bound == pytest.approx(15.0)
+        assert result.bound == pytest.approx(2 ** 15)
+
+    def test_functional_dependency_tightens(self):
+        result = bound(TRIANGLE.replace("R(a, b) [size=1024]", "R(a, b) [size=1024; a -> b]"))
+        assert result.log2_bound == pytest.approx(10.0)
+
+    def test_degree_constraint(self):
+        result = bound("R(a, b) [size=1024]\nS(b, c) [deg(b)=4]")
+        assert result.log2_bound == pytest.approx(12.0)
+
+    def test_family_matches_full_lattice(self):
+        queries = [TRIANGLE, TRIANGLE.replace("R(a, b) [size=1024]", "R(a, b) [size=1024; a -> b]"),
+                   "R(a, b, c) [size=4096; deg(a)=8]\nS(c, d) [size=64]\nT(a, d, e) [size=1024; a, d -> e]"]
+        for query_text in queries:
+            full = bound(query_text, exact=True)
+            assert full.exact
+            assert bound(query_text).log2_bound == pytest.approx(full.log2_bound)
+
+    def test_full_lattice_is_limited(self):
+        query_text = "\n".join(f"R{i}(x{i}, x{i + 1}) [size=4]" for i in range(degree_bounds.EXACT_MAX_VARIABLES))
+        with pytest.raises(ValueError, match="limited"):
+            bound(query_text, exact=True)
+
+    def test_unbounded(self):
+        assert math.isinf(bound("R(a, b) [size=1024]\nS(b, c)").bound)
+
+    def test_relaxation_on_many_variables(self):
+        path = "\n".join(f"R{i}(x{i}, x{i + 1}) [size=256; deg(x{i})=2]" for i in range(16))
+        result = bound(path)
+        assert not result.exact
+        assert result.subsets <= degree_bounds.MAX_SUBSETS + 64
+        assert result.log2_bound == pytest.approx(8 + 15)
+
+    def test_shape_is_cached(self):
+        first = bound(TRIANGLE)
+        cached = len(degree_bounds._local.cache)
+        second = bound(TRIANGLE.replace("1024", "256"))
+        assert len(degree_bounds._local.cache) == cached
+        assert second.log2_bound == pytest.approx(12.0) and first.log2_bound == pytest.approx(15.0)
+
+    def test_unknown_variable(self):
+        hypergraph = Hypergraph()
+        hypergraph.from_relations([("R", ["a", "b"])])
+        with pytest.raises(ValueError, match="unknown variables z"):
+            QuerySolver(hypergraph).polymatroid_bound([RelationStatistic("R", 0, ("z",), ("a", "z"), 2.0)])
@@ -0,0 +1,73 @@
+import random
+from fractions import Fraction
+import numpy as np
+from src.query_quantity_calculator import lp
+from src.query_quantity_calculator.backends import (
+    CombinatorialBackend, DualSimplexBackend, InteriorPointBackend, LPProblem, PersistentHighsBackend
+)
+from src.query_quantity_calculator.exact import exact_optimum
+from src.query_quantity_calculator.solver import QuerySolver
+from src.query_quantity_calculator.store import ResultStore
+from tests.conftest import build
+
+TRIANGLE = [("R", ["a", "b"]), ("S", ["b", "c"]), ("T", ["a", "c"])]
+STAR = [(f"R{i}", ["hub", f"x{i}", f"y{i}"]) for i in range(5)]
+
+
+def backends():
+    result = [None, CombinatorialBackend(), DualSimplexBackend(), InteriorPointBackend()]
+    if lp.highspy is not None:
+        result.append(PersistentHighsBackend())
+    return result
+
+
+class TestExact:
+    def test_triangle(self):
+        for backend in backends():
+            solver = QuerySolver(build(TRIANGLE), backend=backend)
+            cover = solver.exact_fractional_edge_cover()
+            packing = solver.exact_fractional_edge_packing()
+            assert cover.certified and packing.certified
+            assert cover.value == packing.value == Fraction(3, 2)
+            assert cover.weights == [Fraction(1, 2)] * 3
+
+    def test_degenerate_star(self):
+        # Every edge holds the hub: many optimal packings, and the dual has to come from the solver
+        for backend in backends():
+            if isinstance(backend, CombinatorialBackend):
+                continue
+            solver = QuerySolver(build(STAR), backend=backend)
+            packing = solver.exact_fractional_edge_packing()
+            assert packing.certified and packing.value == 1
+            assert solver.exact_fractional_edge_cover().value == 5
+
+    def test_random_agree_with_floats(self):
+        rng = random.Random(3)
+        for _ in range(30):
+            variables = [f"v{i}" for i in range(rng.randint(2, 9))]
+            relations = [(f"R{i}", rng.sample(variables, min(rng.randint(1, 4), len(variables))))
+                         for i in range(rng.randint(1, 10))]
+            solver = QuerySolver(build(relations))
+            for result, value in ((solver.exact_fractional_edge_cover(), solver.solve_fractional_edge_cover()),
+                                  (solver.exact_fractional_edge_packing(), solver.solve_fractional_edge_packing())):
+                assert result.certified
+                assert abs(float(result.value) - value) < 1e-9
+
+    def test_stored_weights_reconstruct_dual(self, tmp_path):
+        store = ResultStore(str(tmp_path / "results.db"))
+        relations = [("R", ["a", "b", "c"]), ("S", ["c", "d"]), ("T", ["d", "a"]), ("U", ["b", "d"])]
+        QuerySolver(build(relations), store=store).analyze()
+        solver = QuerySolver(build(relations), store=store)
+        cover = solver.exact_fractional_edge_cover()
+        assert cover.certified
+        assert cover.value == Fraction(solver.solve_fractional_edge_cover()).limit_denominator(1000)
+
+    def test_snaps_noisy_solution(self):
+        problem = LPProblem.from_hypergraph(build(TRIANGLE))
+        noisy = np.array([0.5, 0.4999999999, 0.5000000001])
+        result = exact_optimum(problem, 1.4999999999, noisy, covering=True, dual=np.full(3, 0.5))
+        assert result.certified and result.value == Fraction(3, 2)
+        # A dual with a smaller objective does not certify
+        assert not exact_optimum(problem, 1.5, noisy, covering=True, dual=np.array([0.5, 0.5, 0.0])).certified
+        # Nor does an infeasible primal
+        assert not exact_optimum(problem, 1.0, np.array([0.5, 0.5, 0.0]), covering=True).certified
@@ -0,0 +1,49 @@
+import pytest
+from src.query_quantity_calculator.explore import NeighbourhoodExplorer
+from src.query_quantity_calculator.hypergraph import Hypergraph
+
+# x0 - x1 - ... - x10, one binary relation per step
+PATH = [(f"R{i}", [f"x{i}", f"x{i + 1}"]) for i in range(10)]
+
+
+def explorer(relations, **kwargs):
+    hypergraph = Hypergraph()
+    hypergraph.from_relations(relations)
+    return NeighbourhoodExplorer(hypergraph, **kwargs)
+
+
+def shown(explorer):
+    return {explorer.names[v] for v in explorer.visible_vertices}
+
+
+class TestExplore:
+    def test_neighbourhood(self):
+        path = explorer(PATH)
+        path.focus(vertex="x5", hops=2)
+        assert shown(path) == {"x3", "x4", "x5", "x6", "x7"}
+        assert len(path.visible_edges) == 4
+        path.focus(relation=0, hops=1)
+        assert shown(path) == {"x0", "x1", "x2"}
+
+    def test_expand_adds_traces(self):
+        path = explorer(PATH)
+        figure = path.focus(vertex="x0", hops=1)
+        before = [trace.name for trace in figure.data]
+        placed = dict(path.positions)
+        path.expand("x1", hops=2)
+        assert shown(path) == {"x0", "x1", "x2", "x3"}
+        assert path.figure is figure
+        assert [trace.name for trace in figure.data][:len(before)] == before
+        assert len(figure.data) > len(before)
+        # Vertices already on screen keep their places
+        assert all(path.positions[v] == position for v, position in placed.items())
+
+    def test_truncation_and_errors(self):
+        star = explorer([(f"R{i}", ["hub", f"leaf{i}"]) for i in range(50)], max_vertices=10)
+        star.focus(vertex="hub", hops=1)
+        assert star.truncated
+        assert len(star.visible_vertices) <= 10
+        with pytest.raises(ValueError):
+            star.focus(vertex="missing")
+        with pytest.raises(ValueError):
+            star.focus(relation=50)
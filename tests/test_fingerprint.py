@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from src.query_quantity_calculator.fingerprint import FingerprintCache, approximate_size, query_fingerprint
+
+TRIANGLE = "R(a, b)\nS(b, c)\nT(a, c)"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestFingerprint:
+    def test_equivalent_texts(self):
+        same = ["  T(a,c)\nR( a , b )\n\nS(b, c)\nR(a, b)  ", "R (a, b)\tS(b, c)".replace("\t", "\n") + "\nT(a, c)"]
+        assert all(query_fingerprint(text) == query_fingerprint(TRIANGLE) for text in same)
+        assert query_fingerprint("R(a, b) [size = 10; a -> b]") == query_fingerprint("R(a,b)[size=10;a->b]")
+
+    def test_different_texts(self):
+        assert query_fingerprint(TRIANGLE) != query_fingerprint("R(b, a)\nS(b, c)\nT(a, c)")
+        assert query_fingerprint("R(a b)") != query_fingerprint("R(ab)")
+        assert query_fingerprint("R(a, b)") != query_fingerprint("R(a, b) [size=10]")
+
+    def test_lines_from_a_file(self, tmp_path):
+        path = tmp_path / "query.dl"
+        path.write_text(TRIANGLE)
+        with open(path) as f:
+            assert query_fingerprint(f) == query_fingerprint(TRIANGLE)
+
+
+class TestFingerprintCache:
+    def test_lru_by_entries(self):
+        cache = FingerprintCache(max_entries=2)
+        cache.put("a", 1, size=1)
+        cache.put("b", 2, size=1)
+        assert cache.get("a") == 1
+        cache.put("c", 3, size=1)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        stats = cache.stats()
+        assert (stats.entries, stats.hits, stats.misses, stats.evictions) == (2, 3, 1, 1)
+
+    def test_memory_accounting(self):
+        cache = FingerprintCache(max_bytes=100)
+        cache.put("a", "x", size=60)
+        cache.put("b", "y", size=30)
+        assert cache.bytes == 90
+        cache.put("c", "z", size=30)
+        assert cache.get("a") is None and cache.bytes == 60
+        cache.put("huge", "w", size=101)
+        assert cache.get("huge") is None and len(cache) == 2
+        cache.put("b", "y", size=10)
+        assert cache.bytes == 40
+
+    def test_ttl(self):
+        clock = Clock()
+        cache = FingerprintCache(ttl=10, clock=clock)
+        cache.put("a", 1, size=1)
+        clock.now = 9.9
+        assert cache.get("a") == 1
+        clock.now = 10.0
+        assert cache.get("a") is None
+        assert cache.stats().expirations == 1 and cache.bytes == 0
+
+    def test_approximate_size(self):
+        array = np.zeros(1000)
+        assert approximate_size({"weights": array}) > array.nbytes
+        # Shared objects count once
+        assert approximate_size([array, array]) < 2 * array.nbytes
+
+    def test_invalid_limits(self):
+        with pytest.raises(ValueError):
+            FingerprintCache(max_entries=0)
@@ -0,0 +1,33 @@
+import pytest
+from src.query_quantity_calculator.generators import FAMILIES, generate, to_query
+from src.query_quantity_calculator.parser import DatalogParser
+from src.query_quantity_calculator.solver import QuerySolver
+from tests.conftest import build
+
+
+class TestGenerators:
+    def test_families_round_trip_through_parser(self):
+        for family in FAMILIES:
+            relations = generate(family, 50)
+            assert DatalogParser().parse_query(to_query(relations)) == relations
+
+    def test_sizes_are_close_to_requested(self):
+        for family in FAMILIES:
+            for size in (10, 100, 1000):
+                assert 0.5 * size <= len(generate(family, size)) <= 1.5 * size
+
+    def test_seeded(self):
+        assert generate("random_uniform", 100, seed=1) == generate("random_uniform", 100, seed=1)
+        assert generate("random_uniform", 100, seed=1) != generate("random_uniform", 100, seed=2)
+
+    def test_known_values(self):
+        assert QuerySolver(build(generate("cycle", 5))).solve_fractional_edge_cover() == pytest.approx(2.5)
+        assert QuerySolver(build(generate("star", 10))).solve_fractional_edge_cover() == pytest.approx(10)
+        # ρ* of Loomis–Whitney with d variables is d / (d - 1) per copy
+        assert QuerySolver(build(generate("loomis_whitney", 12))).solve_fractional_edge_cover() == pytest.approx(4)
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            generate("torus", 10)
+        with pytest.raises(ValueError):
+            generate("cycle", 0)
@@ -1,5 +1,9 @@
+import numpy as np
 import pytest
+from src.query_quantity_calculator.backends import LPProblem
+from src.query_quantity_calculator.generators import generate
 from src.query_quantity_calculator.hypergraph import Hypergraph
+from src.query_quantity_calculator.solver import QuerySolver
 
 
 class TestHypergraph:
@@ -165,4 +169,42 @@ class TestHypergraph:
         self.hypergraph.from_relations(relations)
         assert self.hypergraph.get_vertex_count() == 30
         assert self.hypergraph.get_edge_count() == 10
-        assert self.hypergraph.get_rank() == 3
\ No newline at end of file
+        assert self.hypergraph.get_rank() == 3
+
+    def test_from_csr_wraps_arrays(self):
+        offsets = np.array([0, 2, 4, 6])
+        vertex_ids = np.array([0, 1, 1, 2, 2, 0])
+        hypergraph = Hypergraph.from_csr(offsets, vertex_ids, names=["a", "b", "c"])
+        assert hypergraph.get_vertex_count() == 3
+        assert hypergraph.get_edge_count() == 3
+        assert hypergraph.get_rank() == 2
+        problem = LPProblem.from_hypergraph(hypergraph)
+        assert np.shares_memory(problem.offsets, offsets)
+        assert np.shares_memory(problem.vertex_ids, vertex_ids)
+        assert hypergraph.vertices == {"a", "b", "c"}
+        assert hypergraph.edges[1] == ("e1", {"b", "c"})
+        assert QuerySolver(hypergraph).solve_fractional_edge_cover() == pytest.approx(1.5)
+
+    def test_from_csr_matches_from_relations(self):
+        for family in ("grid", "loomis_whitney", "random_uniform"):
+            reference = Hypergraph()
+            reference.from_relations(generate(family, 30))
+            offsets, vertex_ids = reference.get_incidence_arrays()
+            wrapped = Hypergraph.from_csr(offsets, vertex_ids, reference.get_vertices_list())
+            assert wrapped.vertices == reference.vertices
+            assert [edge for _, edge in wrapped.edges] == [edge for _, edge in reference.edges]
+            assert (QuerySolver(wrapped).solve_fractional_edge_packing()
+                    == pytest.approx(QuerySolver(reference).solve_fractional_edge_packing()))
+
+    @pytest.mark.parametrize("offsets, vertex_ids, names", [
+        ([0, 2], [0, 1, 2], None),
+        ([0, 2, 2], [0, 1], None),
+        ([0, 2], [0, 0], None),
+        ([0, 2], [0, 2], None),
+        ([0, 2], [0, 1], ["a"]),
+        ([0, 2], [0, 1], ["a", "a"]),
+        ([0.0, 2.0], [0, 1], None),
+    ])
+    def test_from_csr_rejects_invalid_input(self, offsets, vertex_ids, names):
+        with pytest.raises(ValueError):
+            Hypergraph.from_csr(np.array(offsets), np.array(vertex_ids), names)
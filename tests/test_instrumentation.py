@@ -0,0 +1,74 @@
+import pytest
+from src.query_quantity_calculator import instrumentation, lp
+from src.query_quantity_calculator.backends import LPProblem, PersistentHighsBackend
+from src.query_quantity_calculator.hypergraph import Hypergraph
+from src.query_quantity_calculator.parser import DatalogParser
+from src.query_quantity_calculator.solver import QuerySolver
+
+
+@pytest.fixture
+def recording():
+    instrumentation.reset()
+    instrumentation.enable()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def run_pipeline(query):
+    relations = DatalogParser().parse_query(query)
+    hypergraph = Hypergraph()
+    hypergraph.from_relations(relations)
+    solver = QuerySolver(hypergraph)
+    return solver.solve_fractional_edge_cover(), solver.solve_fractional_edge_packing()
+
+
+class TestInstrumentation:
+    def test_disabled_records_nothing(self):
+        instrumentation.reset()
+        run_pipeline("R(a, b, c)\nS(c, d)\nT(d, a)")
+        assert instrumentation.snapshot() == {"spans": {}, "values": {}, "counters": {}}
+
+    def test_pipeline_stages_and_lp_sizes(self, recording):
+        run_pipeline("R(a, b, c)\nS(c, d)\nT(d, a)")
+        metrics = instrumentation.snapshot()
+        assert {"parse", "build"} <= set(metrics["spans"])
+        assert any(name.startswith("lp{") and "problem=edge_cover" in name for name in metrics["spans"])
+        assert metrics["values"]["lp_rows"]["last"] == 4
+        assert metrics["values"]["lp_cols"]["last"] == 3
+        assert metrics["values"]["lp_nnz"]["last"] == 7
+        assert any(name.startswith("lp_iterations") for name in metrics["values"])
+
+    @pytest.mark.skipif(lp.highspy is None, reason="highspy is not installed")
+    def test_persistent_model_hit_rate(self, recording):
+        hypergraph = Hypergraph()
+        hypergraph.from_relations([("R", ["a", "b", "c"]), ("S", ["c", "d"]), ("T", ["d", "a"])])
+        problem = LPProblem.from_hypergraph(hypergraph)
+        backend = PersistentHighsBackend()
+        backend.edge_cover(problem)
+        # Packing of the same problem reuses the loaded model
+        backend.edge_packing(problem)
+        assert instrumentation.hit_rate("persistent_model") == pytest.approx(0.5)
+
+    def test_prometheus_export(self, recording):
+        with instrumentation.span("parse"):
+            pass
+        instrumentation.observe("lp_nnz", 7)
+        instrumentation.count("cache_requests", cache="result_store", result="hit")
+        instrumentation.count("cache_requests", cache="result_store", result="hit")
+        text = instrumentation.to_prometheus()
+        assert "# TYPE qqc_parse_seconds summary" in text
+        assert "qqc_parse_seconds_count 1" in text
+        assert "qqc_lp_nnz_sum 7.0" in text
+        assert 'qqc_cache_requests_total{cache="result_store",result="hit"} 2' in text
+
+    def test_difference_between_snapshots(self, recording):
+        run_pipeline("R(a, b)\nS(b, c)")
+        instrumentation.count("cache_requests", cache="fingerprint", result="hit")
+        before = instrumentation.snapshot()
+        run_pipeline("R(a, b)\nS(b, c)\nT(a, c)")
+        delta = instrumentation.difference(before, instrumentation.snapshot())
+        assert delta["spans"]["build"]["count"] == 1
+        assert delta["spans"]["build"]["mean"] == pytest.approx(delta["spans"]["build"]["total"])
+        assert "cache_requests{cache=fingerprint,result=hit}" not in delta["counters"]
+        assert instrumentation.difference(before, before) == {"spans": {}, "values": {}, "counters": {}}
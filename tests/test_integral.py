@@ -0,0 +1,77 @@
+import itertools
+import random
+from src.query_quantity_calculator.solver import QuerySolver
+from tests.conftest import build
+
+
+def brute_force(relations, cover):
+    edges = [set(args) for _, args in relations]
+    vertices = set().union(*edges)
+    best = 0
+    for k in range(len(edges) + 1):
+        for chosen in itertools.combinations(edges, k):
+            union = set().union(*chosen)
+            if cover and union == vertices:
+                return k
+            if not cover and sum(len(e) for e in chosen) == len(union):
+                best = k
+    return best
+
+
+class TestIntegralSolver:
+    def test_triangle(self):
+        solver = QuerySolver(build([("R", ["a", "b"]), ("S", ["b", "c"]), ("T", ["a", "c"])]))
+
+        cover = solver.solve_integral_edge_cover()
+        packing = solver.solve_integral_edge_packing()
+
+        assert cover.value == 2 and cover.optimal
+        assert abs(cover.fractional - 1.5) < 1e-6
+        assert abs(cover.integrality_gap - 4 / 3) < 1e-6
+        assert packing.value == 1 and packing.optimal
+        assert abs(packing.integrality_gap - 1.5) < 1e-6
+
+    def test_star_is_solved_by_reductions(self):
+        solver = QuerySolver(build([("R", ["a", "b"]), ("S", ["a", "c"]), ("T", ["a", "d"])]))
+
+        cover = solver.solve_integral_edge_cover()
+        assert cover.value == 3
+        assert cover.edges == [0, 1, 2]
+        assert cover.integrality_gap == 1.0
+
+    def test_returned_edges_are_feasible(self):
+        relations = [("R", ["a", "b", "c"]), ("S", ["c", "d"]), ("T", ["d", "e"]), ("U", ["e", "a"]), ("V", ["b", "d"])]
+        solver = QuerySolver(build(relations))
+
+        cover = solver.solve_integral_edge_cover()
+        assert set().union(*(relations[e][1] for e in cover.edges)) == {"a", "b", "c", "d", "e"}
+        packing = solver.solve_integral_edge_packing()
+        used = [v for e in packing.edges for v in relations[e][1]]
+        assert len(used) == len(set(used))
+
+    def test_matches_brute_force(self):
+        rng = random.Random(11)
+        for _ in range(40):
+            variables = [f"v{i}" for i in range(rng.randint(3, 8))]
+            relations = [(f"R{i}", rng.sample(variables, rng.randint(1, 3))) for i in range(rng.randint(2, 8))]
+            solver = QuerySolver(build(relations))
+
+            assert solver.solve_integral_edge_cover().value == brute_force(relations, True)
+            assert solver.solve_integral_edge_packing().value == brute_force(relations, False)
+
+    def test_time_limit_returns_incumbent_and_bound(self):
+        rng = random.Random(5)
+        variables = [f"v{i}" for i in range(120)]
+        relations = [(f"R{i}", rng.sample(variables, 3)) for i in range(300)]
+        solver = QuerySolver(build(relations))
+
+        cover = solver.solve_integral_edge_cover(time_limit=0.0)
+        assert cover.bound <= cover.value
+        assert cover.bound >= cover.fractional - 1e-6
+        packing = solver.solve_integral_edge_packing(time_limit=0.0)
+        assert packing.value <= packing.bound <= packing.fractional + 1e-6
+
+    def test_empty_hypergraph(self):
+        solver = QuerySolver(build([]))
+        assert solver.solve_integral_edge_cover().value == 0
+        assert solver.solve_integral_edge_packing().value == 0
@@ -1,5 +1,5 @@
 import pytest
-from src.query_quantity_calculator.parser import DatalogParser
+from src.query_quantity_calculator.parser import DatalogParser, RelationStatistic
 
 
 class TestDatalogParser:
@@ -96,4 +96,23 @@ class TestDatalogParser:
     def test_get_all_variables_empty_relations(self):
         relations = []
         result = self.parser.get_all_variables(relations)
-        assert result == set()
\ No newline at end of file
+        assert result == set()
+
+    def test_parse_annotated_query(self):
+        query = "R(a, b, c) [size=1000; deg(a)=20; a, b -> c]\nS(c, d)"
+        relations, statistics = self.parser.parse_annotated_query(query)
+        assert relations == [("R", ["a", "b", "c"]), ("S", ["c", "d"])]
+        assert statistics == [
+            RelationStatistic("R", 0, (), ("a", "b", "c"), 1000.0),
+            RelationStatistic("R", 0, ("a",), ("a", "b", "c"), 20.0),
+            RelationStatistic("R", 0, ("a", "b"), ("a", "b", "c"), 1.0),
+        ]
+        assert self.parser.parse_query(query) == relations
+
+    def test_parse_invalid_statistics(self):
+        with pytest.raises(ValueError, match="Invalid statistic"):
+            self.parser.parse_query("R(a, b) [rows=10]")
+        with pytest.raises(ValueError, match="has no variables z"):
+            self.parser.parse_query("R(a, b) [deg(z)=3]")
+        with pytest.raises(ValueError, match="at least 1"):
+            self.parser.parse_query("R(a, b) [size=0]")
@@ -0,0 +1,63 @@
+import json
+import threading
+import time
+import pytest
+from src.query_quantity_calculator.batch import analyze_query
+from src.query_quantity_calculator.pipeline import STAGE_NAMES, StreamingPipeline, main
+
+QUERIES = ["R(a, b)\nS(b, c)\nT(a, c)", "bad", "R(a, b, c)\nS(c, d)", "", "R(x)"] * 20
+
+
+class TestPipeline:
+    def test_results_in_input_order(self):
+        for solvers in (1, 3):
+            results = list(StreamingPipeline(queue_size=2, solve_workers=solvers).stream(QUERIES))
+            assert [r.query for r in results] == QUERIES
+            expected = [analyze_query(q) for q in QUERIES]
+            assert [(r.rho_star, r.tau_star, r.error) for r in results] == \
+                [(r.rho_star, r.tau_star, r.error) for r in expected]
+
+    def test_backpressure(self):
+        read = []
+        written = []
+
+        def source():
+            for query_text in QUERIES:
+                read.append(query_text)
+                yield query_text
+
+        def slow_write(analysis):
+            written.append(analysis)
+            assert len(read) - len(written) <= pipeline.max_in_flight
+            time.sleep(0.001)
+
+        pipeline = StreamingPipeline(queue_size=2, max_in_flight=5)
+        report = pipeline.run(source(), slow_write)
+        assert len(written) == len(QUERIES)
+        assert [stage.stage for stage in report.stages] == list(STAGE_NAMES)
+        assert all(stage.items == len(QUERIES) for stage in report.stages)
+        assert all(stage.max_queue <= 2 for stage in report.stages)
+
+    def test_closing_stops_threads(self):
+        before = threading.active_count()
+        stream = StreamingPipeline(queue_size=1).stream(QUERIES * 10)
+        next(stream)
+        stream.close()
+        assert threading.active_count() == before
+
+    def test_write_errors_propagate(self):
+        def failing_write(analysis):
+            raise OSError("disk full")
+
+        with pytest.raises(OSError, match="disk full"):
+            StreamingPipeline().run(QUERIES, failing_write)
+
+    def test_cli(self, tmp_path, capsys):
+        corpus = tmp_path / "corpus.txt"
+        corpus.write_text("R(a, b)\nS(b, c)\n\nbad\n\nR(x)\n")
+        output = tmp_path / "results.jsonl"
+        main([str(corpus), str(output), "--queue-size", "1", "--solvers", "2"])
+        rows = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [row["query"] for row in rows] == ["R(a, b)\nS(b, c)", "bad", "R(x)"]
+        assert rows[1]["error"] and rows[0]["rho_star"] == pytest.approx(2.0)
+        assert "solve" in capsys.readouterr().err
@@ -0,0 +1,88 @@
+import threading
+import pytest
+from src.query_quantity_calculator.admission import AdmissionPolicy
+from src.query_quantity_calculator.fingerprint import FingerprintCache
+from src.query_quantity_calculator.progressive import (
+    STAGE_AGM_BOUND, STAGE_RHO_STAR, STAGE_STATISTICS, STAGES, JobRegistry, analysis_key, analysis_work
+)
+
+TRIANGLE = "R(a, b)\nS(b, c)\nT(a, c)"
+
+
+def wait_done(job, timeout=10.0):
+    seen = 0
+    while not job.done:
+        seen = job.wait(seen, timeout)
+    return job
+
+
+class TestProgressive:
+    def test_stages_in_order(self):
+        registry = JobRegistry(max_workers=1)
+        job = wait_done(registry.submit("triangle", analysis_work(TRIANGLE, AdmissionPolicy())))
+        assert job.error is None
+        assert tuple(job.results) == STAGES
+        assert job.progress == 1.0
+        assert job.results[STAGE_STATISTICS]["vertex_count"] == 3
+        assert job.results[STAGE_RHO_STAR] == pytest.approx(1.5)
+        assert job.results[STAGE_AGM_BOUND] == pytest.approx(1.0)
+        assert registry.running() == 0
+
+    def test_identical_requests_share_a_job(self):
+        registry = JobRegistry(max_workers=2)
+        release = threading.Event()
+        runs = []
+
+        def work(job):
+            runs.append(job)
+            release.wait(10)
+            job.publish(STAGE_STATISTICS, {})
+
+        first = registry.submit("key", work)
+        second = registry.submit("key", work)
+        release.set()
+        wait_done(first)
+        assert first is second
+        assert len(runs) == 1
+        # Once finished, the same key starts a fresh job
+        assert wait_done(registry.submit("key", work)) is not first
+
+    def test_errors_are_recorded(self):
+        registry = JobRegistry(max_workers=1)
+        job = wait_done(registry.submit("bad", analysis_work("not a query", AdmissionPolicy())))
+        assert job.error.startswith("Parse Error")
+        assert job.results == {}
+
+        rejected = wait_done(registry.submit("big", analysis_work(TRIANGLE, AdmissionPolicy(max_atoms=2))))
+        assert rejected.error.startswith("Query rejected")
+        assert rejected.messages
+
+    def test_finished_jobs_are_cached(self):
+        registry = JobRegistry(max_workers=1, cache=FingerprintCache())
+        policy = AdmissionPolicy()
+        job = wait_done(registry.submit(analysis_key(TRIANGLE, policy), analysis_work(TRIANGLE, policy)))
+        reordered = "T(a, c)\nR(a,b)\nS(b, c)\nR(a, b)"
+        assert registry.submit(analysis_key(reordered, policy), analysis_work(reordered, policy)) is job
+        assert registry.cache.stats().hits == 1
+        # Failures are not cached
+        bad = wait_done(registry.submit("bad", analysis_work("not a query", policy)))
+        assert registry.submit("bad", analysis_work("not a query", policy)) is not bad
+
+    def test_repeated_atoms_do_not_change_the_analysis(self):
+        policy = AdmissionPolicy()
+        repeated, plain = "R(a,b)\nR(a, b)\nS(b,c)", "S(b,c)\nR(a,b)"
+        uncached = JobRegistry(max_workers=1)
+        for text in (repeated, plain):
+            job = wait_done(uncached.submit(text, analysis_work(text, policy)))
+            assert job.results[STAGE_STATISTICS]["edge_count"] == 2
+            assert len(job.results[STAGE_STATISTICS]["relations"]) == 2
+        registry = JobRegistry(max_workers=1, cache=FingerprintCache())
+        wait_done(registry.submit(analysis_key(repeated, policy), analysis_work(repeated, policy)))
+        hit = registry.submit(analysis_key(plain, policy), analysis_work(plain, policy))
+        assert registry.cache.stats().hits == 1
+        assert hit.results[STAGE_STATISTICS]["edge_count"] == 2
+
+    def test_key_depends_on_query_and_policy(self):
+        assert analysis_key(TRIANGLE, AdmissionPolicy()) == analysis_key(TRIANGLE + "\n", AdmissionPolicy())
+        assert analysis_key(TRIANGLE, AdmissionPolicy()) == analysis_key("T(a,c)\nS(b,c)\nR(a,b)", AdmissionPolicy())
+        assert analysis_key(TRIANGLE, AdmissionPolicy()) != analysis_key(TRIANGLE, AdmissionPolicy(max_atoms=2))
@@ -0,0 +1,75 @@
+import json
+import pytest
+from src.query_quantity_calculator import shards
+from src.query_quantity_calculator.batch import analyze_queries
+from src.query_quantity_calculator.generators import generate, to_query
+
+QUERIES = [to_query(generate(family, n)) for family in ("cycle", "star", "grid") for n in range(3, 9)] + ["bad"]
+
+
+def merged(directory, tmp_path):
+    destination = str(tmp_path / "merged.jsonl")
+    rows = shards.merge(directory, destination)
+    with open(destination) as f:
+        records = [json.loads(line) for line in f]
+    assert rows == len(records)
+    return records
+
+
+def crash_after(queries, n):
+    for i, query_text in enumerate(queries):
+        if i == n:
+            raise KeyboardInterrupt
+        yield query_text
+
+
+class TestShards:
+    def test_shards_merge_in_input_order(self, tmp_path):
+        directory = str(tmp_path / "run")
+        shards.prepare(directory, 3)
+        for i in range(3):
+            shards.run_shard(QUERIES, directory, i, 3, chunk_size=2, max_workers=1)
+        records = merged(directory, tmp_path)
+        expected = analyze_queries(QUERIES, max_workers=1)
+        assert [record["index"] for record in records] == list(range(len(QUERIES)))
+        assert [record["rho_star"] for record in records] == pytest.approx([e.rho_star for e in expected])
+        assert records[-1]["error"] is not None
+
+    def test_resume_after_crash(self, tmp_path):
+        directory = str(tmp_path / "run")
+        shards.prepare(directory, 2)
+        with pytest.raises(KeyboardInterrupt):
+            shards.run_shard(crash_after(QUERIES, 9), directory, 0, 2, chunk_size=2, max_workers=1)
+        interrupted = shards.read_checkpoint(directory, 0, 2)
+        assert not interrupted.complete and interrupted.rows == 4
+        with pytest.raises(RuntimeError):
+            shards.merge(directory, str(tmp_path / "merged.jsonl"))
+        # A half-written chunk past the checkpoint is dropped on resume
+        with open(shards._result_path(directory, 0, 2), "a") as f:
+            f.write('{"index": 8, "trunc')
+        for i in range(2):
+            shards.run_shard(QUERIES, directory, i, 2, chunk_size=2, max_workers=1)
+        records = merged(directory, tmp_path)
+        assert [record["index"] for record in records] == list(range(len(QUERIES)))
+
+    def test_manifest_must_match(self, tmp_path):
+        directory = str(tmp_path / "run")
+        shards.prepare(directory, 2, "abc")
+        shards.prepare(directory, 2, "abc")
+        with pytest.raises(ValueError):
+            shards.prepare(directory, 3, "abc")
+        with pytest.raises(ValueError):
+            shards.run_shard(QUERIES, directory, 2, 2)
+
+    def test_coordinate(self, tmp_path):
+        corpus = tmp_path / "corpus.txt"
+        corpus.write_text("\n\n".join(QUERIES) + "\n")
+        directory, destination = str(tmp_path / "run"), str(tmp_path / "results.jsonl")
+        results = shards.coordinate(str(corpus), directory, 2, destination, chunk_size=4)
+        assert sum(shard.rows for shard in results.values()) == len(QUERIES)
+        with open(destination) as f:
+            assert len(f.readlines()) == len(QUERIES)
+        # The run directory is tied to its input
+        corpus.write_text("R(a)\n")
+        with pytest.raises(ValueError):
+            shards.coordinate(str(corpus), directory, 2)
@@ -0,0 +1,38 @@
+import json
+import os
+import subprocess
+import sys
+from src.query_quantity_calculator import lp
+from src.query_quantity_calculator.startup import LP_MODULES, VISUALIZATION_MODULES, preload
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+COLD_START = """
+import json, sys
+from src.query_quantity_calculator.batch import build_hypergraph
+from src.query_quantity_calculator.solver import QuerySolver
+results = [QuerySolver(build_hypergraph(q)).analyze().rho_star
+           for q in ("R(a, b)\\nS(b, c)\\nT(a, c)", "R(a, b, c)\\nS(c, d)\\nT(a, d, e)")]
+heavy = sorted({name.split('.')[0] for name in sys.modules} & {"scipy", "plotly", "networkx", "pandas"})
+print(json.dumps([results, heavy]))
+"""
+
+
+class TestStartup:
+    def test_small_queries_do_not_load_heavy_modules(self):
+        output = subprocess.run([sys.executable, "-c", COLD_START], capture_output=True, text=True, check=True,
+                                cwd=ROOT).stdout
+        results, heavy = json.loads(output)
+        assert results == [1.5, 2.0]
+        # Without highspy the LPs fall back to scipy's linprog
+        assert heavy == ([] if lp.highspy is not None else ["scipy"])
+
+    def test_preload(self):
+        loaded = preload()
+        assert "scipy.optimize" in loaded
+        assert set(loaded) <= set(LP_MODULES)
+        assert all(name in sys.modules for name in loaded)
+
+    def test_preload_visualization_only(self):
+        loaded = preload(lp=False, visualization=True)
+        assert loaded == list(VISUALIZATION_MODULES)
@@ -0,0 +1,121 @@
+import sqlite3
+import threading
+import numpy as np
+import pytest
+from src.query_quantity_calculator.backends import DualSimplexBackend
+from src.query_quantity_calculator.batch import HighsModelPool
+from src.query_quantity_calculator.solver import QuerySolver
+from src.query_quantity_calculator.store import ResultStore, hypergraph_key
+from tests.conftest import build
+
+
+class CountingBackend(DualSimplexBackend):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def edge_cover_solution(self, problem):
+        self.calls += 1
+        return super().edge_cover_solution(problem)
+
+    def edge_packing_solution(self, problem):
+        self.calls += 1
+        return super().edge_packing_solution(problem)
+
+
+TRIANGLE_PLUS = [("R", ["a", "b"]), ("S", ["b", "c"]), ("T", ["a", "c"]), ("U", ["c", "d", "e"])]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    yield store
+    store.close()
+
+
+class TestResultStore:
+    def test_key_ignores_names_and_order(self):
+        a = hypergraph_key(build(TRIANGLE_PLUS))
+        b = hypergraph_key(build([("X", ["e", "d", "c"]), ("Y", ["c", "a"]), ("Z", ["b", "a"]), ("W", ["c", "b"])]))
+        c = hypergraph_key(build(TRIANGLE_PLUS[:3]))
+        assert a.digest == b.digest
+        assert a.digest != c.digest
+
+    def test_solver_reuses_stored_result(self, store):
+        backend = CountingBackend()
+        first = QuerySolver(build(TRIANGLE_PLUS), backend=backend, store=store).analyze()
+        assert backend.calls == 2
+        # The same hypergraph with atoms reordered is answered without solving
+        reordered = build(TRIANGLE_PLUS[::-1])
+        solver = QuerySolver(reordered, backend=backend, store=store)
+        assert solver.solve_fractional_edge_cover() == pytest.approx(first.rho_star)
+        assert solver.solve_fractional_edge_packing() == pytest.approx(first.tau_star)
+        assert backend.calls == 2
+        # Weights come back in the reordered hypergraph's edge order
+        assert np.allclose(solver.analyze().cover_weights, first.cover_weights[::-1])
+
+    def test_visible_across_connections(self, store):
+        key = hypergraph_key(build(TRIANGLE_PLUS))
+        store.put(key, QuerySolver(build(TRIANGLE_PLUS)).analyze())
+        other = ResultStore(store.path)
+        assert other.get(key).rho_star == pytest.approx(2.0)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(other.get(key).tau_star)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == [pytest.approx(2.0)] * 4
+        assert sqlite3.connect(store.path).execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_schema_mismatch_resets(self, store):
+        store.put(hypergraph_key(build(TRIANGLE_PLUS)), QuerySolver(build(TRIANGLE_PLUS)).analyze())
+        connection = sqlite3.connect(store.path)
+        connection.execute("UPDATE meta SET value = '0' WHERE key = 'schema_version'")
+        connection.commit()
+        connection.close()
+        assert len(ResultStore(store.path)) == 0
+
+    def test_pool_solves_only_misses(self, store):
+        queries = ["R(a, b)\nS(b, c)\nT(a, c)", "R(a, b, c)\nS(c, d)", "oops", "S(b, c)\nR(a, b)\nT(c, a)"]
+        with HighsModelPool(max_workers=2, store=store) as pool:
+            first = pool.map(queries)
+        # The first and last queries share a key; the parse failure is not stored
+        assert len(store) == 2
+        assert first[2].error is not None
+        with HighsModelPool(max_workers=2, store=store) as pool:
+            pool.backend = CountingBackend()
+            second = pool.map(queries)
+        assert pool.backend.calls == 0
+        assert [r.rho_star for r in second] == pytest.approx([r.rho_star for r in first])
+
+    def test_pool_saves_window_before_yielding(self, store):
+        queries = ["R(a, b)\nS(b, c)\nT(a, c)", "R(a, b, c)\nS(c, d)", "S(b, c)\nR(a, b)\nT(c, a)",
+                   "R(a, b, c)\nS(c, d)\nT(d, e)"]
+        with HighsModelPool(max_workers=2, store=store) as pool:
+            pool.backend = CountingBackend()
+            results = pool.imap(queries, max_in_flight=4)
+            first = next(results)
+            results.close()
+        assert first.rho_star == pytest.approx(1.5)
+        # The first and third queries share a hypergraph: solved once, and every key is saved
+        assert pool.backend.calls == 2 * 3
+        assert len(store) == 3
+
+    def test_pool_relations_use_bulk_lookups(self, store, monkeypatch):
+        relation_lists = [TRIANGLE_PLUS, [], TRIANGLE_PLUS[:3], TRIANGLE_PLUS]
+        lookups = []
+        get_many = store.get_many
+        monkeypatch.setattr(store, "get_many", lambda keys: lookups.append(len(keys)) or get_many(keys))
+        monkeypatch.setattr(store, "get", lambda key: pytest.fail("per-query lookup"))
+        with HighsModelPool(max_workers=2, store=store) as pool:
+            first = list(pool.imap_relations(relation_lists, labels=["a", "b", "c", "d"], max_in_flight=8))
+        # Three valid rows, two distinct hypergraphs
+        assert lookups == [2]
+        assert len(store) == 2
+        assert [r.query for r in first] == ["a", "b", "c", "d"] and first[1].error is not None
+        with HighsModelPool(max_workers=2, store=store) as pool:
+            pool.backend = CountingBackend()
+            second = list(pool.imap_relations(relation_lists))
+        assert pool.backend.calls == 0
+        assert [r.rho_star for r in second] == pytest.approx([r.rho_star for r in first])
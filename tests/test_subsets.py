@@ -0,0 +1,103 @@
+import math
+import random
+import pytest
+from src.query_quantity_calculator.solver import QuerySolver
+from src.query_quantity_calculator.subsets import SubsetCoverTable
+from tests.conftest import build
+
+
+def induced_rho_star(relations, subset, cardinalities=None):
+    induced = []
+    weights = []
+    for i, (name, args) in enumerate(relations):
+        kept = [a for a in args if a in subset]
+        if kept:
+            induced.append((name, kept))
+            weights.append(1.0 if cardinalities is None else cardinalities[i])
+    if cardinalities is None:
+        return QuerySolver(build(induced)).solve_fractional_edge_cover()
+    table = SubsetCoverTable(build(induced), weights)
+    return table.rho_star(table.subset_mask(subset))
+
+
+class TestSubsetCoverTable:
+    def test_triangle_all_connected_subsets(self):
+        table = SubsetCoverTable(build([("R", ["a", "b"]), ("S", ["b", "c"]), ("T", ["a", "c"])]))
+        result = table.compute()
+
+        assert len(result) == 7
+        assert abs(result[table.subset_mask(["a", "b", "c"])] - 1.5) < 1e-6
+        assert result[table.subset_mask(["a", "b"])] == 1.0
+        assert result[table.subset_mask(["c"])] == 1.0
+
+    def test_connected_subsets_are_unique_and_connected(self):
+        table = SubsetCoverTable(build([("R", ["a", "b"]), ("S", ["b", "c"]), ("T", ["c", "d"]), ("U", ["d", "e"])]))
+        subsets = list(table.connected_subsets())
+
+        assert len(subsets) == len(set(subsets))
+        # A path on 5 vertices has 15 connected sub-paths
+        assert len(subsets) == 15
+        assert all(table.is_connected(mask) for mask in subsets)
+
+    def test_matches_fresh_solver_on_random_hypergraphs(self):
+        rng = random.Random(7)
+        variables = [f"v{i}" for i in range(7)]
+        relations = [(f"R{i}", rng.sample(variables, rng.randint(2, 3))) for i in range(6)]
+        table = SubsetCoverTable(build(relations))
+
+        for mask, value in table.compute().items():
+            expected = induced_rho_star(relations, set(table.mask_vertices(mask)))
+            assert abs(value - expected) < 1e-6
+
+    def test_requested_disconnected_subset_is_additive(self):
+        relations = [("R", ["a", "b"]), ("S", ["b", "c"]), ("T", ["c", "d"])]
+        solver = QuerySolver(build(relations))
+        table = solver.subset_cover_table()
+
+        result = solver.solve_subset_edge_covers([["a", "d"], ["b", "c"]])
+        assert result[table.subset_mask(["a", "d"])] == 2.0
+        assert result[table.subset_mask(["b", "c"])] == 1.0
+
+    def test_dominated_vertices_skip_the_lp(self):
+        # x only appears in R, so covering x also covers a and b
+        relations = [("R", ["a", "x", "b"]), ("S", ["b", "c"]), ("T", ["a", "c"])]
+        table = SubsetCoverTable(build(relations))
+        full = table.rho_star(["a", "b", "c", "x"])
+        lps_before = table.lp_count
+
+        assert table.reduce(table.subset_mask(["a", "b", "c", "x"])) == table.subset_mask(["c", "x"])
+        assert abs(full - induced_rho_star(relations, {"a", "b", "c", "x"})) < 1e-6
+        assert abs(table.rho_star(["b", "c", "x"]) - full) < 1e-6
+        assert table.lp_count == lps_before
+
+    def test_cardinality_weighted(self):
+        relations = [("R", ["a", "b"]), ("S", ["b", "c"]), ("T", ["a", "c"])]
+        cardinalities = [1024, 1024, 8]
+        table = SubsetCoverTable(build(relations), cardinalities)
+
+        # Half weights on every edge (5 + 5 + 1.5) beat any integral cover (>= 13)
+        assert abs(table.rho_star(["a", "b", "c"]) - 11.5) < 1e-6
+        assert abs(table.rho_star(["a"]) - math.log2(8)) < 1e-6
+        assert abs(table.rho_star(["a", "b", "c"]) - induced_rho_star(relations, {"a", "b", "c"}, cardinalities)) < 1e-6
+
+    def test_invalid_cardinalities(self):
+        hypergraph = build([("R", ["a", "b"])])
+        with pytest.raises(ValueError):
+            SubsetCoverTable(hypergraph, [10, 10])
+        with pytest.raises(ValueError):
+            SubsetCoverTable(hypergraph, [0])
+
+    def test_unknown_vertex(self):
+        table = SubsetCoverTable(build([("R", ["a", "b"])]))
+        with pytest.raises(ValueError):
+            table.subset_mask(["z"])
+
+    def test_linprog_fallback_without_highspy(self, monkeypatch):
+        from src.query_quantity_calculator import lp
+        monkeypatch.setattr(lp, "highspy", None)
+        relations = [("R", ["a", "b"]), ("S", ["b", "c"]), ("T", ["a", "c"]), ("U", ["c", "d"])]
+        table = SubsetCoverTable(build(relations))
+
+        for mask, value in table.compute().items():
+            expected = induced_rho_star(relations, set(table.mask_vertices(mask)))
+            assert abs(value - expected) < 1e-6
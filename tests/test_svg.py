@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+from src.query_quantity_calculator.batch import build_hypergraph
+from src.query_quantity_calculator.svg import html_report, render_queries, render_svg
+
+NS = "{http://www.w3.org/2000/svg}"
+QUERY = "R(a, b, c)\nS(c, d)\nT(d)"
+
+
+class TestSvg:
+    def test_render(self):
+        root = ET.fromstring(render_svg(build_hypergraph(QUERY), width=200, height=100))
+        assert root.get("width") == "200"
+        assert len(root.findall(f"{NS}polygon")) == 1
+        assert len(root.findall(f"{NS}polyline")) == 1
+        circles = root.findall(f".//{NS}circle")
+        assert len(circles) == 4
+        assert all(0 <= float(c.get("cx")) <= 200 and 0 <= float(c.get("cy")) <= 100 for c in circles)
+        assert sorted(t.text for t in root.findall(f".//{NS}text")) == ["a", "b", "c", "d"]
+
+    def test_deterministic_and_unlabelled(self):
+        hypergraph = build_hypergraph(QUERY)
+        assert render_svg(hypergraph) == render_svg(hypergraph)
+        assert "<text" not in render_svg(hypergraph, labels=False)
+
+    def test_pool_and_report(self):
+        queries = [QUERY, "bad", "R(x, y)"]
+        svgs = list(render_queries(queries, processes=2))
+        assert svgs[1] is None
+        assert svgs[0] == render_svg(build_hypergraph(QUERY))
+        report = html_report(queries, svgs)
+        assert report.count("<svg") == 2
+        assert "Invalid query" in report
+
+    def test_render_does_not_need_plotly(self):
+        code = ("import sys\n"
+                "from src.query_quantity_calculator.batch import build_hypergraph\n"
+                "from src.query_quantity_calculator.svg import render_svg\n"
+                f"render_svg(build_hypergraph({QUERY!r}))\n"
+                "print('plotly' in sys.modules)")
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                cwd=os.path.join(os.path.dirname(__file__), '..')).stdout
+        assert output.strip() == "False"
@@ -0,0 +1,70 @@
+import random
+from src.query_quantity_calculator.solver import QuerySolver
+from src.query_quantity_calculator.subsets import SubsetCoverTable
+from src.query_quantity_calculator.threshold import (
+    STAGE_LOWER_BOUND, STAGE_LP, STAGE_UPPER_BOUND, ThresholdDecider
+)
+from tests.conftest import build
+
+TRIANGLE = [("R", ["a", "b"]), ("S", ["b", "c"]), ("T", ["a", "c"])]
+
+
+class TestThresholdDecider:
+    def test_cheap_upper_bound_decides(self):
+        solver = QuerySolver(build(TRIANGLE))
+        decision = solver.edge_cover_at_most(5)
+
+        assert decision.within
+        assert decision.stage == STAGE_UPPER_BOUND
+
+    def test_cheap_lower_bound_decides(self):
+        solver = QuerySolver(build(TRIANGLE))
+        decision = solver.edge_cover_at_most(1.0)
+
+        assert not decision.within
+        assert decision.stage == STAGE_LOWER_BOUND
+        assert decision.lower > 1.0
+
+    def test_lp_decides_when_bounds_straddle(self):
+        relations = [("R0", ["e", "b"]), ("R1", ["c", "a"]), ("R2", ["h", "a", "g"]), ("R3", ["c", "a"]),
+                     ("R4", ["g", "h"]), ("R5", ["d", "g", "b"]), ("R6", ["e", "d", "g"])]
+        decider = ThresholdDecider(build(relations))
+        lower = max(decider.even_split_lower_bound(), decider.greedy_dual_lower_bound())
+        upper = min(decider.degree_split_upper_bound(), decider.greedy_cover_upper_bound())
+        assert lower < upper
+
+        decision = decider.decide((lower + upper) / 2)
+        rho_star = QuerySolver(build(relations)).solve_fractional_edge_cover()
+        assert decision.stage == STAGE_LP
+        assert decision.within == (rho_star <= (lower + upper) / 2)
+        assert abs(decision.lower - rho_star) < 1e-6
+
+    def test_bounds_are_valid_on_random_hypergraphs(self):
+        rng = random.Random(2)
+        for _ in range(30):
+            variables = [f"v{i}" for i in range(rng.randint(3, 10))]
+            relations = [(f"R{i}", rng.sample(variables, rng.randint(1, 3))) for i in range(rng.randint(2, 10))]
+            decider = ThresholdDecider(build(relations))
+            rho_star = QuerySolver(build(relations)).solve_fractional_edge_cover()
+
+            assert decider.even_split_lower_bound() <= rho_star + 1e-9
+            assert decider.greedy_dual_lower_bound() <= rho_star + 1e-9
+            assert decider.degree_split_upper_bound() >= rho_star - 1e-9
+            assert decider.greedy_cover_upper_bound() >= rho_star - 1e-9
+            for threshold in (rho_star - 0.25, rho_star + 0.25):
+                assert decider.decide(threshold).within == (rho_star <= threshold)
+
+    def test_agm_bound_with_cardinalities(self):
+        hypergraph = build(TRIANGLE)
+        cardinalities = [1024, 1024, 8]
+        exponent = SubsetCoverTable(hypergraph, cardinalities).rho_star(["a", "b", "c"])
+        solver = QuerySolver(hypergraph)
+
+        assert solver.agm_bound_at_most(2 ** exponent * 1.01, cardinalities).within
+        decision = solver.agm_bound_at_most(2 ** exponent * 0.99, cardinalities)
+        assert not decision.within
+        assert decision.stage == STAGE_LP
+
+    def test_empty_hypergraph(self):
+        decision = QuerySolver(build([])).edge_cover_at_most(0)
+        assert decision.within